@@ -0,0 +1,78 @@
+"""Benchmark the streaming of the output of subprocesses.
+
+Usage: python -m benchmarks.bash_stream [--lines 100000]
+
+A synthetic odoo-bin log is written to a temporary file and streamed through `cat`, first with the legacy
+byte-by-byte reader and then with `odev.common.bash.stream`. The legacy reader is very slow, keep the number
+of lines low. Streaming goes through a pseudo-terminal and requires STDIN to be a TTY, run this benchmark
+from a terminal.
+"""
+
+import argparse
+import os
+import pty
+import select
+import sys
+import tempfile
+from collections.abc import Callable, Generator, Iterable
+from pathlib import Path
+from subprocess import Popen
+from time import perf_counter
+
+from odev.common import bash
+
+from benchmarks.common import generate_lines
+
+
+def legacy_stream(command: list[str]) -> Generator[str, None, None]:
+    """Stream the output of a command the way odev did before block reads were introduced."""
+    master, slave = pty.openpty()
+
+    try:
+        process = Popen(command, stdout=slave, stderr=slave, stdin=slave, start_new_session=True)  # noqa: S603
+        received_buffer: bytes = b""
+
+        while process.poll() is None:
+            rlist, _, _ = select.select([master], [], [], 0.1)
+
+            if master in rlist:
+                received = os.read(master, 1)
+
+                if received != b"\n":
+                    received_buffer += received
+                    continue
+
+                yield received_buffer.decode()
+                received_buffer = b""
+    finally:
+        os.close(slave)
+        os.close(master)
+
+
+def measure(name: str, lines: Callable[[], Iterable[str]]) -> int:
+    """Consume all lines and print the resulting throughput."""
+    start = perf_counter()
+    count = sum(1 for _ in lines())
+    elapsed = perf_counter() - start
+    print(f"{name:<24} {elapsed:>8.3f}s {count / elapsed:>12,.0f} lines/s ({count:,} lines)")  # noqa: T201
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100_000, help="Number of lines to generate")
+    options = parser.parse_args()
+
+    if not sys.stdin.isatty():
+        parser.error("STDIN is not a TTY, run this benchmark from a terminal")
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = Path(directory) / "odoo.log"
+        log.write_text("\n".join(generate_lines(options.lines)) + "\n")
+        print(f"Streaming {options.lines:,} lines ({log.stat().st_size:,} bytes)")  # noqa: T201
+        measure("stream (legacy)", lambda: legacy_stream(["cat", log.as_posix()]))
+        measure("stream", lambda: bash.stream(f"cat {log.as_posix()}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Helpers shared by benchmarks."""
+
+import random
+
+
+LINES_TEMPLATES = [
+    "2024-05-03 10:12:{second:02d},{ms:03d} 4242 INFO odev-bench odoo.modules.loading: loading module_{n} (12/340)",
+    "2024-05-03 10:12:{second:02d},{ms:03d} 4242 DEBUG odev-bench odoo.sql_db: [0.123 ms] query: SELECT {n} FROM x",
+    (
+        "2024-05-03 10:12:{second:02d},{ms:03d} 4242 \x1b[1;32m\x1b[1;49mINFO\x1b[0m odev-bench werkzeug: "
+        '127.0.0.1 - - [03/May/2024 10:12:01] "POST /web/dataset/call_kw/res.partner/read HTTP/1.1" 200 - '
+        "{n} 0.{ms:03d} 0.{second:03d}"
+    ),
+    "2024-05-03 10:12:{second:02d},{ms:03d} 4242 WARNING odev-bench odoo.addons.base.models.ir_ui_view: Bad view {n}",
+    'Traceback (most recent call last):\n  File "/odoo/odoo/models.py", line {n}, in write',
+]
+
+
+def generate_lines(count: int) -> list[str]:
+    """Generate lines of odoo-bin output."""
+    weights = [40, 40, 10, 5, 5]
+    lines: list[str] = []
+
+    while len(lines) < count:
+        template = random.choices(LINES_TEMPLATES, weights)[0]  # noqa: S311
+        values = {"second": random.randint(0, 59), "ms": random.randint(0, 999), "n": len(lines)}  # noqa: S311
+        lines.extend(template.format(**values).splitlines())
+
+    return lines[:count]
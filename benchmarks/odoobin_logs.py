@@ -0,0 +1,85 @@
+"""Benchmark the processing of odoo-bin logs.
+
+Usage: python -m benchmarks.odoobin_logs [path/to/odoo.log] [--lines 1000000] [--render-lines 20000]
+
+If no log file is given, a log of the requested number of lines is generated, mixing regular records,
+debug SQL records, HTTP requests and tracebacks in proportions similar to an `-u all` run.
+Rendering to the console is much slower than parsing and is measured on the first lines of the log only.
+"""
+
+import argparse
+import io
+import re
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from time import perf_counter
+
+from odev.common import string
+from odev.common.console import Console
+from odev.common.odoobin_logs import ODOO_LOG_REGEX, format_log_line, parse_log_line
+
+from benchmarks.common import generate_lines
+
+
+def legacy_parse_log_line(line: str) -> re.Match | None:
+    """Parse a line the way odev did before the prefix check was introduced."""
+    return re.match(ODOO_LOG_REGEX, string.strip_ansi_colors(line))
+
+
+def measure(
+    name: str,
+    lines: Iterable[str],
+    process: Callable[[str], object],
+    finalize: Callable[[], object] | None = None,
+) -> None:
+    """Process all lines and print the resulting throughput."""
+    start = perf_counter()
+    count = 0
+
+    for line in lines:
+        process(line)
+        count += 1
+
+    if finalize is not None:
+        finalize()
+
+    elapsed = perf_counter() - start
+    print(f"{name:<32} {elapsed:>8.3f}s {count / elapsed:>12,.0f} lines/s")  # noqa: T201
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", type=Path, help="Path to a recorded odoo-bin log file")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Number of lines to generate")
+    parser.add_argument("--render-lines", type=int, default=20_000, help="Number of lines to render")
+    options = parser.parse_args()
+
+    if options.log is not None:
+        lines = options.log.read_text(errors="replace").splitlines()
+    else:
+        lines = generate_lines(options.lines)
+
+    console = Console(file=io.StringIO(), force_terminal=True, width=160)
+    sample = lines[: options.render_lines]
+    print(f"Processing {len(lines):,} lines, rendering {len(sample):,} lines")  # noqa: T201
+
+    measure("parse (legacy)", lines, legacy_parse_log_line)
+    measure("parse", lines, parse_log_line)
+    measure(
+        "parse + render (legacy)",
+        sample,
+        lambda line: (
+            (match := legacy_parse_log_line(line))
+            and console.print(format_log_line(match), highlight=False, soft_wrap=True)
+        ),
+    )
+    measure(
+        "parse + render (batched)",
+        sample,
+        lambda line: (match := parse_log_line(line)) and console.print_batched(format_log_line(match)),
+        console.flush_batch,
+    )
+
+
+if __name__ == "__main__":
+    main()
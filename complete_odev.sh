@@ -1,5 +1,5 @@
 # odev tab completion script
-# Version:  0.3
+# Version:  0.4
 # Install:  Link the script into /usr/share/bash-completions/completions/
 #           or ~/.local/share/bash-completions/completions/
 #           'source' the file to use the features in the current session.
@@ -12,14 +12,17 @@
 
 _odev ()   #  By convention, the function name starts with an underscore.
 {
-    _odev_complete_config="${HOME}/.config/odev/databases.cfg"
+    # list of Odoo databases maintained by odev, refreshed through `odev list -1` when older than the TTL
+    _odev_complete_cache="${HOME}/odev/cache/databases"
+    _odev_complete_cache_ttl=300
 
     _odev_complete_list_cache()
     {
-        if [ "${_odev_complete_last:-0}" -lt "$(date +%s -r ${_odev_complete_config})" ]; then
-            _odev_complete_list="$( odev list -1 )"
-            _odev_complete_last="$(date +%s)"
+        if [ ! -r "${_odev_complete_cache}" ] \
+            || [ "$(( $(date +%s) - $(date +%s -r "${_odev_complete_cache}") ))" -gt "${_odev_complete_cache_ttl}" ]; then
+            odev list -1 > /dev/null 2>&1 && touch "${_odev_complete_cache}" 2> /dev/null
         fi
+        _odev_complete_list="$( cat "${_odev_complete_cache}" 2> /dev/null )"
     }
 
     local cur prev words cword split opts
@@ -2,10 +2,12 @@
 
 # Run odev using the virtualenv if available, otherwise fallback to system python3
 # for compatibility with older running installations of odev.
+# Commands are forwarded to the odev server when running (see `odev server`),
+# the client runs them in-process otherwise.
 
 for interpreter in ~/.config/odev/venv/bin/python3 /usr/bin/python3; do
     if [ -x "$interpreter" ]; then
-        exec "$interpreter" $(readlink -m $(dirname "$0"/..)/../main.py) "$@"
+        exec "$interpreter" -I -S $(readlink -m $(dirname "$0"/..)/../odev/client.py) "$@"
         exit $?
     fi
 done
@@ -0,0 +1,93 @@
+"""Thin client forwarding odev commands to a running odev server, see `odev.common.server`.
+
+Started with `python -I -S` by `odev.sh`, this module must only import from the standard library
+so that forwarding a command costs no more than starting the interpreter. When no server is running,
+or when the server cannot serve the command, odev runs in-process instead.
+"""
+
+import contextlib
+import json
+import os
+import re
+import signal
+import socket
+import struct
+import sys
+
+
+SERVER_SOCKET_PATH = os.path.expanduser("~/odev/server.sock")
+"""Path to the Unix socket the server listens on, must be kept in sync with `odev.common.server`."""
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "main.py")
+"""Path to the script running odev in-process."""
+
+IN_PROCESS_ARGUMENTS = re.compile(r"^(?:-v|--log-level(?:=.*)?)$")
+"""Arguments changing how the framework is initialized, commands using them always run in-process."""
+
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGQUIT, signal.SIGHUP, signal.SIGWINCH)
+"""Signals received by the client and forwarded to the process running the command."""
+
+
+def run_in_process(argv: list[str]):
+    """Replace the current process with odev running the command in-process."""
+    os.execv(sys.executable, [sys.executable, MAIN_PATH, *argv])  # noqa: S606
+
+
+def forward(argv: list[str]) -> int | None:
+    """Forward a command to the server and wait for its completion.
+
+    :param argv: The arguments of the command.
+    :return: The exit code of the command, or `None` if the server could not run it
+        or odev was updated before running it.
+    """
+    if any(IN_PROCESS_ARGUMENTS.match(argument) for argument in argv):
+        return None
+
+    payload = json.dumps({"action": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}).encode()
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(SERVER_SOCKET_PATH)
+        socket.send_fds(client, [struct.pack("!I", len(payload)) + payload], [0, 1, 2])
+    except OSError:
+        client.close()
+        return None
+
+    replies = client.makefile("rb")
+    started = json.loads(replies.readline() or b"{}")
+
+    if "pid" not in started:
+        client.close()
+        return None
+
+    def forward_signal(signal_number, frame):
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(started["pid"], signal_number)
+
+    for signal_number in FORWARDED_SIGNALS:
+        signal.signal(signal_number, forward_signal)
+
+    while True:
+        try:
+            line = replies.readline()
+            break
+        except InterruptedError:
+            continue
+
+    finished = json.loads(line) if line else {}
+    return None if finished.get("fallback") else finished.get("exit", 1)
+
+
+def main():
+    argv = sys.argv[1:]
+    exit_code = forward(argv)
+
+    if exit_code is None:
+        run_in_process(argv)
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -194,4 +194,5 @@ class CreateCommand(OdoobinTemplateCommand):
             self._database.drop()
             raise self.error(f"Failed to initialize database {self._database.name!r}, it was deleted")
 
+        self.store.catalogue.record(self._database.name)
         logger.info(f"Initialized database {self._database.name!r}")
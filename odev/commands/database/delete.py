@@ -1,11 +1,11 @@
 """Create a new database."""
 
-import shutil
+from collections.abc import Sequence
 
-from odev.common import args, progress, string
+from odev.common import args, concurrency, progress, string
 from odev.common.commands import LocalDatabaseCommand
 from odev.common.databases import LocalDatabase
-from odev.common.logging import logging, silence_loggers
+from odev.common.logging import logging
 from odev.common.mixins import ListLocalDatabasesMixin
 
 
@@ -27,6 +27,7 @@ class DeleteCommand(ListLocalDatabasesMixin, LocalDatabaseCommand):
         - filestore: keep the database filestore
         - venv: keep the virtual environment associated to the database
         - config: keep saved attributes for the database (i.e. whitelist, saved arguments,...)
+        - snapshots: keep the snapshots of the database, to roll back to them later
         """,
     )
     expression = args.Regex(
@@ -79,18 +80,10 @@ class DeleteCommand(ListLocalDatabasesMixin, LocalDatabaseCommand):
         if not self.console.confirm("Are you sure?", default=False):
             raise self.error("Command aborted")
 
-        tracker = progress.Progress()
-        task = tracker.add_task(f"Deleting {len(databases)} databases", total=len(databases))
-        tracker.start()
+        with progress.spinner(f"Deleting {len(databases)} databases"):
+            dropped = self.delete_many([LocalDatabase(database) for database in databases])
 
-        for database in databases:
-            with silence_loggers(__name__):
-                self.delete_one(LocalDatabase(database))
-
-            tracker.update(task, advance=1)
-
-        tracker.stop()
-        logger.info(f"Deleted {len(databases)} databases")
+        logger.info(f"Deleted {len(dropped)} databases")
 
     def confirm_delete(self) -> None:
         """Confirm the deletion of the database."""
@@ -119,13 +112,62 @@ class DeleteCommand(ListLocalDatabasesMixin, LocalDatabaseCommand):
             self.remove_configuration(database)
 
         if database.exists:
-            database.drop()
+            database.drop(keep_snapshots="snapshots" in self.args.keep)
 
         if "venv" not in self.args.keep:
             self.remove_venv(database)
 
+        LocalDatabase.empty_filestore_trash()
         logger.info(f"Dropped database {database.name!r}")
 
+    def delete_many(self, databases: Sequence[LocalDatabase]) -> list[LocalDatabase]:
+        """Delete multiple databases and their resources at once. Databases are dropped concurrently,
+        then the filestores of the databases actually dropped are moved to the trash and removed
+        in the background, their references in the database store are removed in a single query per table
+        and their snapshots are dropped.
+        Resources of databases that could not be dropped are left untouched.
+        :param databases: the databases to delete.
+        :return: the databases that were dropped.
+        """
+        results = concurrency.run((self.drop_database(database) for database in databases), return_exceptions=True)
+        dropped: list[LocalDatabase] = []
+
+        for database, result in zip(databases, results, strict=True):
+            if result is True:
+                dropped.append(database)
+            else:
+                reason = f": {result}" if isinstance(result, BaseException) else ""
+                logger.error(f"Failed to drop database {database.name!r}{reason}")
+
+        if "filestore" not in self.args.keep:
+            for database in dropped:
+                database.trash_filestore()
+
+        if "config" not in self.args.keep:
+            self.remove_configuration(*dropped)
+
+        if "snapshots" not in self.args.keep:
+            for database in dropped:
+                database.drop_snapshots()
+
+        if "venv" not in self.args.keep:
+            for database in dropped:
+                self.remove_venv(database)
+
+        LocalDatabase.empty_filestore_trash()
+        return dropped
+
+    async def drop_database(self, database: LocalDatabase) -> bool:
+        """Drop a database over its own connection, to drop multiple databases concurrently.
+        :param database: the database to drop.
+        :return: whether the database was dropped.
+        """
+        async with database.async_psql() as psql:
+            dropped = await psql.drop_database(database.name)
+
+        logger.debug(f"Dropped database {database.name!r}")
+        return dropped
+
     def remove_venv(self, database: LocalDatabase):
         """Remove the venv linked to this database if not used by any other database."""
         if database.venv is None or not database.venv.exists:
@@ -136,6 +178,8 @@ class DeleteCommand(ListLocalDatabasesMixin, LocalDatabaseCommand):
             logger.debug(f"Virtual environment {database.venv.name!r} is global and cannot be removed")
             return
 
+        self.store.databases.flush()
+
         with database.psql(self.odev.name) as psql, psql.nocache():
             using_venv = psql.query(
                 f"""
@@ -155,16 +199,12 @@ class DeleteCommand(ListLocalDatabasesMixin, LocalDatabaseCommand):
             database.venv.remove()
 
     def remove_filestore(self, database: LocalDatabase):
-        """Remove the filestore linked to this database."""
-        filestore = database.filestore.path
-
-        if filestore is None or not filestore.exists():
-            logger.debug(f"No filestore found for database {database.name!r}")
-            return
-
-        filestore_path = filestore.as_posix()
-        shutil.rmtree(filestore_path)
-
-    def remove_configuration(self, database: LocalDatabase):
-        """Remove references to this database in the database store."""
-        self.store.databases.delete(database)
+        """Move the filestore linked to this database to the trash, to be removed in the background."""
+        database.trash_filestore()
+
+    def remove_configuration(self, *databases: LocalDatabase):
+        """Remove references to these databases in the database store."""
+        names = [database.name for database in databases]
+        self.store.databases.delete(*databases)
+        self.store.facts.delete(*names)
+        self.store.catalogue.discard(*names)
@@ -4,6 +4,7 @@ from typing import Any
 from odev.common import args
 from odev.common.commands import DatabaseCommand
 from odev.common.databases import LocalDatabase, Repository
+from odev.common.restore import StreamingDownload
 
 
 class QuickStartCommand(DatabaseCommand):
@@ -52,19 +53,27 @@ class QuickStartCommand(DatabaseCommand):
             self.odev.run_command("create", "--version", self.args.version, database=self._database)
         else:
             self.odev.run_command("clone", *passthrough_args, database=self._database)
-            dumped = self.odev.run_command(
-                "dump",
-                *(passthrough_args + (["--filestore"] if self.args.filestore else [])),
-                database=self._database,
-            )
-
             dump_file = self.odev.dumps_path / self._database._get_dump_filename(**self.get_dump_filename_kwargs())
+            new_database = LocalDatabase(self.args.name or self._database.name)
 
-            if not dumped or not dump_file.exists():
-                raise self.error(f"Database {self._database.name!r} could not be restored")
+            if dump_file.exists():
+                dumped = self.dump_database(passthrough_args)
 
-            new_database = LocalDatabase(self.args.name or self._database.name)
-            self.odev.run_command("restore", dump_file.as_posix(), database=new_database)
+                if not dumped or not dump_file.exists():
+                    raise self.error(f"Database {self._database.name!r} could not be restored")
+
+                self.odev.run_command("restore", dump_file.as_posix(), database=new_database)
+            else:
+                # Restore the dump while it is being downloaded: choices of the dump command are resolved
+                # in the foreground, only the download of the file is handed over to a background thread
+                with StreamingDownload(dump_file) as download:
+                    dumped = self.dump_database(passthrough_args)
+
+                    if dumped and download.started():
+                        self.odev.run_command("restore", dump_file.as_posix(), database=new_database)
+
+                if not dumped or (download.running and not download.result) or not dump_file.exists():
+                    raise self.error(f"Database {self._database.name!r} could not be restored")
 
             if self._database.repository:
                 if isinstance(self._database.repository, Repository):
@@ -75,6 +84,17 @@ class QuickStartCommand(DatabaseCommand):
 
                 new_database.repository = Repository(repo_name, repo_org)
 
+    def dump_database(self, passthrough_args: list[str]) -> Any:
+        """Dump the selected database to the dumps directory.
+        :param passthrough_args: Arguments to pass to the `dump` command.
+        :return: The result of the `dump` command.
+        """
+        return self.odev.run_command(
+            "dump",
+            *(passthrough_args + (["--filestore"] if self.args.filestore else [])),
+            database=self._database,
+        )
+
     def get_dump_filename_kwargs(self) -> MutableMapping[str, Any]:
         """Return the keyword arguments to pass to Database.get_dump_filename()."""
         return {
@@ -75,6 +75,11 @@ class RenameCommand(LocalDatabaseCommand):
 
     def move_configuration(self):
         """Rename the database in the stored configuration."""
+        self.store.databases.invalidate()
+        self.store.facts.delete(self._database.name)
+        self.store.facts.delete(self.args.name)
+        self.store.snapshots.rename(self._database.name, self.args.name)
+
         with self._database.psql(self.odev.name) as psql:
             psql.query(
                 f"""
@@ -83,3 +88,5 @@ class RenameCommand(LocalDatabaseCommand):
                     WHERE name = '{self._database.name}'
                 """
             )
+
+        self.store.catalogue.refresh()
@@ -4,6 +4,7 @@ from odev.common import args, progress
 from odev.common.commands import DatabaseCommand
 from odev.common.databases import LocalDatabase
 from odev.common.logging import logging
+from odev.common.restore import parse_table_filters
 
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,22 @@ class RestoreCommand(DatabaseCommand):
         Only used on local databases.
         """,
     )
+    filter_tables = args.List(
+        aliases=["--filter-tables"],
+        description="""Comma-separated list of tables whose data should not be restored, i.e. `mail_message,bus_bus`.
+        Append `:<ratio>` to the name of a table to restore a sample of its rows instead, i.e. `mail_message:0.1`.
+        Only the data of tables whose rows are all skipped is filtered out of dumps made with `pg_dump -Fc`.
+        Defaults to the `filter_tables` option of the `restore` section of the configuration file,
+        pass an empty value to restore all data.
+        """,
+    )
+    fast_restore = args.Flag(
+        aliases=["--fast-restore"],
+        description="""Restore with session settings suited to bulk loads, build indexes after data in parallel
+        where the dump format allows and refresh planner statistics in the background afterwards.
+        Report the time spent in each phase of the restore.
+        """,
+    )
 
     _database_allowed_platforms = ["local"]
 
@@ -47,12 +64,25 @@ class RestoreCommand(DatabaseCommand):
         if isinstance(self._database, LocalDatabase) and self.args.neutralize:
             self.odev.run_command("neutralize", database=self._database, history=False)
 
+    @property
+    def table_filters(self) -> dict[str, float]:
+        """Tables whose data should be filtered out of the restored dump, with the ratio of rows to keep."""
+        tables = self.args.filter_tables
+
+        if tables is None:
+            tables = self.config.restore.filter_tables
+
+        try:
+            return parse_table_filters(tables)
+        except ValueError as error:
+            raise self.error(str(error)) from error
+
     def restore_backup(self, file):
         """Restore the backup to the selected database."""
         action: str = f"file {file.name!r} to local database {self._database.name!r}"
 
         with progress.spinner(f"Restoring {action}"):
-            self._database.restore(file)
+            self._database.restore(file, filters=self.table_filters, fast_restore=self.args.fast_restore)
 
         logger.info(f"Restored {action}")
 
@@ -0,0 +1,70 @@
+"""Roll back a local database to a snapshot."""
+
+from odev.common import args, progress
+from odev.common.commands import LocalDatabaseCommand
+from odev.common.logging import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class RollbackCommand(LocalDatabaseCommand):
+    """Roll back a local database and its filestore to a snapshot taken with `odev snapshot`.
+    The database is recreated from the PostgreSQL template of the snapshot, its stored configuration is kept.
+    """
+
+    _name = "rollback"
+    _aliases = ["rb"]
+
+    snapshot_name = args.String(
+        name="name",
+        description="Name of the snapshot to roll back to, defaults to the most recent snapshot of the database.",
+        nargs="?",
+    )
+
+    @property
+    def _database_exists_required(self) -> bool:
+        """Return True if a database has to exist for the command to work,
+        databases deleted while keeping their snapshots can be recreated from them.
+        """
+        return False
+
+    def run(self):
+        snapshot = self.store.snapshots.get(self._database.name, self.args.name)
+
+        if snapshot is None:
+            raise self.error(
+                f"No snapshot {f'{self.args.name!r} ' if self.args.name else ''}"
+                f"available for database {self._database.name!r}"
+            )
+
+        self.ensure_stopped()
+
+        if not self.console.confirm(
+            f"Replace the content of database {self._database.name!r} with snapshot {snapshot.name!r} "
+            f"taken on {snapshot.date.strftime('%Y-%m-%d %X')}?",
+            default=True,
+        ):
+            raise self.error("Command aborted")
+
+        with progress.spinner(f"Rolling back database {self._database.name!r} to snapshot {snapshot.name!r}"):
+            rolled_back = self._database.rollback(snapshot)
+
+        if not rolled_back:
+            raise self.error(f"Failed to roll back database {self._database.name!r} to snapshot {snapshot.name!r}")
+
+        logger.info(f"Rolled back database {self._database.name!r} to snapshot {snapshot.name!r}")
+
+    def ensure_stopped(self):
+        """Stop the database if it is running and the command is forced, databases cannot be replaced
+        while they are in use.
+        """
+        process = self._database.process
+
+        if process is None or not process.is_running:
+            return
+
+        if not self.args.bypass_prompt:
+            raise self.error(f"Database {self._database.name!r} is running, stop it and retry")
+
+        process.kill()
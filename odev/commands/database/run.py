@@ -1,8 +1,15 @@
 """Run an Odoo database locally."""
 
+import json
+from signal import SIGUSR1
+from types import FrameType
+
 from odev.common import args, progress
 from odev.common.commands import OdoobinTemplateCommand
+from odev.common.console import TableHeader
 from odev.common.logging import logging
+from odev.common.odoobin_logs import RequestProfiler
+from odev.common.signal_handling import capture_signals
 from odev.common.version import OdooVersion
 
 
@@ -24,6 +31,17 @@ class RunCommand(OdoobinTemplateCommand):
         If passed without a value, search for a template database with the same name as the new database.
         """
     )
+    profile = args.Flag(
+        aliases=["--profile"],
+        description=f"""Aggregate timings of HTTP requests by route and print percentiles of their total, SQL
+        and Python durations and of their number of queries when odoo-bin exits.
+        Send signal {SIGUSR1.value} (SIGUSR1) to odev to print the summary while odoo-bin is running.
+        """,
+    )
+    profile_export = args.Path(
+        aliases=["--profile-export"],
+        description="Export the timings of HTTP requests aggregated with `--profile` to a JSON file.",
+    )
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -53,6 +71,9 @@ class RunCommand(OdoobinTemplateCommand):
             force=any([self.args.version, self.args.venv, self.args.worktree, self.args.enterprise])
         )
 
+        if self.args.profile or self.args.profile_export:
+            self._request_profiler = RequestProfiler()
+
     @property
     def _database_exists_required(self) -> bool:
         """Return True if a database has to exist for the command to work."""
@@ -76,4 +97,59 @@ class RunCommand(OdoobinTemplateCommand):
         if self.odoobin.is_running:
             raise self.error(f"Database {self._database.name!r} is already running")
 
-        self.odoobin.run(args=self.args.odoo_args, progress=self.odoobin_progress)
+        if self._request_profiler is None:
+            self.odoobin.run(args=self.args.odoo_args, progress=self.odoobin_progress)
+            return
+
+        with capture_signals(SIGUSR1, self._print_requests_profile_handler):
+            self.odoobin.run(args=self.args.odoo_args, progress=self.odoobin_progress)
+
+        self.print_requests_profile()
+
+        if self.args.profile_export:
+            self.export_requests_profile()
+
+    def _print_requests_profile_handler(self, signal_number: int, frame: FrameType | None = None):
+        """Print the summary of HTTP requests timings upon receiving a signal."""
+        self.print_requests_profile()
+
+    def print_requests_profile(self):
+        """Print percentiles of the timings of HTTP requests by route."""
+        summary = self._request_profiler.summary() if self._request_profiler is not None else {}
+
+        if not summary:
+            logger.info("No HTTP requests were served by odoo-bin")
+            return
+
+        def percentiles(stats: dict[str, float], unit: str = "") -> str:
+            return " / ".join(f"{stats[f'p{p}']:.{1 if unit else 0}f}" for p in RequestProfiler.percentiles) + unit
+
+        self.print()
+        self.table(
+            [
+                TableHeader("Route"),
+                TableHeader("Requests", align="right"),
+                TableHeader("Total", align="right"),
+                TableHeader("SQL", align="right"),
+                TableHeader("Python", align="right"),
+                TableHeader("Queries", align="right"),
+            ],
+            [
+                [
+                    route,
+                    str(stats["total"]["count"]),
+                    percentiles(stats["total"], "ms"),
+                    percentiles(stats["sql"], "ms"),
+                    percentiles(stats["python"], "ms"),
+                    percentiles(stats["queries"]),
+                ]
+                for route, stats in summary.items()
+            ],
+            title=f"HTTP requests ({' / '.join(f'p{p}' for p in RequestProfiler.percentiles)})",
+        )
+
+    def export_requests_profile(self):
+        """Export the timings of HTTP requests by route to a JSON file."""
+        summary = self._request_profiler.summary() if self._request_profiler is not None else {}
+        self.args.profile_export.write_text(json.dumps(summary, indent=4))
+        logger.info(f"Exported timings of HTTP requests to {self.args.profile_export}")
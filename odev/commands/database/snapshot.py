@@ -0,0 +1,94 @@
+"""Take a snapshot of a local database."""
+
+from datetime import datetime
+
+from odev.common import args, progress
+from odev.common.commands import LocalDatabaseCommand
+from odev.common.console import TableHeader
+from odev.common.logging import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCommand(LocalDatabaseCommand):
+    """Take a snapshot of a local database and its filestore, to roll back to it later with `odev rollback`.
+    Snapshots are kept as PostgreSQL templates, and filestores are cloned without copying their content
+    on filesystems supporting it. Only the most recent snapshots of each database are kept,
+    as configured in the `snapshots.retention` setting.
+    """
+
+    _name = "snapshot"
+    _aliases = ["snap"]
+
+    snapshot_name = args.String(
+        name="name",
+        description="Name of the snapshot, defaults to the current date and time.",
+        nargs="?",
+    )
+    list_snapshots = args.Flag(
+        aliases=["-l", "--list"],
+        description="List the snapshots of the database instead of taking a new one.",
+    )
+
+    @property
+    def _database_exists_required(self) -> bool:
+        """Return True if a database has to exist for the command to work."""
+        return not self.args.list_snapshots
+
+    def run(self):
+        if self.args.list_snapshots:
+            self.show_snapshots()
+            return
+
+        self.ensure_stopped()
+        name = self.args.name or datetime.now().strftime("%Y-%m-%d-%H%M%S")
+
+        with progress.spinner(f"Taking snapshot {name!r} of database {self._database.name!r}"):
+            self._database.snapshot(name)
+
+        logger.info(f"Took snapshot {name!r} of database {self._database.name!r}")
+        self.prune_snapshots()
+
+    def ensure_stopped(self):
+        """Stop the database if it is running and the command is forced, the content of databases
+        cannot be copied while they are in use.
+        """
+        process = self._database.process
+
+        if process is None or not process.is_running:
+            return
+
+        if not self.args.bypass_prompt:
+            raise self.error(f"Database {self._database.name!r} is running, stop it and retry")
+
+        process.kill()
+
+    def prune_snapshots(self):
+        """Drop the oldest snapshots of the database exceeding the configured retention."""
+        for snapshot in self.store.snapshots.all(self._database.name)[self.config.snapshots.retention :]:
+            with progress.spinner(f"Removing snapshot {snapshot.name!r} of database {self._database.name!r}"):
+                self._database.drop_snapshot(snapshot)
+
+            logger.info(f"Removed snapshot {snapshot.name!r} exceeding the retention of database snapshots")
+
+    def show_snapshots(self):
+        """List the snapshots of the database, the most recent first."""
+        snapshots = self.store.snapshots.all(self._database.name)
+
+        if not snapshots:
+            raise self.error(f"No snapshot available for database {self._database.name!r}")
+
+        headers = [
+            TableHeader("Name"),
+            TableHeader("Date"),
+            TableHeader("Template"),
+            TableHeader("Filestore"),
+        ]
+        rows = [
+            [snapshot.name, snapshot.date.strftime("%Y-%m-%d %X"), snapshot.template, snapshot.filestore or ""]
+            for snapshot in snapshots
+        ]
+
+        self.print()
+        self.table(headers, rows, title=f"Snapshots of {self._database.name!r}")
@@ -1,17 +1,24 @@
 """Run unit tests on an empty local Odoo database."""
 
 import re
+import shlex
+import socket
 from collections import defaultdict
 from collections.abc import Mapping, MutableMapping
 from pathlib import Path
+from subprocess import CalledProcessError
 from typing import cast
 
-from odev.common import args, string
+from rich.markup import escape
+
+from odev.common import args, bash, progress, string
 from odev.common.commands import OdoobinCommand
 from odev.common.console import TableHeader
 from odev.common.databases import LocalDatabase
 from odev.common.logging import logging
 from odev.common.odoobin import OdoobinProcess
+from odev.common.signal_handling import capture_signals
+from odev.common.version import OdooVersion
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +44,15 @@ class TestCommand(OdoobinCommand):
         default=["base"],
         description="Comma-separated list of modules to install for testing. If not set, install the base module.",
     )
+    jobs = args.Integer(
+        aliases=["-j", "--jobs"],
+        default=1,
+        description="""
+        Split tests into shards and run them concurrently on this number of databases cloned from a common template.
+        Test tags are distributed across shards if any, modules being installed once beforehand,
+        otherwise each shard installs and tests a subset of the selected modules.
+        """,
+    )
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -56,6 +72,15 @@ class TestCommand(OdoobinCommand):
         self.test_buffer: list[str] = []
         """Buffer to store the output of odoo-bin running on the test database."""
 
+        self.shard_databases: list[LocalDatabase] = []
+        """Databases cloned from the test database to run shards of tests concurrently."""
+
+        self.shard_buffers: dict[str, list[str]] = {}
+        """Buffers to store the output of odoo-bin running on each shard database, by database name."""
+
+        self.shard_levels: dict[str, str] = {}
+        """Log-level of the last line printed by odoo-bin on each shard database, by database name."""
+
         self.last_level = ""
 
     def generate_test_database_name(self) -> str:
@@ -90,6 +115,20 @@ class TestCommand(OdoobinCommand):
         args.append(self.test_database.name)
         self.odev.run_command("create", *args)
 
+    def prepare_test_process(self, database: LocalDatabase | None = None) -> OdoobinProcess:
+        """Return the odoo-bin process to use for running tests on the test database.
+
+        :param database: The database to run tests on, defaults to the test database.
+        """
+        database = database or self.test_database
+        odoobin = database.process or OdoobinProcess(database)
+        odoobin.with_version(self._database.version)
+        odoobin.with_edition(self._database.edition)
+        odoobin.with_venv(self.venv)
+        odoobin.with_worktree(self.worktree)
+        odoobin.additional_addons_paths = cast(OdoobinProcess, self.odoobin).additional_addons_paths
+        return odoobin
+
     def run_test_database(self):
         """Run the test database."""
         args = ["--stop-after-init", "--test-enable"]
@@ -108,13 +147,7 @@ class TestCommand(OdoobinCommand):
         if not self.test_database.exists:
             self.create_test_database()
 
-        odoobin = self.test_database.process or OdoobinProcess(self.test_database)
-        odoobin.with_version(self._database.version)
-        odoobin.with_edition(self._database.edition)
-        odoobin.with_venv(self.venv)
-        odoobin.with_worktree(self.worktree)
-
-        odoobin.additional_addons_paths = cast(OdoobinProcess, self.odoobin).additional_addons_paths
+        odoobin = self.prepare_test_process()
 
         try:
             odoobin.run(args=args, progress=self.odoobin_progress)
@@ -124,68 +157,250 @@ class TestCommand(OdoobinCommand):
                 self.test_database.process.kill(hard=True)
             raise self.error(str(error)) from error
 
+    def split_test_shards(self) -> list[tuple[list[str], list[str]]]:
+        """Split the tests to run into shards of modules to install and test tags to run.
+        Inclusion tags are distributed across shards if any, modules being installed beforehand in the test database
+        the shards are cloned from; exclusion tags are given to every shard. Otherwise modules are distributed
+        across shards and installed by each of them.
+
+        :return: A list of tuples containing the modules to install and the test tags to run for each shard.
+        """
+        if self.test_tags:
+            inclusions = [tag for tag in self.test_tags if not tag.startswith("-")]
+            exclusions = [tag for tag in self.test_tags if tag.startswith("-")]
+
+            if not inclusions:
+                return [([], exclusions)]
+
+            count = min(self.args.jobs, len(inclusions))
+            return [([], inclusions[index::count] + exclusions) for index in range(count)]
+
+        count = min(self.args.jobs, len(self.args.modules))
+        shards = [self.args.modules[index::count] for index in range(count)]
+        return [(modules, [f"/{module}" for module in modules]) for modules in shards]
+
+    def install_test_modules(self):
+        """Install the modules to test in the test database once, for the shards cloned from it
+        to only run their tests. Tests run at install are run at that time, and excluded from shards
+        since modules are not installed again.
+        """
+        args = ["--stop-after-init", "--test-enable"]
+        args.extend(["--test-tags", ",".join([*self.test_tags, "-post_install"])])
+        args.extend(["--init", ",".join(self.args.modules)])
+        args.extend(self.args.odoo_args or [])
+
+        try:
+            self.prepare_test_process().run(args=args, progress=self.odoobin_progress)
+        except RuntimeError as error:
+            if self.test_database.process is not None:
+                self.test_database.process.kill(hard=True)
+            raise self.error(str(error)) from error
+
+    def create_shard_databases(self, count: int):
+        """Clone the test database into as many databases as there are shards to run.
+
+        :param count: The number of shard databases to create.
+        """
+        for index in range(count):
+            database = LocalDatabase(f"{self.test_database.name}-{index + 1}")
+            args = ["--bare", "--from-template", self.test_database.name]
+
+            if self._database.version is not None:
+                args.extend(["--version", str(self._database.version)])
+
+            args.append(database.name)
+            self.odev.run_command("create", *args)
+            self.shard_databases.append(database)
+
+    def run_test_shards(self):
+        """Run shards of tests concurrently on databases cloned from the test database,
+        each shard being run by a distinct odoo-bin process listening on its own HTTP port.
+        """
+        if self.test_files:
+            raise self.error("Running tests from files cannot be split across shards, run without `--jobs`")
+
+        if self._database.version is not None and self._database.version < OdooVersion("12.0"):
+            raise self.error("Running tests in shards requires Odoo 12.0 or higher, run without `--jobs`")
+
+        shards = self.split_test_shards()
+
+        if not self.test_database.exists:
+            self.create_test_database()
+
+        if self.test_tags:
+            self.install_test_modules()
+
+        self.create_shard_databases(len(shards))
+        odoobin = self.prepare_test_process()
+        self.test_database.process = odoobin
+
+        with progress.spinner(f"Preparing odoo-bin version {str(odoobin.version)!r} for {len(shards)} test shards"):
+            odoobin.prepare_odoobin()
+
+        if any(odoobin.addons_debuggers()):
+            raise self.error("Interactive debuggers detected in addons, remove breakpoints or run without `--jobs`")
+
+        commands: list[str] = []
+
+        for database, (modules, tags) in zip(self.shard_databases, shards, strict=True):
+            commands.append(self.prepare_shard_command(database, modules, tags))
+            self.shard_buffers[database.name] = []
+            logger.info(
+                f"Running tests shard on database {database.name!r}:\n"
+                + string.join_bullet(
+                    [f"Modules: {', '.join(modules or self.args.modules)}", f"Tags: {', '.join(tags)}"]
+                )
+            )
+
+        with capture_signals():
+            try:
+                for index, line in bash.stream_parallel(commands):
+                    self.odoobin_shard_progress(self.shard_databases[index].name, line)
+            except CalledProcessError as error:
+                logger.debug(f"Shard exited with an error: {error.cmd}")
+                logger.error("Odoo exited with an error in at least one shard, check the output above")
+
+        self.print_tests_results()
+
+    def prepare_shard_command(self, database: LocalDatabase, modules: list[str], tags: list[str]) -> str:
+        """Build the command running a shard of tests on its own database and HTTP port.
+        Database options found in additional odoo-bin arguments are dropped for the shard to run on its database.
+
+        :param database: The database of the shard.
+        :param modules: The modules to install in the shard, if any.
+        :param tags: The test tags to run in the shard.
+        :return: The command line running odoo-bin for the shard.
+        """
+        args = ["--stop-after-init", "--test-enable"]
+        args.extend(["--test-tags", ",".join(tags)])
+
+        if modules:
+            args.extend(["--init", ",".join(modules)])
+
+        skip_value = False
+
+        for arg in self.args.odoo_args or []:
+            if skip_value:
+                skip_value = False
+            elif arg in ("-d", "--database"):
+                skip_value = True
+            elif not re.match(r"^(?:-d.|--database=)", arg):
+                args.append(arg)
+
+        args.extend(["--http-port", str(self._free_port())])
+        odoobin = self.prepare_test_process(database)
+        return shlex.join(
+            [odoobin.venv.python.as_posix(), odoobin.odoobin_path.as_posix(), *odoobin.prepare_odoobin_args(args)]
+        )
+
+    @staticmethod
+    def _free_port() -> int:
+        """Return a TCP port available for odoo-bin to listen on."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("", 0))
+            return sock.getsockname()[1]
+
     def odoobin_progress(self, line: str):
         """Handle odoo-bin output and fetch information real-time."""
         if re.match(r"^(i?pu?db)?>+", line):
             raise self.error("Debugger detected in odoo-bin output, remove breakpoints and try again")
 
+        self.last_level = self._handle_test_log_line(line, self.test_database.name, self.last_level, self.test_buffer)
+
+    def odoobin_shard_progress(self, database: str, line: str):
+        """Handle odoo-bin output of a shard of tests and fetch information real-time.
+
+        :param database: The name of the database the shard is running on.
+        :param line: The line output by odoo-bin.
+        """
+        self.shard_levels[database] = self._handle_test_log_line(
+            line,
+            database,
+            self.shard_levels.get(database, ""),
+            self.shard_buffers[database],
+        )
+
+    def _handle_test_log_line(self, line: str, database: str, last_level: str, buffer: list[str]) -> str:
+        """Print a line of odoo-bin output and store it in a buffer if it relates to a failing test.
+
+        :param line: The line output by odoo-bin.
+        :param database: The name of the database tests are run on.
+        :param last_level: The log-level of the previous line output by the same process.
+        :param buffer: The buffer to append the line to if it relates to a failing test.
+        :return: The log-level of the line.
+        """
         problematic_test_levels = ("warning", "error", "critical")
         match = self._parse_progress_log_line(line)
 
         if match is None:
-            if self.last_level in problematic_test_levels:
-                self.test_buffer.append(line)
+            if last_level in problematic_test_levels:
+                buffer.append(line)
 
-            color = f"logging.level.{self.last_level}" if self.last_level in problematic_test_levels else "color.black"
-            self.print(string.stylize(line, color), highlight=False, soft_wrap=False)
-            return
+            if self._is_log_level_displayed(last_level):
+                color = f"logging.level.{last_level}" if last_level in problematic_test_levels else "color.black"
+                self.console.print_batched(string.stylize(escape(line), color))
 
-        self.last_level = match.group("level").lower()
+            return last_level
 
-        if self.last_level in problematic_test_levels and match.group("database") == self.test_database.name:
-            self.test_buffer.append(line)
+        level = match.group("level").lower()
+
+        if level in problematic_test_levels and match.group("database") == database:
+            buffer.append(line)
 
         self._print_progress_log_line(match)
+        return level
 
     def run(self):
         """Run the command."""
-        self.run_test_database()
+        if self.args.jobs > 1:
+            self.run_test_shards()
+        else:
+            self.run_test_database()
 
     def cleanup(self):
-        """Delete the test database."""
-        if self.test_database.exists:
-            self.test_database.whitelisted = False
-            self.odev.run_command(
-                "delete",
-                *[
-                    "--force",
-                    *["--keep", "venv"],
-                    self.test_database.name,
-                ],
-            )
+        """Delete the test database and the databases of its shards."""
+        super().cleanup()
+
+        for database in [*self.shard_databases, self.test_database]:
+            if database.exists:
+                database.whitelisted = False
+                self.odev.run_command(
+                    "delete",
+                    *[
+                        "--force",
+                        *["--keep", "venv"],
+                        database.name,
+                    ],
+                )
 
     def print_tests_results(self):
         """Print the results of the tests."""
-        if not self.test_buffer:
+        buffers = [buffer for buffer in [self.test_buffer, *self.shard_buffers.values()] if buffer]
+
+        if not buffers:
             logger.info("No failing tests, congratulations!")
             return
 
-        if self.ODOO_LOG_REGEX.match(self.test_buffer.pop()) is None:
-            self.error("Cannot fetch tests results, check the odoo-bin output for more information")
-            return
+        for buffer in buffers:
+            if self.ODOO_LOG_REGEX.match(buffer.pop()) is None:
+                self.error("Cannot fetch tests results, check the odoo-bin output for more information")
+                return
 
-        for test in self.__tests_details():
+        for test in (test for buffer in buffers for test in self.__tests_details(buffer)):
             self.__print_test_details(test)
 
         self.print()
 
-    def __tests_details(self) -> list[MutableMapping[str, str]]:
-        """Loop through the tests buffer and compile a list of tests information."""
+    def __tests_details(self, buffer: list[str]) -> list[MutableMapping[str, str]]:
+        """Loop through a tests buffer and compile a list of tests information.
+
+        :param buffer: The buffer of odoo-bin output lines related to failing tests.
+        """
         tests: list[MutableMapping[str, str]] = []
         test: MutableMapping[str, str] = defaultdict(str)
         trace: list[str] = []
 
-        for line in self.test_buffer:
+        for line in buffer:
             match = self.ODOO_LOG_REGEX.match(line)
 
             if match is None:  # This is part of a traceback or a line printed outside of the logger
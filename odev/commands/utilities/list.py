@@ -1,13 +1,14 @@
 """Gets help about commands."""
 
-from collections.abc import Callable, MutableMapping, Sequence
+import asyncio
+from collections.abc import Awaitable, Callable, MutableMapping, Sequence
 from dataclasses import dataclass
 from typing import (
     Any,
     Literal,
 )
 
-from odev.common import args, progress, string
+from odev.common import args, concurrency, progress, string
 from odev.common.commands import Command
 from odev.common.console import TableHeader
 from odev.common.databases import LocalDatabase
@@ -43,6 +44,11 @@ class Mapped:
     of the rendered table.
     """
 
+    async_value: Callable[[LocalDatabase], Awaitable[Any]] | None = None
+    """An optional lambda expression to fetch the value asynchronously, used instead of `value`
+    to read values of multiple databases concurrently.
+    """
+
 
 STATUS_RUNNING = string.stylize("⬤", "color.green")
 STATUS_STOPPED = string.stylize("⬤", "color.black")
@@ -83,6 +89,7 @@ TABLE_MAPPING: list[Mapped] = [
         justify="right",
         format=lambda value: string.bytes_size(value or 0),
         total=True,
+        async_value=lambda database: database.async_size(),
     ),
     Mapped(
         value=lambda database: database.filestore.size if database.filestore else 0,
@@ -118,6 +125,7 @@ TABLE_MAPPING: list[Mapped] = [
         justify=None,
         format=lambda value: string.ago(value) if value else "",
         total=False,
+        async_value=lambda database: database.async_last_date(),
     ),
     Mapped(
         value=lambda database: database.whitelisted,
@@ -177,11 +185,14 @@ class ListCommand(ListLocalDatabasesMixin, Command):
         """,
     )
 
+    _odoo_databases: set[str] | None = None
+    """Names of local Odoo databases, read from the catalogue of databases in the datastore."""
+
     def run(self) -> None:
         with progress.spinner("Listing databases"):
             databases = self.list_databases(
                 predicate=lambda database: (not self.args.expression or self.args.expression.search(database))
-                and (self.args.show_all or (LocalDatabase(database).is_odoo and not database.endswith(":template")))
+                and (self.args.show_all or (self.is_odoo(database) and not database.endswith(":template")))
             )
 
             if not databases:
@@ -203,6 +214,21 @@ class ListCommand(ListLocalDatabasesMixin, Command):
         self.console.print(string.stylize(f"{STATUS_RUNNING} Running\n{STATUS_STOPPED} Stopped", "color.black"))
         self.console.print()
 
+    def is_odoo(self, database: str) -> bool:
+        """Check whether a database is an Odoo database from the catalogue of local databases,
+        refreshed once per run instead of connecting to each database.
+        """
+        if self._odoo_databases is None:
+            self._odoo_databases = set(self.store.catalogue.refresh())
+
+        return database in self._odoo_databases
+
+    async def get_async_values(self, database: LocalDatabase) -> dict[int, Any]:
+        """Fetch the values of a database that can be read asynchronously, by index of their column."""
+        indexes = [index for index, mapped in enumerate(TABLE_MAPPING) if mapped.async_value is not None]
+        values = await asyncio.gather(*(TABLE_MAPPING[index].async_value(database) for index in indexes))  # type: ignore [misc]
+        return dict(zip(indexes, values, strict=True))
+
     def get_table_data(self, databases: Sequence[str]) -> tuple[list[TableHeader], list[list[Any]], list[str]]:
         """Get the table data for the list of databases."""
         headers: list[TableHeader] = []
@@ -213,16 +239,18 @@ class ListCommand(ListLocalDatabasesMixin, Command):
             headers.append(TableHeader(title=mapped.title or "", align=mapped.justify or "left"))
             totals.append(0)
 
-        for database in databases:
+        local_databases = [LocalDatabase(database) for database in databases]
+        async_values = concurrency.run(self.get_async_values(database) for database in local_databases)
+
+        for database, values in zip(local_databases, async_values, strict=True):
             row: list[Any] = []
 
-            with LocalDatabase(database) as db:
-                for index, mapped in enumerate(TABLE_MAPPING):
-                    value = mapped.value(db)
-                    row.append(mapped.format(value) if callable(mapped.format) else value)
+            for index, mapped in enumerate(TABLE_MAPPING):
+                value = values[index] if index in values else mapped.value(database)
+                row.append(mapped.format(value) if callable(mapped.format) else value)
 
-                    if mapped.total:
-                        totals[index] += value or 0
+                if mapped.total:
+                    totals[index] += value or 0
 
             rows.append(row)
 
@@ -0,0 +1,239 @@
+"""Query odoo-bin logs captured during past runs."""
+
+from pathlib import Path
+from typing import Any
+
+from odev.common import args, string
+from odev.common.commands import Command
+from odev.common.console import TableHeader
+from odev.common.logging import logging
+from odev.common.odoobin_logs import ODOO_LOG_LEVELS, LogCapture
+
+
+logger = logging.getLogger(__name__)
+
+
+class LogsCommand(Command):
+    """Query the logs of odoo-bin captured while running `run`, `test` and other commands
+    spawning an odoo-bin process. By default, show records of the most recent run.
+    """
+
+    _name = "logs"
+    _aliases = ["log"]
+
+    capture = args.String(
+        nargs="?",
+        description="""Name or path of the captured run to query, defaults to the most recent one.
+        Use `--list` to show available runs.
+        """,
+    )
+    list_captures = args.Flag(aliases=["-L", "--list"], description="List captured runs.")
+    level = args.String(
+        aliases=["-l", "--level"],
+        choices=list(ODOO_LOG_LEVELS),
+        description="Only show records of this log-level or higher.",
+    )
+    logger_name = args.String(
+        name="logger",
+        aliases=["--logger"],
+        description="Only show records from loggers starting with this name.",
+    )
+    slow = args.Integer(
+        aliases=["-s", "--slow"],
+        description="Show HTTP requests that took longer than this number of milliseconds, slowest first.",
+    )
+    top = args.Integer(
+        aliases=["-q", "--top-queries"],
+        description="Show this number of endpoints executing the most SQL queries per request.",
+    )
+    limit = args.Integer(
+        aliases=["-n", "--limit"],
+        default=50,
+        description="Maximum number of records to show.",
+    )
+
+    def run(self):
+        if self.args.list_captures:
+            return self.print_captures()
+
+        with LogCapture(self.capture_path) as capture:
+            capture.index()
+            metadata = capture.metadata
+            title = f"{metadata.get('command', 'odoo-bin')} {metadata.get('database', '')} ({metadata.get('date', '')})"
+
+            if self.args.top is not None:
+                return self.print_top_queries(capture, title)
+
+            if self.args.slow is not None:
+                return self.print_slow_requests(capture, title)
+
+            return self.print_records(capture, title)
+
+    @property
+    def capture_path(self) -> Path:
+        """Path to the log capture file to query."""
+        captures = LogCapture.list_captures(self.odev.logs_path)
+
+        if self.args.capture is None:
+            if not captures:
+                raise self.error("No odoo-bin logs were captured yet")
+
+            return captures[0]
+
+        path = Path(self.args.capture)
+
+        if path.is_file():
+            return path
+
+        for capture in captures:
+            if capture.stem == self.args.capture or capture.stem.startswith(f"{self.args.capture}-"):
+                return capture
+
+        raise self.error(f"No captured odoo-bin logs found for {self.args.capture!r}")
+
+    def print_captures(self):
+        """Print the list of captured runs."""
+        rows: list[list[Any]] = []
+
+        for path in LogCapture.list_captures(self.odev.logs_path):
+            with LogCapture(path) as capture:
+                metadata = capture.metadata
+                rows.append(
+                    [
+                        path.stem,
+                        metadata.get("command", ""),
+                        metadata.get("database", ""),
+                        metadata.get("date", ""),
+                        string.bytes_size(path.stat().st_size),
+                    ]
+                )
+
+        if not rows:
+            raise self.error("No odoo-bin logs were captured yet")
+
+        self.table(
+            [
+                TableHeader("Run"),
+                TableHeader("Command"),
+                TableHeader("Database", style="color.purple"),
+                TableHeader("Date"),
+                TableHeader("Size", align="right"),
+            ],
+            rows,
+        )
+
+    def print_records(self, capture: LogCapture, title: str):
+        """Print log records matching the filters, most recent last."""
+        conditions, params = ["1 = 1"], []
+
+        if self.args.level is not None:
+            conditions.append("severity >= ?")
+            params.append(ODOO_LOG_LEVELS[self.args.level])
+
+        if self.args.logger is not None:
+            conditions.append("logger LIKE ?")
+            params.append(f"{self.args.logger}%")
+
+        rows = capture.query(
+            f"""
+            SELECT time, level, database, logger, description
+            FROM (
+                SELECT rowid, * FROM records
+                WHERE {" AND ".join(conditions)}
+                ORDER BY rowid DESC
+                LIMIT ?
+            )
+            ORDER BY rowid
+            """,  # noqa: S608 - only static conditions are formatted in the query
+            [*params, self.args.limit],
+        )
+
+        if not rows:
+            raise self.error("No log records match the given filters")
+
+        self.table(
+            [
+                TableHeader("Time", style="color.black"),
+                TableHeader("Level"),
+                TableHeader("Database", style="color.purple"),
+                TableHeader("Logger", style="color.black"),
+                TableHeader("Message"),
+            ],
+            [[str(value) for value in row] for row in rows],
+            title=title,
+        )
+
+    def print_slow_requests(self, capture: LogCapture, title: str):
+        """Print HTTP requests slower than the threshold, slowest first."""
+        rows = capture.query(
+            """
+            SELECT time, verb, url, code, time_query + time_python AS time_total, time_query, count_query, time_python
+            FROM records
+            WHERE url IS NOT NULL AND time_query + time_python >= ?
+            ORDER BY time_total DESC
+            LIMIT ?
+            """,
+            [self.args.slow / 1000, self.args.limit],
+        )
+
+        if not rows:
+            raise self.error(f"No HTTP requests took longer than {self.args.slow}ms")
+
+        self.table(
+            [
+                TableHeader("Time", style="color.black"),
+                TableHeader("Verb"),
+                TableHeader("URL"),
+                TableHeader("Code", align="right"),
+                TableHeader("Total (s)", align="right"),
+                TableHeader("SQL (s)", align="right"),
+                TableHeader("Queries", align="right"),
+                TableHeader("Python (s)", align="right"),
+            ],
+            [
+                [time, verb, url, str(code), f"{total:.3f}", f"{sql:.3f}", str(count), f"{python:.3f}"]
+                for time, verb, url, code, total, sql, count, python in rows
+            ],
+            title=title,
+        )
+
+    def print_top_queries(self, capture: LogCapture, title: str):
+        """Print the endpoints executing the most SQL queries per request."""
+        rows = capture.query(
+            """
+            SELECT
+                verb,
+                CASE WHEN instr(url, '?') > 0 THEN substr(url, 1, instr(url, '?') - 1) ELSE url END AS endpoint,
+                COUNT(*),
+                AVG(count_query),
+                MAX(count_query),
+                SUM(count_query),
+                AVG(time_query)
+            FROM records
+            WHERE url IS NOT NULL
+            GROUP BY verb, endpoint
+            ORDER BY AVG(count_query) DESC
+            LIMIT ?
+            """,
+            [self.args.top],
+        )
+
+        if not rows:
+            raise self.error("No HTTP requests were captured")
+
+        self.table(
+            [
+                TableHeader("Verb"),
+                TableHeader("Endpoint"),
+                TableHeader("Requests", align="right"),
+                TableHeader("Avg. queries", align="right"),
+                TableHeader("Max. queries", align="right"),
+                TableHeader("Total queries", align="right"),
+                TableHeader("Avg. SQL (s)", align="right"),
+            ],
+            [
+                [verb, endpoint, str(count), f"{average:.1f}", str(maximum), str(total), f"{sql:.3f}"]
+                for verb, endpoint, count, average, maximum, total, sql in rows
+            ],
+            title=title,
+        )
@@ -0,0 +1,80 @@
+"""Manage the background odev server."""
+
+import sys
+import time
+from typing import Any
+
+from odev.common import args, bash, string
+from odev.common.commands import Command
+from odev.common.logging import logging
+from odev.common.progress import spinner
+from odev.common.server import OdevServer
+
+
+logger = logging.getLogger(__name__)
+
+
+SERVER_START_TIMEOUT = 30
+"""Maximum number of seconds to wait for the server to accept requests."""
+
+SERVER_POLL_INTERVAL = 0.1
+"""Interval in seconds between two checks of whether a starting server accepts requests."""
+
+
+class ServerCommand(Command):
+    """Start a background odev server keeping the framework loaded between commands.
+    While the server runs, commands are forwarded to it and start without reloading odev,
+    its plugins and its configuration. The server exits by itself after being idle for an hour.
+    """
+
+    _name = "server"
+    _exclusive_arguments = [("stop", "status", "foreground")]
+
+    stop = args.Flag(aliases=["--stop"], description="Stop the running server.")
+    status = args.Flag(aliases=["--status"], description="Show whether the server is running.")
+    foreground = args.Flag(
+        aliases=["--foreground"],
+        description="Serve commands from the current process instead of starting a background server.",
+    )
+
+    def run(self):
+        server = OdevServer()
+
+        if self.args.foreground:
+            return server.serve()
+
+        status = server.request("ping")
+
+        if self.args.status or self.args.stop:
+            return self.manage(server, status)
+
+        if status is not None:
+            return logger.info(f"Odev server is already running with pid {status['pid']}")
+
+        return self.start(server)
+
+    def manage(self, server: OdevServer, status: dict[str, Any] | None):
+        """Show the status of the running server or stop it."""
+        if status is None:
+            return logger.info("Odev server is not running")
+
+        if self.args.stop:
+            server.request("stop")
+            return logger.info("Odev server stopped")
+
+        uptime = string.seconds_to_time(int(status["uptime"]))
+        return logger.info(f"Odev server is running with pid {status['pid']} for {uptime}")
+
+    def start(self, server: OdevServer):
+        """Start the server in a detached process and wait for it to accept requests."""
+        process = bash.detached(f"{sys.executable} {server.main_path} {self._name} --foreground")
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+
+        with spinner("Starting odev server"):
+            while (status := server.request("ping")) is None:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise self.error("Odev server did not start")
+
+                time.sleep(SERVER_POLL_INTERVAL)
+
+        logger.info(f"Odev server started with pid {status['pid']}")
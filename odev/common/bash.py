@@ -9,26 +9,32 @@ import shlex
 import sys
 import termios
 import tty
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 from subprocess import (
     DEVNULL,
+    PIPE,
+    STDOUT,
     CalledProcessError,
     CompletedProcess,
     Popen,
     run as run_subprocess,
 )
+from typing import IO, cast
 
 from odev.common.console import console
 from odev.common.logging import logging
 
 
-__all__ = ["detached", "execute", "stream"]
+__all__ = ["detached", "execute", "stream", "stream_parallel"]
 
 
 logger = logging.getLogger(__name__)
 
 CTRL_C, CTRL_D = b"\x03", b"\x04"
 
+STREAM_READ_SIZE = 65536
+"""Maximum number of bytes to read at once from the output of a streamed process."""
+
 global sudo_password  # noqa: PLW0604
 sudo_password: str | None = None
 
@@ -61,6 +67,38 @@ def __run_command(command: str, capture: bool = True, sudo_password: str | None
     )
 
 
+def __read_lines(descriptor: int, chunk: memoryview, buffer: bytearray) -> list[str] | None:
+    """Read a block of output from a file descriptor and return the lines it completes.
+    Incomplete lines, including partial UTF-8 sequences, are kept in `buffer` until the next read.
+
+    :param int descriptor: The file descriptor to read from.
+    :param memoryview chunk: Reusable memory to read into.
+    :param bytearray buffer: Output received but not yet returned as complete lines.
+    :return: The lines completed by this read, or `None` if the end of the output was reached.
+    :rtype: list[str] | None
+    """
+    try:
+        size = os.readv(descriptor, [chunk])
+    except OSError:
+        # Reading from a pty whose other end was closed raises EIO instead of returning EOF
+        return None
+
+    if not size:
+        return None
+
+    start = len(buffer)
+    buffer += chunk[:size]
+    end = buffer.rfind(b"\n", start)
+
+    if end < 0:
+        return []
+
+    # Newlines cannot appear inside a multibyte UTF-8 sequence, so complete lines always decode fully
+    lines = buffer[:end].decode(errors="replace").split("\n")
+    del buffer[: end + 1]
+    return lines
+
+
 def __raise_or_log(exception: CalledProcessError, do_raise: bool) -> None:
     """Raise or log an exception.
 
@@ -141,7 +179,7 @@ def detached(command: str) -> Popen[bytes]:
     return Popen(command, shell=True, start_new_session=True, stdout=DEVNULL, stderr=DEVNULL)  # noqa: S602 - intentional use of shell=True
 
 
-def stream(command: str) -> Generator[str, None, None]:  # noqa: PLR0912
+def stream(command: str) -> Generator[str, None, None]:
     """Execute a command in the operating system and stream its output line by line.
     :param str command: The command to execute.
     """
@@ -161,6 +199,12 @@ def stream(command: str) -> Generator[str, None, None]:  # noqa: PLR0912
 
     original_tty = termios.tcgetattr(sys.stdin)
     tty.setraw(sys.stdin.fileno())
+
+    # Keep output post-processing so that newlines printed while streaming, possibly in batches,
+    # still return the cursor to the beginning of the line
+    raw_tty = termios.tcgetattr(sys.stdin)
+    raw_tty[tty.OFLAG] |= termios.OPOST
+    termios.tcsetattr(sys.stdin, termios.TCSANOW, raw_tty)
     master, slave = pty.openpty()
 
     try:
@@ -173,7 +217,8 @@ def stream(command: str) -> Generator[str, None, None]:  # noqa: PLR0912
             universal_newlines=True,
         )
 
-        received_buffer: bytes = b""
+        chunk = memoryview(bytearray(STREAM_READ_SIZE))
+        buffer = bytearray()
 
         while process.poll() is None:
             rlist, _, _ = select.select([sys.stdin, master], [], [], 0.1)
@@ -193,25 +238,19 @@ def stream(command: str) -> Generator[str, None, None]:  # noqa: PLR0912
 
             # Output received from process, yield for further processing
             if master in rlist:
-                received = os.read(master, 1)
+                yield from __read_lines(master, chunk, buffer) or []
 
-                if not received:
-                    continue
+        # Yield the output written by the process right before exiting
+        while select.select([master], [], [], 0)[0]:
+            lines = __read_lines(master, chunk, buffer)
 
-                if received != b"\n":
-                    received_buffer += received
-                    continue
+            if lines is None:
+                break
 
-                yield received_buffer.decode()
-                received_buffer = b""
+            yield from lines
 
-                try:
-                    os.write(sys.stdout.fileno(), b"\r")
-                except OSError:
-                    if hasattr(sys.stdout, "buffer"):
-                        sys.stdout.buffer.write(b"\r")
-                    else:
-                        sys.stdout.write("\r")
+        if buffer:
+            yield buffer.decode(errors="replace")
 
     finally:
         os.close(slave)
@@ -219,3 +258,57 @@ def stream(command: str) -> Generator[str, None, None]:  # noqa: PLR0912
         termios.tcsetattr(sys.stdin, termios.TCSADRAIN, original_tty)
         if process.returncode:
             raise CalledProcessError(process.returncode, command)
+
+
+def stream_parallel(commands: Sequence[str]) -> Generator[tuple[int, str], None, None]:
+    """Execute multiple commands concurrently in the operating system and stream their output
+    line by line, in the order lines are received.
+    Commands do not share a TTY with the current process, interactive input is not supported.
+
+    **Warning** If using this method with user input, use `shlex.quote` to prevent command injection.
+
+    :param commands: The commands to execute.
+    :return: A generator of tuples containing the index of the command in `commands`
+        and a line of its output.
+    :raise CalledProcessError: If any of the commands exited with a non-zero return code,
+        raised once all commands have completed.
+    """
+    processes: list[Popen[bytes]] = []
+    buffers: dict[int, bytearray] = {}
+    chunk = memoryview(bytearray(STREAM_READ_SIZE))
+
+    for command in commands:
+        logger.debug(f"Streaming process: {shlex.quote(command)}")
+        processes.append(Popen(command, shell=True, stdout=PIPE, stderr=STDOUT, stdin=DEVNULL))  # noqa: S602 - intentional use of shell=True
+
+    descriptors = {cast(IO[bytes], process.stdout).fileno(): index for index, process in enumerate(processes)}
+
+    try:
+        while descriptors:
+            rlist, _, _ = select.select(list(descriptors), [], [], 0.1)
+
+            for descriptor in rlist:
+                index = descriptors[descriptor]
+                lines = __read_lines(descriptor, chunk, buffers.setdefault(index, bytearray()))
+
+                if lines is None:
+                    del descriptors[descriptor]
+
+                    if remainder := buffers.pop(index):
+                        yield index, remainder.decode(errors="replace")
+
+                    continue
+
+                for line in lines:
+                    yield index, line.rstrip("\r")
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+            process.wait()
+            cast(IO[bytes], process.stdout).close()
+
+    for command, process in zip(commands, processes, strict=True):
+        if process.returncode:
+            raise CalledProcessError(process.returncode, command)
@@ -1,12 +1,14 @@
 """Odev base command class for CLI and programmatic use."""
 
 import inspect
+import json
 import re
 import sys
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
 from collections import defaultdict
 from collections.abc import Iterable, MutableMapping, Sequence
+from dataclasses import asdict
 from io import StringIO
 from pathlib import Path
 from typing import (
@@ -20,6 +22,7 @@ from rich.console import RenderableType
 
 from odev.common import args, string
 from odev.common.actions import ACTIONS_MAPPING
+from odev.common.connectors.postgres import PostgresConnector, QueryProfiler
 from odev.common.console import TableHeader
 from odev.common.errors import CommandError
 from odev.common.logging import LOG_LEVEL, logging
@@ -82,6 +85,16 @@ class Command(OdevFrameworkMixin, ABC, metaclass=OrderedClassAttributes):
         aliases=["-f", "--force"],
         description="Bypass confirmation prompts and assume a default value to all, use with caution!",
     )
+    sql_profile = args.Flag(
+        aliases=["--sql-profile"],
+        description="""Record the queries executed by odev against PostgreSQL and print the slowest
+        and most repeated statements when the command ends.
+        """,
+    )
+    sql_profile_export = args.Path(
+        aliases=["--sql-profile-export"],
+        description="Export the queries recorded with `--sql-profile` and their summary to a JSON file.",
+    )
 
     # --------------------------------------------------------------------------
 
@@ -100,6 +113,11 @@ class Command(OdevFrameworkMixin, ABC, metaclass=OrderedClassAttributes):
         self.args.log_level = LOG_LEVEL
         self._bypass_prompt_orig = self.console.bypass_prompt
         self.console.bypass_prompt = self.args.bypass_prompt
+        self._sql_profiler: QueryProfiler | None = None
+
+        if (self.args.sql_profile or self.args.sql_profile_export) and PostgresConnector._profiler is None:
+            self._sql_profiler = QueryProfiler()
+            PostgresConnector.set_profiler(self._sql_profiler)
 
     def __del__(self):
         """Reset the bypass prompt flag."""
@@ -309,6 +327,87 @@ class Command(OdevFrameworkMixin, ABC, metaclass=OrderedClassAttributes):
     def cleanup(self) -> None:
         """Cleanup after the command execution."""
 
+    def report_sql_profile(self) -> None:
+        """Stop recording queries executed against PostgreSQL, then print and export their summary
+        if profiling was requested for this command.
+        """
+        if self._sql_profiler is None:
+            return
+
+        PostgresConnector.set_profiler(None)
+        summary = self._sql_profiler.summary()
+
+        if self.args.sql_profile:
+            self.print_sql_profile(summary)
+
+        if self.args.sql_profile_export:
+            self.args.sql_profile_export.write_text(
+                json.dumps(
+                    {"summary": summary, "queries": [asdict(record) for record in self._sql_profiler.records]},
+                    indent=4,
+                )
+            )
+            logger.info(f"Exported queries executed against PostgreSQL to {self.args.sql_profile_export}")
+
+    def print_sql_profile(self, summary: dict[str, Any]) -> None:
+        """Print the slowest and most repeated queries executed against PostgreSQL.
+
+        :param summary: The summary of recorded queries, as returned by `QueryProfiler.summary`.
+        """
+        logger.info(
+            f"Executed {summary['queries']} SQL queries ({summary['cached']} from cache, "
+            f"{summary['statements']} distinct statements) in {summary['duration']:.1f}ms"
+        )
+
+        if not summary["queries"]:
+            return
+
+        self.print()
+        self.table(
+            [
+                TableHeader("Time", align="right"),
+                TableHeader("Rows", align="right"),
+                TableHeader("Database"),
+                TableHeader("Caller"),
+                TableHeader("Statement"),
+            ],
+            [
+                [
+                    f"{query['duration']:.1f}ms" + (" (cached)" if query["cached"] else ""),
+                    str(query["rows"]),
+                    query["database"],
+                    query["caller"],
+                    query["statement"],
+                ]
+                for query in summary["slowest"]
+            ],
+            title="Slowest SQL queries",
+        )
+
+        if not summary["repeated"]:
+            return
+
+        self.table(
+            [
+                TableHeader("Count", align="right"),
+                TableHeader("Time", align="right"),
+                TableHeader("Database"),
+                TableHeader("Callers"),
+                TableHeader("Statement"),
+            ],
+            [
+                [
+                    f"{statement['count']}" + (f" ({statement['cached']} cached)" if statement["cached"] else ""),
+                    f"{statement['duration']:.1f}ms",
+                    statement["database"],
+                    "\n".join(f"{caller} x{count}" for caller, count in statement["callers"].items()),
+                    statement["statement"],
+                ]
+                for statement in summary["repeated"]
+            ],
+            title="Most repeated SQL queries",
+        )
+
     def print(
         self,
         renderable: RenderableType = "",
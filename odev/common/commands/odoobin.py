@@ -1,9 +1,11 @@
 import re
 import shlex
+import tempfile
 from abc import ABC
 from argparse import Namespace
 from collections.abc import Mapping
 from pathlib import Path
+from time import monotonic
 from typing import (
     Literal,
 )
@@ -14,9 +16,20 @@ from odev.common import args, string
 from odev.common.commands import LocalDatabaseCommand
 from odev.common.connectors import GitConnector
 from odev.common.databases import LocalDatabase
-from odev.common.logging import logging
+from odev.common.logging import LOG_LEVEL, logging
 from odev.common.odoobin import OdoobinProcess
+from odev.common.odoobin_logs import (
+    ODOO_LOG_LEVELS,
+    ODOO_LOG_REGEX,
+    ODOO_LOG_WERKZEUG_REGEX,
+    LogCapture,
+    RequestProfiler,
+    colorize_duration,
+    format_log_line,
+    parse_log_line,
+)
 from odev.common.python import PythonEnv
+from odev.common.shell_daemon import ShellDaemon
 from odev.common.version import OdooVersion
 
 
@@ -25,6 +38,9 @@ logger = logging.getLogger(__name__)
 
 TEMPLATE_SUFFIX = ":template"
 
+LOG_THROUGHPUT_REPORT_INTERVAL = 10.0
+"""Interval in seconds between two reports of the throughput of odoo-bin output processing in debug mode."""
+
 
 class OdoobinCommand(LocalDatabaseCommand, ABC):
     """Base class for commands that interact with an odoo-bin process."""
@@ -79,44 +95,27 @@ class OdoobinCommand(LocalDatabaseCommand, ABC):
         description="Do not pretty print the output of odoo-bin but rather display logs as output by the subprocess.",
         default=True,
     )
+    capture_logs = args.Flag(
+        aliases=["--no-capture-logs"],
+        description="Do not store parsed odoo-bin logs on disk for later inspection with the `logs` command.",
+        default=True,
+    )
+    display_level = args.String(
+        aliases=["--display-level"],
+        choices=list(ODOO_LOG_LEVELS),
+        description="""Only display odoo-bin logs of this level or higher; lines of lower levels are still
+        processed but not printed. Useful to keep up with verbose log-levels passed to odoo-bin.
+        """,
+    )
 
     # --------------------------------------------------------------------------
     # Properties
     # --------------------------------------------------------------------------
 
-    ODOO_LOG_REGEX: re.Pattern = re.compile(
-        r"""
-            (?:
-                (?P<date>\d{4}-\d{2}-\d{2})\s
-                (?P<time>\d{2}:\d{2}:\d{2},\d{3})\s
-                (?P<pid>\d+)\s
-                (?P<level>[A-Z]+)\s
-                (?P<database>[^\s]+)\s
-                (?P<logger>
-                    ((?:odoo\.addons\.)(?P<module>[^\.]+))?[^:]+
-                ):\s
-                (?P<description>.*)
-            )
-        """,
-        re.VERBOSE | re.IGNORECASE,
-    )
+    ODOO_LOG_REGEX: re.Pattern = ODOO_LOG_REGEX
     """Regular expression to match the output of odoo-bin."""
 
-    ODOO_LOG_WERKZEUG_REGEX: re.Pattern = re.compile(
-        r"""
-            (?:
-                (?P<ip>(?:\d{1,3}\.){3}\d{1,3}).+?\]\s\"
-                (?P<verb>\w+)\s
-                (?P<url>.+?(?=\s))\s
-                (?P<http>.+?(?=\"))\"\s
-                (?P<code>\d+)\s-\s
-                (?P<count_query>\d+)\s
-                (?P<time_query>[\d\.]+)\s
-                (?P<time_remaining>[\d\.]+)
-            )
-        """,
-        re.VERBOSE | re.IGNORECASE,
-    )
+    ODOO_LOG_WERKZEUG_REGEX: re.Pattern = ODOO_LOG_WERKZEUG_REGEX
     """Regular expression to match the output of odoo-bin Werkzeug-specific logs."""
 
     last_level: str = "INFO"
@@ -124,6 +123,21 @@ class OdoobinCommand(LocalDatabaseCommand, ABC):
 
     def __init__(self, args: Namespace, **kwargs):
         super().__init__(args, **kwargs)
+        self._log_lines_count: int = 0
+        """Number of lines of odoo-bin output processed."""
+
+        self._log_lines_start: float | None = None
+        """Time at which the first line of odoo-bin output was processed."""
+
+        self._log_lines_report: float = 0.0
+        """Time at which the throughput of odoo-bin output processing was last reported."""
+
+        self._log_capture: LogCapture | None = None
+        """Storage of parsed odoo-bin log records for the current run."""
+
+        self._request_profiler: RequestProfiler | None = None
+        """Aggregation of the timings of HTTP requests served by odoo-bin, if enabled."""
+
         self._set_odoobin_process(
             force=any([self.args.version, self.args.venv, self.args.worktree, self.args.enterprise])
         )
@@ -173,13 +187,30 @@ class OdoobinCommand(LocalDatabaseCommand, ABC):
         """Beautify odoo logs on the fly."""
         match = self._parse_progress_log_line(line)
 
+        if match is not None:
+            self.last_level = match.group("level").lower()
+
+        if not self._is_log_level_displayed(self.last_level):
+            return
+
         if match is None or not self.args.pretty:
-            self.print(markup.escape(line), highlight=False, soft_wrap=False)
+            self.console.print_batched(markup.escape(line))
             return
 
-        self.last_level = match.group("level").lower()
         self._print_progress_log_line(match)
 
+    def cleanup(self):
+        """Report the throughput of odoo-bin output processing and close captured logs."""
+        super().cleanup()
+
+        if self._log_lines_count:
+            self._report_log_throughput()
+
+        if self._log_capture is not None:
+            self._log_capture.close()
+            logger.debug(f"Captured odoo-bin logs to {self._log_capture.path}")
+            self._log_capture = None
+
     def _guess_addons_paths(self) -> list[Path]:
         """Guess the addons path."""
         if self.args.addons is not None:
@@ -239,55 +270,52 @@ class OdoobinCommand(LocalDatabaseCommand, ABC):
 
     def _print_progress_log_line(self, match: re.Match):
         """Print a line of odoo-bin output when streamed through the odoobin_progress handler."""
-        level_color = "bold color.green" if self.last_level == "info" else f"logging.level.{self.last_level}"
-        logger = match.group("logger")
-        description = match.group("description")
-
-        if logger == "werkzeug" and (http_match := re.match(self.ODOO_LOG_WERKZEUG_REGEX, description)):
-            dash = string.stylize("-", "color.black")
-            code = http_match.group("code")
-
-            match code[0]:
-                case "4":
-                    code = string.stylize(code, "color.yellow")
-                case "5":
-                    code = string.stylize(code, "color.red")
-                case _:
-                    code = string.stylize(code, "color.black")
-
-            time_query_num = float(http_match.group("time_query"))
-            time_python_num = float(http_match.group("time_remaining"))
-            time_total_num = time_query_num + time_python_num
-
-            thresholds = {0.3: "color.yellow", 1.0: "color.red"}
-            time_total = self._colorize_duration_by_threshold(time_total_num, thresholds)
-
-            thresholds = {key: f"{value} dim" for key, value in thresholds.items()}
-            time_query = self._colorize_duration_by_threshold(time_query_num, thresholds)
-            time_python = self._colorize_duration_by_threshold(time_python_num, thresholds)
-
-            description = (
-                f"{string.stylize(http_match.group('ip'), 'color.black')} {dash} "
-                f"{http_match.group('verb')} {http_match.group('url')} ({code}) {dash} "
-                f"{time_total} "
-                + string.stylize(
-                    f"[SQL: {time_query} ({http_match.group('count_query')} queries), Python: {time_python}]",
-                    "color.black",
-                )
-            )
-
-        self.print(
-            f"{string.stylize(match.group('time'), 'color.black')} "
-            f"{string.stylize(match.group('level'), level_color)} "
-            f"{string.stylize(match.group('database'), 'color.purple')} "
-            f"{string.stylize(logger, 'color.black')}: {description}",
-            highlight=False,
-            soft_wrap=True,
-        )
+        if self._is_log_level_displayed(match.group("level").lower()):
+            self.console.print_batched(format_log_line(match))
 
     def _parse_progress_log_line(self, line: str) -> re.Match | None:
         """Parse a line of odoo-bin output."""
-        return re.match(self.ODOO_LOG_REGEX, string.strip_ansi_colors(line))
+        self._log_lines_count += 1
+
+        if LOG_LEVEL == "DEBUG":
+            now = monotonic()
+
+            if self._log_lines_start is None:
+                self._log_lines_start = self._log_lines_report = now
+            elif now - self._log_lines_report >= LOG_THROUGHPUT_REPORT_INTERVAL:
+                self._report_log_throughput()
+
+        match = parse_log_line(line)
+
+        if match is not None and self.args.capture_logs:
+            if self._log_capture is None:
+                self._log_capture = LogCapture.create(self.odev.logs_path, self._database.name, str(self))
+
+            self._log_capture.record(match)
+
+        if match is not None and self._request_profiler is not None:
+            self._request_profiler.record(match)
+
+        return match
+
+    def _is_log_level_displayed(self, level: str) -> bool:
+        """Check whether lines of odoo-bin output of a given log-level should be printed.
+        :param level: The log-level of the line, lowercase.
+        """
+        if self.args.display_level is None:
+            return True
+
+        return ODOO_LOG_LEVELS.get(level, logging.CRITICAL) >= ODOO_LOG_LEVELS[self.args.display_level]
+
+    def _report_log_throughput(self):
+        """Log the number of lines of odoo-bin output processed per second, in debug mode only."""
+        if self._log_lines_start is None:
+            return
+
+        now = monotonic()
+        self._log_lines_report = now
+        rate = self._log_lines_count / max(now - self._log_lines_start, 1e-6)
+        logger.debug(f"Processed {self._log_lines_count} lines of odoo-bin output ({rate:.0f} lines/s)")
 
     def _colorize_duration_by_threshold(self, time: str | float, thresholds: Mapping[float, str]) -> str:
         """Colorize the textual representation of a duration according to thresholds.
@@ -306,9 +334,7 @@ class OdoobinCommand(LocalDatabaseCommand, ABC):
         >>> )
         "[color.red]2.510[/color.red]"
         """
-        time = float(time)
-        style = thresholds.get(max(filter(lambda x: x < time, thresholds.keys()), default=0.0))
-        return string.stylize(f"{time:.3f}", style) if style else f"{time:.3f}"
+        return colorize_duration(time, thresholds)
 
 
 class OdoobinTemplateCommand(OdoobinCommand):
@@ -353,6 +379,14 @@ class OdoobinShellCommand(OdoobinCommand, ABC):
         python code to be executed inside the shell environment.
         """,
     )
+    warm = args.Flag(
+        aliases=["--warm"],
+        description="""
+        Run the script in a shell daemon kept alive for the database, so that the registry is loaded once
+        and reused by later runs. The daemon is restarted when installed modules or worktrees change
+        and exits after being idle for a while.
+        """,
+    )
 
     @property
     def script_run_after(self) -> str:
@@ -381,10 +415,30 @@ class OdoobinShellCommand(OdoobinCommand, ABC):
         if self.odoobin is None:
             raise self.error(f"No odoo-bin process could be instantiated for database {self._database!r}")
 
-        if Path(self.args.script).is_file():
-            subcommand_input = f"cat {self.args.script}"
-        else:
-            subcommand_input = f"echo {shlex.quote(self.args.script)}"
+        source = self.script_source()
+
+        if self.args.warm:
+            return ShellDaemon(self.odoobin, self.args.odoo_args).run(source)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".py") as script_file:
+            script_file.write(source)
+            script_file.flush()
+            process = self.odoobin.run(
+                args=self.args.odoo_args,
+                subcommand="shell",
+                subcommand_input=f"cat {shlex.quote(script_file.name)}",
+                stream=False,
+            )
+
+        if process is None or process.stdout is None:
+            return None
+
+        return process.stdout.decode()
+
+    def script_source(self) -> str:
+        """The python code of the script, followed by the code to run after it has been loaded."""
+        script_path = Path(self.args.script)
+        source = script_path.read_text() if script_path.is_file() else self.args.script
 
         if self.script_run_after:
             run_after: str = self.script_run_after
@@ -392,19 +446,9 @@ class OdoobinShellCommand(OdoobinCommand, ABC):
             if not run_after.startswith("print("):
                 run_after = f"print({self.script_run_after})"
 
-            subcommand_input = f"{subcommand_input}; echo {shlex.quote(run_after)}"
-
-        process = self.odoobin.run(
-            args=self.args.odoo_args,
-            subcommand="shell",
-            subcommand_input=f"{{ {subcommand_input}; }}",
-            stream=False,
-        )
+            source = f"{source}\n{run_after}\n"
 
-        if process is None or process.stdout is None:
-            return None
-
-        return process.stdout.decode()
+        return source
 
     def run_script_handle_result(self, result: str):
         """Handle the result of the script execution.
@@ -0,0 +1,107 @@
+"""Run coroutines concurrently from synchronous code, with a limit on how many run at the same time."""
+
+import asyncio
+from collections.abc import Awaitable, Iterable
+from typing import Literal, TypeVar, overload
+
+
+__all__ = ["DEFAULT_CONCURRENCY", "gather", "run"]
+
+
+T = TypeVar("T")
+
+
+DEFAULT_CONCURRENCY: int = 8
+"""Maximum number of awaitables running at the same time by default. Awaitables may open several connections
+to PostgreSQL each, i.e. reading the size and last dates of a database opens up to 3 of them at once,
+so that the number of connections opened at once is a multiple of this limit.
+"""
+
+
+@overload
+async def gather(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: Literal[False] = False,
+) -> list[T]: ...
+
+
+@overload
+async def gather(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    *,
+    return_exceptions: Literal[True],
+) -> list[T | BaseException]: ...
+
+
+async def gather(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> list[T] | list[T | BaseException]:
+    """Await awaitables concurrently, no more than `limit` at a time, and return their results in order.
+    If one of them fails, the others are cancelled and its exception is raised, unless `return_exceptions`
+    is set in which case the others keep running and the exception is returned in place of its result.
+
+    :param awaitables: The awaitables to run.
+    :param limit: Maximum number of awaitables running at the same time.
+    :param return_exceptions: Return exceptions raised by awaitables instead of raising them.
+    :return: The results of the awaitables, in the same order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def limited(awaitable: Awaitable[T]) -> T:
+        try:
+            async with semaphore:
+                return await awaitable
+        finally:
+            # Coroutines cancelled while waiting for the semaphore were never started
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+
+    tasks = [asyncio.ensure_future(limited(awaitable)) for awaitable in awaitables]
+
+    if return_exceptions:
+        return list(await asyncio.gather(*tasks, return_exceptions=True))
+
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+@overload
+def run(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: Literal[False] = False,
+) -> list[T]: ...
+
+
+@overload
+def run(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    *,
+    return_exceptions: Literal[True],
+) -> list[T | BaseException]: ...
+
+
+def run(
+    awaitables: Iterable[Awaitable[T]],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> list[T] | list[T | BaseException]:
+    """Await awaitables concurrently in a new event loop and return their results in order.
+
+    :param awaitables: The awaitables to run.
+    :param limit: Maximum number of awaitables running at the same time.
+    :param return_exceptions: Return exceptions raised by awaitables instead of raising them.
+    :return: The results of the awaitables, in the same order.
+    """
+    return asyncio.run(gather(awaitables, limit, return_exceptions))  # type: ignore [call-overload]
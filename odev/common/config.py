@@ -160,6 +160,21 @@ class UpdateSection(Section):
         self.set("release", value)
 
 
+class HttpSection(Section):
+    """Configuration for HTTP requests to remote endpoints."""
+
+    @property
+    def cache(self) -> bool:
+        """Whether to store responses to unauthenticated requests on disk and reuse them between runs of odev.
+        Defaults to true.
+        """
+        return self.get("cache", "true") == "true"
+
+    @cache.setter
+    def cache(self, value: bool | str):
+        self.set("cache", value if isinstance(value, str) else "true" if value else "false")
+
+
 class PluginsSection(Section):
     """Odev plugins configuration."""
 
@@ -205,6 +220,41 @@ class RepositoriesSection(Section):
         self.set("date", value.strftime(DATETIME_FORMAT) if isinstance(value, datetime) else value)
 
 
+class RestoreSection(Section):
+    """Configuration for restoring dumps to local databases."""
+
+    @property
+    def filter_tables(self) -> list[str]:
+        """Tables whose data should not be restored, separated by commas.
+        Append `:<ratio>` to the name of a table to keep a sample of its rows instead, i.e. `mail_message:0.1`.
+        Defaults to an empty list.
+        """
+        return [table for table in cast(str, self.get("filter_tables", "")).split(",") if table]
+
+    @filter_tables.setter
+    def filter_tables(self, value: str | Iterable[str]):
+        self.set("filter_tables", value if isinstance(value, str) else ",".join(list(value)))
+
+
+class SnapshotsSection(Section):
+    """Configuration for snapshots of local databases."""
+
+    @property
+    def retention(self) -> int:
+        """Maximum number of snapshots kept per database, the oldest snapshots being removed
+        when new ones are taken.
+        Defaults to 5 snapshots.
+        """
+        return int(cast(str, self.get("retention", "5")))
+
+    @retention.setter
+    def retention(self, value: str | int):
+        if not str(value).isdigit() or int(value) < 1:
+            raise ValueError(f"'snapshots.retention' must be a strictly positive integer, got {value!r}")
+
+        self.set("retention", str(value))
+
+
 class SecuritySection(Section):
     """Security configuration."""
 
@@ -254,6 +304,9 @@ class Config:
     update: UpdateSection
     """Configuration for odev auto-updates."""
 
+    http: HttpSection
+    """Configuration for HTTP requests to remote endpoints."""
+
     plugins: PluginsSection
     """Configuration for odev plugins."""
 
@@ -269,6 +322,12 @@ class Config:
     security: SecuritySection
     """Configuration for security and secrets encryption."""
 
+    restore: RestoreSection
+    """Configuration for restoring dumps to local databases."""
+
+    snapshots: SnapshotsSection
+    """Configuration for snapshots of local databases."""
+
     def __init__(self, name: str = "odev"):
         self.name: str = name
         """Name of this config manager, also serves as the name of the file
@@ -9,7 +9,7 @@ from inspect import isclass
 # --- Common modules -----------------------------------------------------------
 from .base import Connector
 from .git import GitConnector, GitWorktree, Stash
-from .postgres import PostgresConnector
+from .postgres import AsyncPostgresConnector, PostgresConnector
 from .rest import RestConnector
 from .rpc import RpcConnector
 
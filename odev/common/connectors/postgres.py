@@ -1,23 +1,39 @@
 """PostgreSQL connector."""
 
+import asyncio
+import re
+import select
+import sys
 import textwrap
+from collections import Counter, defaultdict
 from collections.abc import Mapping, MutableMapping, Sequence
-from contextlib import contextmanager, nullcontext
+from contextlib import contextmanager, nullcontext, suppress
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
 from typing import (
+    Any,
     ClassVar,
     Literal,
 )
 
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, QueryCanceledError, cursor as PsycopgCursor
+from psycopg2.extensions import (
+    ISOLATION_LEVEL_AUTOCOMMIT,
+    POLL_OK,
+    POLL_READ,
+    POLL_WRITE,
+    QueryCanceledError,
+    connection as PsycopgConnection,
+    cursor as PsycopgCursor,
+    set_wait_callback,
+)
 
 from odev.common import string
 from odev.common.connectors import Connector
 from odev.common.console import console
 from odev.common.errors import ConnectorError
 from odev.common.logging import DEBUG_SQL, LOG_LEVEL, logging
-from odev.common.signal_handling import capture_signals
-from odev.common.thread import Thread
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +41,67 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_DATABASE = "postgres"
 
+FILE_COPY_SERVER_VERSION = 150000
+"""First version of PostgreSQL in which the strategy used to copy template databases can be chosen."""
+
+SQL_LITERALS_REGEX: re.Pattern = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+"""Regular expression to match string and numeric literals in SQL queries."""
+
+SQL_PLACEHOLDERS_LIST_REGEX: re.Pattern = re.compile(r"\(\?(?:, \?)+\)(?:, \(\?(?:, \?)*\))*|\?(?:, \?)+")
+"""Regular expression to match lists of placeholders in normalized SQL queries."""
+
+PROFILER_SKIPPED_MODULES: tuple[str, ...] = (
+    "contextlib",
+    "functools",
+    "odev.common.connectors.postgres",
+    "odev.common.mixins.connectors",
+    "odev.common.postgres",
+)
+"""Modules skipped when looking for the code in odev that executed a query."""
+
+
+def wait_select(connection: PsycopgConnection):
+    """Wait for the result of an operation on a connection, cancelling the query it is running on interruption.
+    Registered as the wait callback of psycopg2, so that waiting for PostgreSQL happens in Python code
+    where signals are handled instead of blocking in libpq.
+
+    Any exception raised while waiting, including the `SystemExit` raised by the signal handlers of odev,
+    cancels the running query before being propagated.
+
+    :param connection: The connection to wait for.
+    """
+    try:
+        _poll(connection)
+    except BaseException:
+        logger.warning("Aborting execution of SQL query")
+
+        with suppress(psycopg2.Error):
+            connection.cancel()
+            _poll(connection)
+
+        raise
+
+
+def _poll(connection: PsycopgConnection):
+    """Poll a connection until the operation it is running is complete.
+
+    :param connection: The connection to poll.
+    """
+    while True:
+        state = connection.poll()
+
+        if state == POLL_OK:
+            break
+        if state == POLL_READ:
+            select.select([connection.fileno()], [], [])
+        elif state == POLL_WRITE:
+            select.select([], [connection.fileno()], [])
+        else:
+            raise connection.OperationalError(f"Bad state from poll: {state}")
+
+
+set_wait_callback(wait_select)
+
 
 class Cursor(PsycopgCursor):
     """Extended Psycopg cursor class to add some convenience methods."""
@@ -38,13 +115,120 @@ class Cursor(PsycopgCursor):
 
         try:
             yield
-        except Exception as e:
-            self.execute("ROLLBACK")
-            raise e from e
-        finally:
+        except BaseException:
+            if not self.connection.closed:
+                self.execute("ROLLBACK")
+            raise
+        else:
             self.execute("COMMIT")
 
 
+@dataclass
+class QueryRecord:
+    """A class for storing the measurements of a query executed through the PostgreSQL connector."""
+
+    database: str
+    """The name of the database the query was executed against."""
+
+    statement: str
+    """The normalized statement of the query, with literals replaced by placeholders."""
+
+    duration: float
+    """Wall time spent executing the query and fetching its result, in milliseconds."""
+
+    rows: int
+    """The number of rows returned or affected by the query, -1 if unknown."""
+
+    cached: bool
+    """Whether the result of the query was returned from the cache."""
+
+    caller: str
+    """The location in the source code of odev from which the query was executed."""
+
+
+class QueryProfiler:
+    """Record every query executed through PostgreSQL connectors to find slow and repeated queries."""
+
+    def __init__(self):
+        self.records: list[QueryRecord] = []
+        """Measurements of the queries executed so far, in order of execution."""
+
+    def record(self, database: str, query: str, duration: float, rows: int, cached: bool) -> None:
+        """Record the execution of a query.
+
+        :param database: The name of the database the query was executed against.
+        :param query: The query as executed.
+        :param duration: Wall time spent executing the query, in seconds.
+        :param rows: The number of rows returned or affected by the query.
+        :param cached: Whether the result of the query was returned from the cache.
+        """
+        self.records.append(QueryRecord(database, self.normalize(query), duration * 1000, rows, cached, self.caller()))
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query to group executions of the same statement with different values,
+        replacing literals with placeholders and collapsing whitespaces and lists of values.
+
+        :param query: The query to normalize.
+        """
+        statement = " ".join(SQL_LITERALS_REGEX.sub("?", query).split())
+        statement = statement.replace("( ", "(").replace(" )", ")")
+        return SQL_PLACEHOLDERS_LIST_REGEX.sub(lambda match: "(?, ...)" if match[0][0] == "(" else "?, ...", statement)
+
+    @staticmethod
+    def caller() -> str:
+        """Return the location in the source code of odev from which the current query is executed,
+        outside of the PostgreSQL connectors and tables.
+        """
+        frame = sys._getframe(2)
+        root = Path(__file__).parents[3]
+
+        while frame.f_back is not None and frame.f_globals.get("__name__", "").startswith(PROFILER_SKIPPED_MODULES):
+            frame = frame.f_back
+
+        path = Path(frame.f_code.co_filename)
+        path = path.relative_to(root) if path.is_relative_to(root) else path
+        return f"{path}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+    def summary(self, top: int = 10) -> dict[str, Any]:
+        """Return statistics about the recorded queries, timings in milliseconds.
+
+        :param top: Number of slowest and most repeated statements to report.
+        """
+        statements: dict[tuple[str, str], list[QueryRecord]] = defaultdict(list)
+
+        for record in self.records:
+            statements[(record.database, record.statement)].append(record)
+
+        repeated = sorted(
+            ((key, records) for key, records in statements.items() if len(records) > 1),
+            key=lambda item: (len(item[1]), sum(record.duration for record in item[1])),
+            reverse=True,
+        )
+
+        return {
+            "queries": len(self.records),
+            "cached": sum(record.cached for record in self.records),
+            "statements": len(statements),
+            "duration": sum(record.duration for record in self.records),
+            "slowest": [
+                asdict(record)
+                for record in sorted(self.records, key=lambda record: record.duration, reverse=True)[:top]
+            ],
+            "repeated": [
+                {
+                    "database": database,
+                    "statement": statement,
+                    "count": len(records),
+                    "cached": sum(record.cached for record in records),
+                    "duration": sum(record.duration for record in records),
+                    "callers": dict(Counter(record.caller for record in records).most_common()),
+                }
+                for (database, statement), records in repeated[:top]
+            ],
+        }
+
+
 class PostgresConnector(Connector):
     """Connector class to interact with PostgreSQL."""
 
@@ -63,6 +247,9 @@ class PostgresConnector(Connector):
     _nocache: bool = False
     """Whether to disable caching of SQL queries."""
 
+    _profiler: ClassVar[QueryProfiler | None] = None
+    """Profiler recording the queries executed by all connectors, if any."""
+
     def __init__(self, database: str | None = None):
         """Initialize the connector."""
         super().__init__()
@@ -91,7 +278,9 @@ class PostgresConnector(Connector):
             del self.cr
 
         if self._connection is not None:
-            self._connection.commit()
+            if not self._connection.closed:
+                self._connection.commit()
+
             self._connection.close()
             del self._connection
 
@@ -110,6 +299,14 @@ class PostgresConnector(Connector):
         yield
         self.__class__._nocache = False
 
+    @classmethod
+    def set_profiler(cls, profiler: QueryProfiler | None):
+        """Record the queries executed by all connectors with a profiler, or stop recording them.
+
+        :param profiler: The profiler to record queries with, `None` to stop recording.
+        """
+        PostgresConnector._profiler = profiler
+
     def query(
         self,
         query: str,
@@ -129,9 +326,16 @@ class PostgresConnector(Connector):
         query_lower = query.lower()
         is_select = query_lower.startswith("select")
         expect_result = is_select or " returning " in query_lower
+        profiler = PostgresConnector._profiler
+        start = perf_counter()
 
         if is_select and not self.__class__._nocache and (self.database, query) in self.__class__._query_cache:
             result = self.__class__._query_cache[(self.database, query)]
+
+            if profiler is not None:
+                rows = len(result) if isinstance(result, list) else -1
+                profiler.record(self.database, query, perf_counter() - start, rows, cached=True)
+
             if DEBUG_SQL:
                 logger.debug(f"Returning cached PostgreSQL result for query against database {self.database!r}:")
                 console.code(string.indent(query, 4), "postgresql")
@@ -139,32 +343,23 @@ class PostgresConnector(Connector):
                 console.code(string.indent(str(result), 4), "python")
             return result
 
-        def signal_handler_cancel_statement(*args, **kwargs):
-            """Cancel the SQL query currently running."""
-            logger.warning("Aborting execution of SQL query")
-
-            if self.cr is not None:
-                self.cr.connection.cancel()
-
-        with (
-            self.cr.transaction() if transaction else nullcontext(),
-            capture_signals(handler=signal_handler_cancel_statement),
-        ):
+        with self.cr.transaction() if transaction else nullcontext():
             if LOG_LEVEL == "DEBUG" and DEBUG_SQL:
                 logger.debug(f"Executing PostgreSQL query against database {self.database!r}:")
                 console.code(string.indent(query, 4), "postgresql")
 
-            thread = Thread(target=self.cr.execute, args=(query, params))
-
             try:
-                thread.start()
-                thread.join()
-            except RuntimeError as error:
-                if isinstance(error.__cause__, QueryCanceledError):
-                    return False
-                raise error from error
+                self.cr.execute(query, params)
+            except QueryCanceledError:
+                return False
+            except psycopg2.Error as error:
+                raise RuntimeError(f"{error.__class__.__name__}: {error}") from error
 
             result = expect_result and self.cr.fetchall()
+            rows = self.cr.rowcount
+
+        if profiler is not None:
+            profiler.record(self.database, query, perf_counter() - start, rows, cached=False)
 
         if is_select and not self.__class__._nocache:
             if DEBUG_SQL:
@@ -174,15 +369,26 @@ class PostgresConnector(Connector):
 
         return result if expect_result else True
 
-    def create_database(self, database: str, template: str | None = None) -> bool:
+    @property
+    def server_version(self) -> int:
+        """Version of the PostgreSQL server as an integer, i.e. `160004` for 16.4."""
+        if self._connection is None:
+            raise ConnectorError("The connection is not initialized, connect first", self)
+
+        return self._connection.server_version
+
+    def create_database(self, database: str, template: str | None = None, file_copy: bool = False) -> bool:
         """Create a database.
 
         :param database: The name of the database to create.
         :param template: The template database to use.
+        :param file_copy: Copy the files of the template directly instead of logging its content to the WAL,
+            which is faster for large templates (PostgreSQL 15 and above, always the case on older versions).
         :return: Whether the database was created.
         :rtype: bool
         """
         template = template or "template1"
+        strategy = "STRATEGY FILE_COPY" if file_copy and self.server_version >= FILE_COPY_SERVER_VERSION else ""
         self.revoke_database(template)
         collation = self.query(
             f"""
@@ -199,6 +405,7 @@ class PostgresConnector(Connector):
                     WITH TEMPLATE "{template}"
                     LC_COLLATE '{collation}'
                     ENCODING 'unicode'
+                    {strategy}
                 """,
                 transaction=False,
             )
@@ -339,3 +546,194 @@ class PostgresConnector(Connector):
                 """
             )
         )
+
+
+class AsyncPostgresConnector:
+    """Connector class to run queries against PostgreSQL from asyncio coroutines, using asynchronous
+    psycopg2 connections driven by the event loop so that queries to many databases can overlap.
+    Queries run in autocommit mode and share the cache and profiler of `PostgresConnector`.
+    """
+
+    def __init__(self, database: str | None = None):
+        """Initialize the connector."""
+        self.database: str = database or DEFAULT_DATABASE
+        """The name of the database to connect to."""
+
+        self._connection: PsycopgConnection | None = None
+        """The instance of an asynchronous connection to the database engine."""
+
+    async def __aenter__(self) -> "AsyncPostgresConnector":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        self.disconnect()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.url!r})"
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the database."""
+        return f"postgresql://localhost/{self.database}"
+
+    async def connect(self):
+        """Connect to the database engine."""
+        if self._connection is not None:
+            return
+
+        connection = psycopg2.connect(database=self.database, async_=True)
+
+        try:
+            await self._wait(connection)
+        except BaseException:
+            connection.close()
+            raise
+
+        self._connection = connection
+
+    def disconnect(self):
+        """Disconnect from the database engine."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def query(self, query: str, params: Sequence | None = None, nocache: bool = False) -> list[tuple] | bool:
+        """Execute a query and return its result.
+
+        :param query: The query to execute.
+        :param params: Additional parameters to pass to the cursor.
+        :param nocache: Whether to bypass the cache of SELECT queries shared with `PostgresConnector`.
+        """
+        if self._connection is None:
+            raise ConnectorError("The connection is not initialized, connect first", self)  # type: ignore [arg-type]
+
+        query = textwrap.dedent(query).strip()
+        query_lower = query.lower()
+        is_select = query_lower.startswith("select")
+        expect_result = is_select or " returning " in query_lower
+        cacheable = is_select and not nocache and not PostgresConnector._nocache
+        profiler = PostgresConnector._profiler
+        start = perf_counter()
+
+        if cacheable and (self.database, query) in PostgresConnector._query_cache:
+            result = PostgresConnector._query_cache[(self.database, query)]
+
+            if profiler is not None:
+                rows = len(result) if isinstance(result, list) else -1
+                profiler.record(self.database, query, perf_counter() - start, rows, cached=True)
+
+            return result
+
+        if LOG_LEVEL == "DEBUG" and DEBUG_SQL:
+            logger.debug(f"Executing asynchronous PostgreSQL query against database {self.database!r}:")
+            console.code(string.indent(query, 4), "postgresql")
+
+        with self._connection.cursor() as cursor:
+            try:
+                cursor.execute(query, params)
+                await self._wait(self._connection)
+            except QueryCanceledError:
+                return False
+            except psycopg2.Error as error:
+                raise RuntimeError(f"{error.__class__.__name__}: {error}") from error
+
+            result = expect_result and cursor.fetchall()
+            rows = cursor.rowcount
+
+        if profiler is not None:
+            profiler.record(self.database, query, perf_counter() - start, rows, cached=False)
+
+        if cacheable:
+            PostgresConnector._query_cache[(self.database, query)] = result
+
+        return result if expect_result else True
+
+    def invalidate_cache(self, database_name: str | None = None):
+        """Invalidate the cache shared with `PostgresConnector` for a given database."""
+        database_name = database_name or self.database
+        logger.debug(f"Invalidating SQL cache for database {database_name!r}")
+        PostgresConnector._query_cache = {
+            key: value for key, value in PostgresConnector._query_cache.items() if key[0] != database_name
+        }
+
+    async def drop_database(self, database: str) -> bool:
+        """Revoke all connections to a database, then drop it.
+
+        :param database: The name of the database to drop.
+        :return: Whether the database was dropped.
+        """
+        try:
+            self.invalidate_cache("postgres")
+            await self.query(f'REVOKE CONNECT ON DATABASE "{database}" FROM PUBLIC')
+            await self.query("RESET ROLE")
+            await self.query(
+                f"""
+                SELECT pg_terminate_backend(pid)
+                FROM pg_stat_activity
+                WHERE pid <> pg_backend_pid()
+                    AND datname = '{database}'
+                """,
+                nocache=True,
+            )
+        except RuntimeError:
+            logger.debug(f"Failed to revoke connections to database {database!r}")
+
+        dropped = bool(await self.query(f'DROP DATABASE IF EXISTS "{database}"'))
+        self.invalidate_cache(database)
+        return dropped
+
+    async def table_exists(self, table: str, nocache: bool = False) -> bool:
+        """Check whether a table exists in the current database.
+
+        :param table: The name of the table to check.
+        :param nocache: Whether to bypass the cache of SELECT queries.
+        """
+        return bool(
+            await self.query(
+                f"""
+                SELECT c.relname FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = '{table}'
+                    AND c.relkind IN ('r', 'v', 'm')
+                    AND n.nspname = current_schema
+                """,
+                nocache=nocache,
+            )
+        )
+
+    @staticmethod
+    def _set_ready(future: "asyncio.Future[None]"):
+        """Resolve a future awaited until a connection is ready, unless already resolved."""
+        if not future.done():
+            future.set_result(None)
+
+    @staticmethod
+    async def _wait(connection: PsycopgConnection):
+        """Wait for the result of an operation on an asynchronous connection without blocking the event loop,
+        cancelling the query it is running if the awaiting task is cancelled.
+
+        :param connection: The connection to wait for.
+        """
+        loop = asyncio.get_running_loop()
+
+        while (state := connection.poll()) != POLL_OK:
+            if state not in (POLL_READ, POLL_WRITE):
+                raise connection.OperationalError(f"Bad state from poll: {state}")
+
+            if state == POLL_READ:
+                watch, unwatch = loop.add_reader, loop.remove_reader
+            else:
+                watch, unwatch = loop.add_writer, loop.remove_writer
+
+            ready: asyncio.Future[None] = loop.create_future()
+            watch(connection.fileno(), AsyncPostgresConnector._set_ready, ready)
+
+            try:
+                await ready
+            except asyncio.CancelledError:
+                with suppress(psycopg2.Error):
+                    connection.cancel()
+                raise
+            finally:
+                unwatch(connection.fileno())
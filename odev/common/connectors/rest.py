@@ -1,12 +1,19 @@
 """Interact with remote endpoints using REST."""
 
+import hashlib
 import json
+import os
 import platform
 import re
 from abc import ABC, abstractmethod, abstractproperty
 from collections.abc import MutableMapping, Sequence
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from itertools import pairwise
 from pathlib import Path
+from threading import Event
 from types import FrameType
 from typing import (
     Any,
@@ -16,22 +23,101 @@ from typing import (
 )
 from urllib.parse import ParseResult, urlencode, urlparse
 
-from requests import Response, Session
-from requests.exceptions import ConnectionError as RequestsConnectionError
-from rich.progress import Task
+from requests import Request, Response, Session
+from requests.exceptions import ConnectionError as RequestsConnectionError, RequestException
+from rich.progress import Task, TaskID
 
 from odev._version import __version__
 from odev.common.connectors.base import Connector
 from odev.common.console import console
 from odev.common.errors import ConnectorError
+from odev.common.http_cache import HttpCache
 from odev.common.logging import LOG_LEVEL, logging, silence_loggers
 from odev.common.progress import Progress
+from odev.common.restore import StreamingDownload
 from odev.common.signal_handling import capture_signals
 
 
 logger = logging.getLogger(__name__)
 
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+"""Number of bytes to write to disk at once when downloading files."""
+
+DOWNLOAD_PROGRESS_INTERVAL = 0.25
+"""Number of seconds between updates of the progress of downloads."""
+
+DOWNLOAD_PARALLEL_MIN_SIZE = 16 * 1024 * 1024
+"""Minimum number of bytes per range when downloading files in parallel ranges."""
+
+DOWNLOAD_RETRIES = 5
+"""Number of times to resume a range of a download after its connection was interrupted."""
+
+DOWNLOAD_CONTENT_RANGE_REGEX = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+|\*)$")
+"""Value of the `Content-Range` header of responses to range requests."""
+
+
+@dataclass
+class DownloadSegment:
+    """Range of bytes of a file downloaded over its own connection."""
+
+    start: int
+    """Offset of the first byte of the range."""
+
+    end: int | None
+    """Offset of the byte following the range, `None` if the size of the file is unknown."""
+
+    position: int
+    """Offset of the next byte to download."""
+
+    def __str__(self) -> str:
+        return f"bytes={self.start}-{'' if self.end is None else self.end - 1}"
+
+    @property
+    def done(self) -> bool:
+        """Whether the range has been fully downloaded."""
+        return self.end is not None and self.position >= self.end
+
+
+@dataclass
+class DownloadState:
+    """Progress of a download, saved next to its partial file so that it can be resumed after an interruption."""
+
+    size: int | None
+    """Size of the file, `None` if unknown."""
+
+    validator: str | None
+    """Entity tag or last modification date of the file, `None` if the server does not support range requests."""
+
+    segments: list[DownloadSegment] = field(default_factory=list)
+    """Ranges of the file being downloaded."""
+
+    @property
+    def downloaded(self) -> int:
+        """Number of bytes downloaded so far."""
+        return sum(segment.position - segment.start for segment in self.segments)
+
+    @classmethod
+    def load(cls, path: Path) -> "DownloadState | None":
+        """Load the state of a download, `None` if it cannot be resumed.
+        :param path: The path to the saved state.
+        """
+        with suppress(OSError, ValueError, TypeError, KeyError):
+            data = json.loads(path.read_text())
+
+            if data["validator"] is not None:
+                return cls(data["size"], data["validator"], [DownloadSegment(*segment) for segment in data["segments"]])
+
+        return None
+
+    def save(self, path: Path):
+        """Save the state of the download.
+        :param path: The path to save the state to.
+        """
+        segments = [[segment.start, segment.end, segment.position] for segment in self.segments]
+        path.write_text(json.dumps({"size": self.size, "validator": self.validator, "segments": segments}))
+
+
 class RestConnector(Connector, ABC):
     """Abstract class for connecting to a remote HTTP endpoint using REST."""
 
@@ -44,6 +130,9 @@ class RestConnector(Connector, ABC):
     _bypass_cache: ClassVar[bool] = False
     """Whether to bypass the cache for the current request."""
 
+    _http_cache: ClassVar[HttpCache | None] = None
+    """Persistent cache of HTTP responses, shared between runs of odev."""
+
     def __init__(self, url: str):
         """Initialize the connector.
         :param url: The URL of the endpoint.
@@ -197,13 +286,76 @@ class RestConnector(Connector, ABC):
 
         return RestConnector._cache.get(key)
 
+    @property
+    def http_cache(self) -> HttpCache:
+        """Persistent cache of HTTP responses, shared by all REST connectors and between runs of odev.
+        Only responses to non-streamed and unauthenticated GET requests carrying validators or a max-age
+        are stored, unless disabled in the configuration with `http.cache`.
+        """
+        if RestConnector._http_cache is None:
+            RestConnector._http_cache = HttpCache(self.odev.cache_path / "http.sqlite3")
+
+        return RestConnector._http_cache
+
     @contextmanager
     def nocache(self):
-        """Context manager to disable caching of HTTP requests."""
+        """Context manager to disable caching of HTTP requests, both in memory and on disk."""
         bypass_cache = RestConnector._bypass_cache
         RestConnector._bypass_cache = True
-        yield
-        RestConnector._bypass_cache = bypass_cache
+
+        try:
+            yield
+        finally:
+            RestConnector._bypass_cache = bypass_cache
+
+    def _resource_url(self, path: str) -> str:
+        """Build the full URL of a resource.
+        :param path: The path to the resource, or an absolute URL.
+        """
+        parsed = urlparse(path)
+
+        if parsed.scheme and parsed.netloc:
+            return path
+
+        if not path.startswith("/"):
+            path = f"/{path}"
+
+        return self.url + path
+
+    def _authenticated(self, method: str, url: str, **kwargs) -> bool:
+        """Whether a request would be sent with credentials, either cookies or an `Authorization` header,
+        in which case its response must not be shared through the persistent cache.
+        :param method: The HTTP method of the request.
+        :param url: The URL of the request.
+        :param kwargs: Additional keyword arguments of the request.
+        """
+        if self._connection is None:
+            return False
+
+        request = Request(
+            method,
+            url,
+            headers=kwargs.get("headers"),
+            cookies=kwargs.get("cookies"),
+            auth=kwargs.get("auth"),
+        )
+        headers = self._connection.prepare_request(request).headers
+        return "Authorization" in headers or "Cookie" in headers
+
+    def _http_cache_update(self, key: str, stored: Response | None, response: Response) -> Response:
+        """Update the persistent cache with the response to a request.
+        :param key: The key of the request.
+        :param stored: The response previously stored for the request, if any.
+        :param response: The response received from the endpoint.
+        :return: The stored response if the server confirmed it did not change, the received response otherwise.
+        """
+        if stored is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            return self.http_cache.revalidated(key, stored, response)
+
+        if HttpCache.storable(response):
+            self.http_cache.set(key, response)
+
+        return response
 
     def _request(
         self,
@@ -233,26 +385,35 @@ class RestConnector(Connector, ABC):
         if self._connection is None:
             raise ConnectorError("Connection not established with the endpoint", self)
 
-        parsed = urlparse(path)
-
-        if parsed.scheme and parsed.netloc:
-            url = path
-        else:
-            if not path.startswith("/"):
-                path = f"/{path}"
-
-            url = self.url + path
-
+        url = self._resource_url(path)
         kwargs.setdefault("allow_redirects", True)
         params = kwargs.pop("params", {})
         obfuscate_params = obfuscate_params or []
         obfuscated = {k: "xxxxx" for k in obfuscate_params if k in params}
-        cache_key = f"{method}:{url}:{json.dumps(obfuscated, sort_keys=True)}"
-        cached = self.cache(cache_key)
+        stream = kwargs.get("stream", False)
+        cache_key = HttpCache.key(method, url, params, kwargs.get("json", kwargs.get("data")))
+        cached = self.cache(cache_key) if not stream else None
 
         if cached is not None:
             return cached
 
+        cacheable = (
+            method == "GET"
+            and not stream
+            and not self._bypass_cache
+            and self.config.http.cache
+            and not self._authenticated(method, url, **kwargs)
+        )
+        stored, fresh = (self.http_cache.get(cache_key) if cacheable else None) or (None, False)
+
+        if stored is not None and fresh:
+            logger.debug(f"{method} {url} -> served from the HTTP cache")
+            self.cache(cache_key, stored)
+            return stored
+
+        if stored is not None:
+            kwargs["headers"] = {**self.http_cache.conditional_headers(stored), **kwargs.get("headers", {})}
+
         logger_message = f"{method} {url}"
 
         if params:
@@ -283,10 +444,15 @@ class RestConnector(Connector, ABC):
 
             raise ConnectorError(f"Could not connect to {self.name}", self) from error
 
+        if cacheable:
+            response = self._http_cache_update(cache_key, stored, response)
+
         if raise_for_status:
             response.raise_for_status()
 
-        self.cache(cache_key, response)
+        if not stream:
+            self.cache(cache_key, response)
+
         self._save_cookies()
         return response
 
@@ -334,44 +500,365 @@ class RestConnector(Connector, ABC):
         """
         return self.request("POST", path, params=params, authenticate=authenticate, **kwargs)
 
-    def download(self, path: str, file_path: Path, progress_message: str = "Downloading", **kwargs) -> Path:
+    def download(  # noqa: PLR0912, PLR0915
+        self,
+        path: str,
+        file_path: Path,
+        progress_message: str = "Downloading",
+        *,
+        checksum: str | None = None,
+        parallel: int = 1,
+        **kwargs,
+    ) -> Path:
         """Download a file from the endpoint.
+        The file is first downloaded to a `.part` file next to its destination, alongside the state of the download,
+        so that an interrupted download can be resumed with HTTP range requests when called again. If the server
+        supports range requests, the file can be downloaded in multiple ranges in parallel.
 
         :param path: The path to the resource.
-        :param filename: The name of the file to save.
+        :param file_path: The path to save the file to.
         :param progress_message: The message to display in the progress bar.
+        :param checksum: The expected checksum of the file, as `<algorithm>:<hexdigest>`, i.e. `sha256:...`.
+        :param parallel: The maximum number of ranges to download in parallel.
         :param kwargs: Additional keyword arguments to pass to the request.
-        :return: The response from the endpoint.
-        :rtype: requests.Response
+        :return: The path to the downloaded file.
         """
+        streaming = StreamingDownload.get(file_path)
+
+        if streaming and not streaming.running:
+            # Everything needed to download the file is known by now, hand the download over to the background
+            # thread so that the file can be restored while it is being downloaded
+            streaming.start(
+                lambda: self.download(
+                    path,
+                    file_path,
+                    progress_message,
+                    checksum=checksum,
+                    parallel=parallel,
+                    **kwargs,
+                )
+            )
+            return file_path
+
+        if streaming:
+            # The file is restored while being downloaded, it must be written in order and the restore tracks progress
+            logger.debug(f"{progress_message}: {file_path.name} is restored while being downloaded")
+            part_path, parallel = file_path, 1
+        else:
+            part_path = file_path.with_name(f"{file_path.name}.part")
+
+        state_path = part_path.with_name(f"{part_path.name}.json")
+        state = DownloadState.load(state_path) if not streaming and part_path.exists() else None
         progress = Progress(download=True)
-        task = progress.add_task(progress_message, total=None)
+        task = progress.add_task(progress_message, total=None, start=False)
+        stop = streaming.stop if streaming is not None else Event()
 
         def signal_handler_progress(signal_number: int, frame: FrameType | None = None, message: str | None = None):
+            stop.set()
             progress.stop_task(task)
             progress.stop()
             logger.warning(f"{cast(Task, progress._tasks.get(task)).description}: task interrupted by user")
             raise KeyboardInterrupt
 
-        try:
-            with (
-                capture_signals(handler=signal_handler_progress),
-                self.get(path, **kwargs, stream=True, authenticate=False) as response,
-            ):
-                progress.start()
-                content_length = int(response.headers.get("content-length", 0))
-                progress.update(task, total=content_length)
-                progress.start_task(task)
-
-                with file_path.open("wb") as file:
-                    for chunk in response.iter_content(chunk_size=1024):
-                        file.write(chunk)
-                        progress.advance(task, advance=len(chunk))
-        except Exception as exception:
-            progress.stop_task(task)
-            progress.stop()
-            raise exception from exception
+        with self.nocache(), capture_signals(handler=signal_handler_progress):
+            resumed = state
+            state, response = self._download_open(path, state, parallel, **kwargs)
+            descriptor = os.open(part_path, os.O_RDWR | os.O_CREAT)
+
+            try:
+                if state is not resumed:
+                    os.ftruncate(descriptor, 0)
+
+                if not streaming:
+                    progress.start()
+                    progress.update(task, total=state.size, completed=state.downloaded)
+                    progress.start_task(task)
+
+                self._download_segments(
+                    path,
+                    state,
+                    response,
+                    descriptor=descriptor,
+                    stop=stop,
+                    progress=progress,
+                    task=task,
+                    state_path=None if streaming else state_path,
+                    **kwargs,
+                )
+            except BaseException:
+                stop.set()
+
+                if streaming:
+                    # Streamed downloads are written to their final path and cannot be resumed
+                    part_path.unlink(missing_ok=True)
+                elif state.validator is not None:
+                    state.save(state_path)
+                    logger.debug(f"Download of {file_path.name} interrupted, it will resume from {part_path}")
+
+                raise
+            finally:
+                os.close(descriptor)
+
+                if response is not None:
+                    response.close()
+
+                if not streaming:
+                    progress.stop_task(task)
+                    progress.stop()
+
+        if checksum is not None:
+            self._download_verify(part_path, checksum)
+
+        if not streaming:
+            part_path.replace(file_path)
+            state_path.unlink(missing_ok=True)
 
-        progress.stop_task(task)
-        progress.stop()
         return file_path
+
+    def _download_request(self, path: str, segment: DownloadSegment, validator: str | None, **kwargs) -> Response:
+        """Request a range of a file to download.
+        :param path: The path to the resource.
+        :param segment: The segment of the file to request, from its current position.
+        :param validator: The entity tag or last modification date of the file the range belongs to, if known.
+        :param kwargs: Additional keyword arguments to pass to the request.
+        :return: The streamed response, with status 206 if the range is served, 200 if the whole file is served.
+        """
+        headers = {**kwargs.pop("headers", {}), "Range": f"bytes={segment.position}-"}
+
+        if segment.end is not None:
+            headers["Range"] += str(segment.end - 1)
+
+        if validator is not None:
+            headers["If-Range"] = validator
+
+        response = self.get(path, **kwargs, headers=headers, stream=True, authenticate=False, raise_for_status=False)
+
+        if response.status_code != HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            response.raise_for_status()
+
+        return response
+
+    def _download_open(
+        self, path: str, state: "DownloadState | None", parallel: int, **kwargs
+    ) -> tuple["DownloadState", Response | None]:
+        """Open the first connection of a download and plan the ranges to download.
+        :param path: The path to the resource.
+        :param state: The state of a previously interrupted download of the same file, if any.
+        :param parallel: The maximum number of ranges to download in parallel.
+        :param kwargs: Additional keyword arguments to pass to the request.
+        :return: The state of the download and the response to use for its first pending segment,
+            `None` if the file was already fully downloaded.
+        """
+        pending = [segment for segment in state.segments if not segment.done] if state is not None else []
+
+        if state is not None and not pending:
+            return state, None
+
+        first = pending[0] if pending else DownloadSegment(0, None, 0)
+        response = self._download_request(path, first, state.validator if state is not None else None, **kwargs)
+
+        if response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            response.close()
+
+            if state is None:
+                return DownloadState(0, None), None
+
+            first.end = first.position if first.end is None else first.end
+            first.position = first.end
+            return state, None
+
+        match = DOWNLOAD_CONTENT_RANGE_REGEX.match(response.headers.get("Content-Range", ""))
+
+        if response.status_code == HTTPStatus.PARTIAL_CONTENT and match is not None:
+            if state is not None:
+                logger.debug(f"Resuming download from {state.downloaded} bytes")
+                return state, response
+
+            size = int(match.group("size")) if match.group("size") != "*" else None
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            count = max(1, min(parallel, (size or 0) // DOWNLOAD_PARALLEL_MIN_SIZE))
+            bounds = [index * (size or 0) // count for index in range(count)] + [size]
+            segments = [DownloadSegment(start, end, start) for start, end in pairwise(bounds)]
+            return DownloadState(size, validator, segments), response
+
+        if state is not None:
+            logger.debug("The file changed since the download was interrupted, restarting from scratch")
+
+        if parallel > 1:
+            logger.debug("The server does not support range requests, downloading over a single connection")
+
+        size = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+        return DownloadState(size, None, [DownloadSegment(0, size, 0)]), response
+
+    def _download_segments(  # noqa: PLR0913
+        self,
+        path: str,
+        state: "DownloadState",
+        response: Response | None,
+        *,
+        descriptor: int,
+        stop: Event,
+        progress: Progress,
+        task: TaskID,
+        state_path: Path | None,
+        **kwargs,
+    ):
+        """Download the pending segments of a file in parallel, updating progress and saving the state
+        of the download periodically.
+        :param path: The path to the resource.
+        :param state: The state of the download.
+        :param response: The response to use for the first pending segment.
+        :param descriptor: The file descriptor of the partial file.
+        :param stop: Event set to interrupt the download.
+        :param progress: The progress bar to update.
+        :param task: The task of the progress bar to update.
+        :param state_path: The path to save the state of the download to, `None` to not save it.
+        :param kwargs: Additional keyword arguments to pass to the requests.
+        """
+        pending = [segment for segment in state.segments if not segment.done]
+
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="download") as executor:
+            futures = [
+                executor.submit(
+                    self._download_segment,
+                    path,
+                    segment,
+                    response if index == 0 else None,
+                    descriptor=descriptor,
+                    validator=state.validator,
+                    stop=stop,
+                    **kwargs,
+                )
+                for index, segment in enumerate(pending)
+            ]
+
+            while True:
+                done, not_done = wait(futures, timeout=DOWNLOAD_PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+                progress.update(task, completed=state.downloaded)
+
+                if state_path is not None and state.validator is not None:
+                    state.save(state_path)
+
+                if not not_done or any(future.exception() is not None for future in done):
+                    break
+
+            if not_done:
+                stop.set()
+
+            for future in futures:
+                future.result()
+
+        progress.update(task, completed=state.downloaded)
+
+        if any(not segment.done for segment in pending):
+            raise ConnectorError(f"Download of {path} was interrupted", self)
+
+    def _download_segment(  # noqa: PLR0913
+        self,
+        path: str,
+        segment: DownloadSegment,
+        response: Response | None,
+        *,
+        descriptor: int,
+        validator: str | None,
+        stop: Event,
+        **kwargs,
+    ):
+        """Download a segment of a file to its position in the partial file, retrying from the last chunk received
+        when the connection is interrupted and the server supports range requests.
+        :param path: The path to the resource.
+        :param segment: The segment to download.
+        :param response: The response to read the segment from, a new request is made if `None`.
+        :param descriptor: The file descriptor of the partial file.
+        :param validator: The entity tag or last modification date of the file, `None` if ranges are not supported.
+        :param stop: Event set to interrupt the download.
+        :param kwargs: Additional keyword arguments to pass to the requests.
+        """
+        attempts = 0
+
+        while not segment.done and not stop.is_set():
+            if response is None:
+                try:
+                    response = self._download_request(path, segment, validator, **kwargs)
+                except (RequestException, ConnectorError) as error:
+                    attempts = self._download_retry(segment, validator, attempts, error, stop)
+                    continue
+
+                if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                    response.close()
+                    raise ConnectorError(f"Range {segment} is not served anymore, the file may have changed", self)
+
+            try:
+                self._download_write(descriptor, segment, response, stop)
+            except RequestException as error:
+                attempts = self._download_retry(segment, validator, attempts, error, stop)
+            finally:
+                response.close()
+                response = None
+
+    def _download_write(self, descriptor: int, segment: DownloadSegment, response: Response, stop: Event):
+        """Write the content of a response to the position of its segment in the partial file.
+        :param descriptor: The file descriptor of the partial file.
+        :param segment: The segment being downloaded.
+        :param response: The response serving the segment from its current position.
+        :param stop: Event set to interrupt the download.
+        :raise RequestException: If the connection was closed before the end of the segment.
+        """
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            data = chunk[: segment.end - segment.position] if segment.end is not None else chunk
+            os.pwrite(descriptor, data, segment.position)
+            segment.position += len(data)
+
+            if segment.done or stop.is_set():
+                return
+
+        if segment.end is None:
+            segment.end = segment.position
+        elif not segment.done:
+            raise RequestsConnectionError(f"Connection closed before the end of range {segment}")
+
+    def _download_retry(
+        self, segment: DownloadSegment, validator: str | None, attempts: int, error: Exception, stop: Event
+    ) -> int:
+        """Wait before resuming the download of a segment after its connection was interrupted.
+        :param segment: The interrupted segment.
+        :param validator: The entity tag or last modification date of the file, `None` if ranges are not supported.
+        :param attempts: The number of times the segment was already resumed.
+        :param error: The error that interrupted the download.
+        :param stop: Event set to interrupt the download.
+        :return: The updated number of attempts.
+        :raise ConnectorError: If the segment cannot be resumed.
+        """
+        attempts += 1
+
+        if validator is None or attempts > DOWNLOAD_RETRIES:
+            raise ConnectorError(f"Download of range {segment} failed: {error}", self) from error
+
+        logger.debug(f"Download of range {segment} interrupted, retrying ({attempts}/{DOWNLOAD_RETRIES}): {error}")
+        stop.wait(min(2**attempts / 4, 10))
+        return attempts
+
+    def _download_verify(self, file_path: Path, checksum: str):
+        """Verify the checksum of a downloaded file, removing it if it does not match.
+        :param file_path: The path to the downloaded file.
+        :param checksum: The expected checksum, as `<algorithm>:<hexdigest>`.
+        :raise ConnectorError: If the checksum does not match.
+        """
+        algorithm, _, expected = checksum.partition(":")
+        digest = hashlib.new(algorithm.lower())
+
+        with file_path.open("rb") as file:
+            while chunk := file.read(DOWNLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+
+        if digest.hexdigest() != expected.lower():
+            file_path.unlink(missing_ok=True)
+            file_path.with_name(f"{file_path.name}.json").unlink(missing_ok=True)
+            raise ConnectorError(
+                f"Checksum mismatch for {file_path.name}: expected {expected}, got {digest.hexdigest()}", self
+            )
+
+        logger.debug(f"Verified {algorithm} checksum of {file_path.name}")
@@ -1,6 +1,7 @@
 """Interact with any Odoo database using XML/JSON RPC."""
 
-from collections.abc import Mapping, MutableMapping, Sequence
+from collections.abc import Generator, Mapping, MutableMapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -30,6 +31,9 @@ logger = logging.getLogger(__name__)
 
 FieldsGetMapping = Mapping[str, Mapping[str, str | bool]]
 
+RpcCall = tuple[str, str, Sequence[Any], Mapping[str, Any]]
+"""A call to a model method, as a tuple of model name, method name, positional arguments and keyword arguments."""
+
 
 class RecordMetaData(TypedDict):
     xml_id: str
@@ -39,8 +43,16 @@ class RecordMetaData(TypedDict):
 RPC_DATA_CACHE: MutableMapping[str, MutableMapping[int, RecordData]] = {}
 RPC_FIELDS_CACHE: MutableMapping[str, FieldsGetMapping] = {}
 RPC_DEFAULT_CACHE: MutableMapping[str, FieldsGetMapping] = {}
+RPC_FIELDS_INDEX: MutableMapping[str, MutableMapping[str, set[int]]] = {}
+"""Ids of the records having each field cached in `RPC_DATA_CACHE`, by model and field name."""
+
+RPC_SEARCH_BATCH_SIZE = 1000
+"""Default number of records fetched per request when iterating over search results."""
 HTTPS_PORT = 443
 
+RPC_BATCH_MAX_WORKERS = 8
+"""Maximum number of concurrent calls when executing multiple calls to model methods at once."""
+
 
 class Model:
     """Extended odoolib Model class to add some convenience methods."""
@@ -64,6 +76,7 @@ class Model:
         RPC_DATA_CACHE.setdefault(self._name, {})
         RPC_FIELDS_CACHE.setdefault(self._name, {})
         RPC_DEFAULT_CACHE.setdefault(self._name, {})
+        RPC_FIELDS_INDEX.setdefault(self._name, {})
 
     def __repr__(self) -> str:
         return f"{self._name}()"
@@ -87,6 +100,11 @@ class Model:
         """Return the cache of records of the model."""
         return RPC_DATA_CACHE[self._name]
 
+    @property
+    def cache_index(self) -> MutableMapping[str, set[int]]:
+        """Return the ids of the cached records having each field cached."""
+        return RPC_FIELDS_INDEX[self._name]
+
     @property
     def fields(self) -> FieldsGetMapping:
         """Return the fields of the model."""
@@ -135,26 +153,20 @@ class Model:
         if not fields:
             fields = list(self.fields.keys())
 
+        missing_fields = [field for field in fields if not self.cache_index.get(field, set()).issuperset(ids)]
         missing_ids = [
-            id_ for id_ in ids if id_ not in self.cache or not set(fields).issubset(set(self.cache[id_].keys()))
+            id_ for id_ in ids if any(id_ not in self.cache_index.get(field, ()) for field in missing_fields)
         ]
 
         if missing_ids:
-            missing_fields = set(fields)
-        else:
-            existing_fields = (
-                set.intersection(*({*record.keys()} for record in self.cache.values())) if self.cache else set()
-            )
-            missing_fields = set(fields) - existing_fields
-
-        if missing_ids or missing_fields:
-            records = cast(RecordDataList, self._model.read(list(missing_ids or ids), list(missing_fields), load=load))
+            records = cast(RecordDataList, self._model.read(missing_ids, missing_fields, load=load))
 
             for record in records:
-                if cast(int, record["id"]) in self.cache:
-                    self.cache[cast(int, record["id"])].update(record)
-                else:
-                    self.cache[cast(int, record["id"])] = record
+                record_id = cast(int, record["id"])
+                self.cache.setdefault(record_id, {}).update(record)
+
+                for field in record:
+                    self.cache_index.setdefault(field, set()).add(record_id)
 
         return [self.cache[id_] for id_ in ids]
 
@@ -204,6 +216,50 @@ class Model:
 
         return self.read(ids, fields=fields, load=load)
 
+    def iter_search_read(  # noqa: PLR0913
+        self,
+        domain: Domain,
+        fields: Sequence[str] | None = None,
+        batch_size: int = RPC_SEARCH_BATCH_SIZE,
+        context: Mapping[str, Any] | None = None,
+        load: str | None = None,
+    ) -> Generator[RecordData, None, None]:
+        """Iterate over the data of the records matching the given domain, ordered by id.
+        Records are fetched by batches paginated on their ids, the next batch being fetched
+        while the current one is consumed. Records are not cached, so that memory usage stays bounded
+        regardless of the number of records matching the domain.
+
+        :param domain: The domain to filter the records to export
+        :param fields: The fields to export, all fields by default
+        :param batch_size: The number of records to fetch per request
+        :param context: Additional context to pass to the search
+        :return: A generator yielding the data of the records matching the given domain
+        """
+        if batch_size <= 0:
+            raise ValueError("iter_search_read() requires a positive batch size")
+
+        def fetch(after_id: int) -> RecordDataList:
+            kwargs: dict[str, Any] = {"fields": list(fields or []), "limit": batch_size, "order": "id asc"}
+
+            if context is not None:
+                kwargs["context"] = context
+
+            if load is not None:
+                kwargs["load"] = load
+
+            return cast(
+                RecordDataList,
+                self._connector._execute((self._name, "search_read", [[("id", ">", after_id), *domain]], kwargs)),
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            batch: Future[RecordDataList] | None = executor.submit(fetch, 0)
+
+            while batch is not None:
+                records = batch.result()
+                batch = executor.submit(fetch, cast(int, records[-1]["id"])) if len(records) == batch_size else None
+                yield from records
+
     def read_group(  # noqa: PLR0913
         self,
         domain: Domain,
@@ -350,6 +406,64 @@ class RpcConnector(Connector):
 
         return Model(self, name)
 
+    def batch(self, calls: Sequence[RpcCall], raise_on_error: bool = True) -> list[Any]:
+        """Execute multiple calls to model methods concurrently through the existing connection,
+        as Odoo does not support JSON-RPC batch requests.
+
+        :param calls: The calls to execute, as tuples of model name, method name, arguments and keyword arguments.
+        :param raise_on_error: Whether to raise the first error returned by the server, otherwise errors
+            are returned as instances of `ConnectorError` in place of the results of the calls that failed,
+            i.e. when the user is not allowed to read some of the models.
+        :return: The results of the calls, in the same order.
+        """
+        if not calls:
+            return []
+
+        if not self.connected:
+            self.connect()
+
+        if self._connection is None:
+            raise ConnectorError("Cannot execute calls without an established connection", self)
+
+        self._connection.check_login(force=False)
+
+        with ThreadPoolExecutor(max_workers=min(len(calls), RPC_BATCH_MAX_WORKERS)) as executor:
+            return list(executor.map(self._execute if raise_on_error else self._execute_or_error, calls))
+
+    def _execute(self, call: RpcCall) -> Any:
+        """Execute a single call to a model method.
+
+        :param call: The call to execute.
+        :return: The result of the call.
+        """
+        connection = cast(odoolib.Connection, self._connection)
+        connection.check_login(force=False)
+        model, method, args, kwargs = call
+        return connection.get_service("object").execute_kw(
+            connection.database,
+            connection.user_id,
+            connection.password,
+            model,
+            method,
+            list(args),
+            dict(kwargs),
+        )
+
+    def _execute_or_error(self, call: RpcCall) -> Any:
+        """Execute a single call to a model method, returning the error raised by the server instead of raising it.
+
+        :param call: The call to execute.
+        :return: The result of the call, or the error it raised.
+        """
+        try:
+            return self._execute(call)
+        except ConnectorError as error:
+            return error
+        except odoolib.JsonRPCException as error:
+            return ConnectorError(
+                error.error.get("data", {}).get("message", "Unknown error during JSON RPC call"), self
+            )
+
     def __patch_odoolib_send(self):
         """Monkey patch calls to `execute_kw` to log RPC calls from the connector to a database
         and catch exceptions thrown by the connector for better handling of errors.
@@ -1,11 +1,14 @@
 """Interact with the terminal and the user."""
 
+import atexit
 import os
 import re
+import time
 from collections.abc import Sequence
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from threading import RLock
 from typing import (
     Any,
     ClassVar,
@@ -21,13 +24,16 @@ from prompt_toolkit.validation import ValidationError
 from rich import box
 from rich.console import Console as RichConsole, RenderableType
 from rich.control import Control
+from rich.errors import MarkupError
 from rich.highlighter import ISO8601Highlighter, ReprHighlighter, _combine_regex
 from rich.segment import ControlType
 from rich.syntax import Syntax
 from rich.table import Table
+from rich.text import Text
 from rich.theme import Theme
 
 from odev.common import string
+from odev.common.thread import Thread
 
 
 __all__ = ["Colors", "console"]
@@ -245,11 +251,34 @@ class Console(RichConsole):
     _is_live: ClassVar[bool] = False
     """If True, the console is in live mode and lines clearing will be disabled."""
 
+    batch_size: ClassVar[int] = 500
+    """Maximum number of lines to keep in the batch before flushing it."""
+
+    batch_delay: ClassVar[float] = 0.1
+    """Maximum delay in seconds before lines in the batch are printed."""
+
     def __init__(self, *args, **kwargs):
         kwargs.setdefault("theme", RICH_THEME)
         kwargs.setdefault("highlighter", OdevReprHighlighter())
+
+        self._batch: list[str] = []
+        """Lines waiting to be printed to this console in a single write."""
+
+        self._batch_lock: RLock = RLock()
+        """Lock protecting the batch of lines from concurrent flushes."""
+
+        self._batch_flusher: Thread | None = None
+        """Background thread flushing lines left in the batch after a delay."""
+
         super().__init__(*args, **kwargs)
 
+    def reattach(self) -> None:
+        """Detect the terminal again after the standard streams of the process were replaced,
+        as in processes forked by the odev server to run commands in the terminal of a client.
+        """
+        Console._bypass_prompt, Console._is_live = False, False
+        self.__init__()  # type: ignore [misc]
+
     @property
     def bypass_prompt(self) -> bool:
         """Return True if prompts should be bypassed."""
@@ -333,6 +362,9 @@ class Console(RichConsole):
         :param args: Additional arguments to pass to the print method.
         :param kwargs: Additional keyword arguments to pass to the print method.
         """
+        if self._batch:
+            self.flush_batch()
+
         if isinstance(renderable, str):
             renderable = string.resolve_styles(renderable)
 
@@ -366,6 +398,51 @@ class Console(RichConsole):
         else:
             super().print(renderable, *args, **kwargs)
 
+    def print_batched(self, text: str) -> None:
+        """Queue a line of text to be printed to the console along with other queued lines in a single write.
+        Lines are printed when the batch is full, after a short delay or before anything else is printed
+        to the console, whichever comes first.
+        Aliased styles are not resolved, build markup with `string.stylize` to use them.
+        :param text: The line to print, may contain markup.
+        """
+        with self._batch_lock:
+            self._batch.append(text)
+
+            if len(self._batch) >= self.batch_size:
+                self.flush_batch()
+
+            if self._batch_flusher is None:
+                self._batch_flusher = Thread(target=self.__flush_batch_periodically, name="console-batch", daemon=True)
+                self._batch_flusher.start()
+                atexit.register(self.flush_batch)
+
+    def flush_batch(self) -> None:
+        """Print all lines queued with `print_batched`.
+        Each line is rendered on its own so that its markup, valid or not, does not affect the other lines
+        of the batch; lines with invalid markup are printed as plain text.
+        """
+        with self._batch_lock:
+            if not self._batch:
+                return
+
+            lines = self._batch.copy()
+            self._batch.clear()
+            texts: list[Text] = []
+
+            for line in lines:
+                try:
+                    texts.append(Text.from_markup(line))
+                except MarkupError:
+                    texts.append(Text(line))
+
+            super().print(Text("\n").join(texts), highlight=False, soft_wrap=False)
+
+    def __flush_batch_periodically(self) -> None:
+        """Flush queued lines at regular intervals, run in a background thread."""
+        while True:
+            time.sleep(self.batch_delay)
+            self.flush_batch()
+
     def table(
         self,
         headers: Sequence[TableHeader],
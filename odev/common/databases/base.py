@@ -1,6 +1,7 @@
 """Handling of database information."""
 
 from abc import ABC, abstractmethod, abstractproperty
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -236,9 +237,12 @@ class Database(OdevFrameworkMixin, ABC):
         """
         raise NotImplementedError(f"Database dump not implemented for {self.platform.display} databases")
 
-    def restore(self, file: Path):
+    def restore(self, file: Path, filters: Mapping[str, float] | None = None, fast_restore: bool = False):
         """Restore the database from a dump file.
         :param file: The path to the dump file.
+        :param filters: A mapping of table names to the ratio of their rows to restore, 0 to skip all rows.
+        :param fast_restore: Whether to restore with settings suited to bulk loads and report the time spent
+            in each phase of the restore.
         """
         raise NotImplementedError(f"Database restore not implemented for {self.platform.display} databases")
 
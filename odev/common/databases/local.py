@@ -1,9 +1,9 @@
 """PostgreSQL database class."""
 
-import bz2
-import gzip
+import asyncio
 import os
 import re
+import shlex
 import shutil
 import sys
 import tempfile
@@ -12,10 +12,10 @@ from datetime import datetime
 from functools import cached_property
 from pathlib import Path
 from subprocess import PIPE, Popen
-from time import sleep
+from time import perf_counter, sleep
 from types import FrameType
 from typing import (
-    IO,
+    TYPE_CHECKING,
     ClassVar,
     Literal,
     Union,
@@ -27,6 +27,7 @@ from packaging.version import Version
 
 from odev.common import bash, progress, string
 from odev.common.connectors import GitWorktree, PostgresConnector
+from odev.common.connectors.postgres import Cursor
 from odev.common.databases import Branch, Database, Filestore, Repository
 from odev.common.databases.base import DatabaseInfoSection
 from odev.common.errors import OdevError
@@ -34,11 +35,26 @@ from odev.common.logging import logging
 from odev.common.mixins import PostgresConnectorMixin, ensure_connected
 from odev.common.odoobin import OdoobinProcess
 from odev.common.python import PythonEnv
+from odev.common.restore import (
+    FAST_RESTORE_SETTINGS,
+    RESTORE_PHASES,
+    RestoreInput,
+    SqlFilter,
+    StreamingDownload,
+    ZipMemberReader,
+    filter_restore_list,
+    split_restore_list,
+)
 from odev.common.signal_handling import capture_signals
 from odev.common.thread import Thread
 from odev.common.version import OdooVersion
 
 
+if TYPE_CHECKING:
+    from odev.common.store.tables.facts import DatabaseFacts
+    from odev.common.store.tables.snapshots import Snapshot
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +73,24 @@ SQL_DUMP_RESTRICT_BACKPORTS = [
 
 NEUTRALIZE_BEFORE_ODOO_VERSION = OdooVersion("15.0")
 
+FILESTORE_TRASH_DIRECTORY = ".odev-trash"
+"""Directory next to the filestores of local databases, to which filestores are moved before being removed
+in the background.
+"""
+
+SNAPSHOTS_DIRECTORY = ".odev-snapshots"
+"""Directory next to the filestores of local databases, in which copies of filestores are kept for snapshots."""
+
+DATABASE_FACTS_QUERY = """
+    SELECT
+        (SELECT latest_version FROM ir_module_module WHERE name = 'base' LIMIT 1),
+        EXISTS(SELECT 1 FROM ir_module_module WHERE license LIKE 'OEEL-%' AND state = 'installed'),
+        (SELECT value FROM ir_config_parameter WHERE key = 'database.uuid' LIMIT 1),
+        EXISTS(SELECT 1 FROM ir_config_parameter WHERE key = 'database.is_neutralized'),
+        (SELECT value FROM ir_config_parameter WHERE key = 'database.expiration_date' LIMIT 1)
+"""
+"""Query reading the metadata of an Odoo database stored as facts in the datastore."""
+
 
 class LocalDatabase(PostgresConnectorMixin, Database):
     """Class for manipulating PostgreSQL (local) databases."""
@@ -91,6 +125,9 @@ class LocalDatabase(PostgresConnectorMixin, Database):
     _process: OdoobinProcess | None = None
     """The Odoo process running the database."""
 
+    _restore_timings: dict[str, float]
+    """Time spent in each phase of the last restore, in seconds."""
+
     def __init__(self, name: str):
         """Initialize the database.
         :param name: The name of the database.
@@ -113,12 +150,67 @@ class LocalDatabase(PostgresConnectorMixin, Database):
         return self.process and self.process.rpc_port
 
     @property
-    def is_odoo(self) -> bool:
-        if not self.exists:
-            return False
+    def facts(self) -> "DatabaseFacts":
+        """Metadata of the database, read from the datastore while still valid instead of connecting to the database."""
+        facts = self.store.facts.get(self.name)
 
-        with self:
-            return self.table_exists("ir_module_module")
+        if facts is None:
+            facts = self._inspect_facts()
+            self.store.facts.set(self.name, facts)
+
+        return facts
+
+    def _inspect_facts(self) -> "DatabaseFacts":
+        """Read the metadata of the database in a single query."""
+        from odev.common.store.tables.facts import DatabaseFacts  # noqa: PLC0415 - the datastore imports databases
+
+        with self, cast(PostgresConnector, self.connector).nocache():
+            if not self.table_exists("ir_module_module"):
+                return DatabaseFacts()
+
+            result = cast(PostgresConnector, self.connector).query(DATABASE_FACTS_QUERY)
+
+        return self._build_facts(cast(list[tuple], result)[0])
+
+    async def async_facts(self) -> "DatabaseFacts":
+        """Asynchronous variant of `facts`, connecting to the database only if facts are outdated."""
+        facts = self.store.facts.get(self.name)
+
+        if facts is None:
+            facts = await self._async_inspect_facts()
+            self.store.facts.set(self.name, facts)
+
+        return facts
+
+    async def _async_inspect_facts(self) -> "DatabaseFacts":
+        """Asynchronous variant of `_inspect_facts`."""
+        from odev.common.store.tables.facts import DatabaseFacts  # noqa: PLC0415 - the datastore imports databases
+
+        async with self.async_psql(self.name) as psql:
+            if not await psql.table_exists("ir_module_module", nocache=True):
+                return DatabaseFacts()
+
+            result = await psql.query(DATABASE_FACTS_QUERY, nocache=True)
+
+        return self._build_facts(cast(list[tuple], result)[0])
+
+    def _build_facts(self, row: tuple) -> "DatabaseFacts":
+        """Build the facts about an Odoo database from the result of `DATABASE_FACTS_QUERY`."""
+        from odev.common.store.tables.facts import DatabaseFacts  # noqa: PLC0415 - the datastore imports databases
+
+        version, enterprise, uuid, neutralized, expiration_date = row
+        return DatabaseFacts(
+            odoo=True,
+            version=version,
+            edition="enterprise" if enterprise else "community",
+            uuid=uuid,
+            neutralized=neutralized,
+            expiration_date=expiration_date,
+        )
+
+    @property
+    def is_odoo(self) -> bool:
+        return self.facts.odoo
 
     @property
     def venv(self) -> PythonEnv:
@@ -171,51 +263,164 @@ class LocalDatabase(PostgresConnectorMixin, Database):
         if not self.is_odoo:
             return None
 
-        with self:
-            result = self.connector.query(
-                """
-                SELECT latest_version
-                FROM ir_module_module
-                WHERE name = 'base'
-                LIMIT 1
-                """
-            )
-
-        if result and not isinstance(result, bool):
-            version = result[0][0]
-
-            if version is not None:
-                return OdooVersion(version)
-
-        return OdooVersion("master")
+        return OdooVersion(self.facts.version or "master")
 
     @cached_property
     def edition(self) -> Literal["community", "enterprise"] | None:  # type: ignore [override]
-        if not self.is_odoo:
-            return None
-
-        with self:
-            result = cast(PostgresConnector, self.connector).query(
-                """
-                SELECT true
-                FROM ir_module_module
-                WHERE license LIKE 'OEEL-%'
-                    AND state = 'installed'
-                LIMIT 1
-                """
-            )
-
-        return "enterprise" if result and result is not True and result[0][0] else "community"
+        return cast(Literal["community", "enterprise"] | None, self.facts.edition)
 
     @property
     def filestore(self) -> Filestore:
         if self._filestore is None:
-            path: Path = Path.home() / ".local/share/Odoo/filestore/" / self.name
+            path: Path = self.filestore_path
             size: int = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
             self._filestore = Filestore(path=path, size=size)
 
         return self._filestore
 
+    @property
+    def filestore_path(self) -> Path:
+        """Path to the filestore of the database, without computing its size."""
+        return Path.home() / ".local/share/Odoo/filestore/" / self.name
+
+    def trash_filestore(self) -> Path | None:
+        """Move the filestore of the database to the trash, which is instantaneous whatever its size.
+        Trashed filestores are removed by `empty_filestore_trash`.
+
+        :return: The path the filestore was moved to, `None` if the database has no filestore.
+        """
+        path = self.filestore_path
+
+        if not path.exists():
+            logger.debug(f"No filestore found for database {self.name!r}")
+            return None
+
+        trash = path.parent / FILESTORE_TRASH_DIRECTORY / f"{self.name}-{string.suid()}"
+        trash.parent.mkdir(parents=True, exist_ok=True)
+        path.rename(trash)
+        self._filestore = None
+        return trash
+
+    @classmethod
+    def empty_filestore_trash(cls):
+        """Remove trashed filestores in a detached process, without waiting for it to complete."""
+        trash = Path.home() / ".local/share/Odoo/filestore/" / FILESTORE_TRASH_DIRECTORY
+
+        if trash.is_dir() and any(trash.iterdir()):
+            bash.detached(f"rm -rf {shlex.quote(trash.as_posix())}/*")
+
+    @staticmethod
+    def clone_filestore(source: Path, destination: Path):
+        """Copy a filestore as a copy-on-write clone on filesystems supporting it (i.e. Btrfs, XFS or APFS),
+        which is almost instantaneous and takes no additional space whatever the size of the filestore.
+        Files are copied the regular way on other filesystems.
+
+        :param source: The path to the filestore to copy.
+        :param destination: The path to copy the filestore to, must not exist.
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        paths = f"{shlex.quote(source.as_posix())} {shlex.quote(destination.as_posix())}"
+
+        if sys.platform != "darwin":
+            bash.execute(f"cp -a --reflink=auto {paths}")
+        elif bash.execute(f"cp -cR {paths}", raise_on_error=False) is None:
+            # Files cannot be cloned outside of APFS volumes
+            shutil.rmtree(destination, ignore_errors=True)
+            shutil.copytree(source, destination)
+
+    def snapshot(self, name: str) -> "Snapshot":
+        """Take a snapshot of the database, saved as a PostgreSQL template along with a clone of its filestore.
+        The database must not be in use while its content is copied.
+
+        :param name: The name of the snapshot, an existing snapshot with the same name is replaced.
+        :return: The snapshot taken.
+        """
+        from odev.common.store.tables.snapshots import Snapshot  # noqa: PLC0415 - the datastore imports databases
+
+        snapshot = Snapshot(self.name, name, f"odev-snapshot-{string.suid()}", None, datetime.now())
+
+        if isinstance(self.connector, PostgresConnector):
+            self.connector.disconnect()
+
+        with self.psql() as psql:
+            psql.create_database(snapshot.template, template=self.name, file_copy=True)
+            psql.query(
+                f"""
+                ALTER DATABASE "{snapshot.template}"
+                WITH IS_TEMPLATE true ALLOW_CONNECTIONS false
+                """,
+                transaction=False,
+            )
+
+        if self.filestore_path.exists():
+            filestore = self.filestore_path.parent / SNAPSHOTS_DIRECTORY / snapshot.template
+            self.clone_filestore(self.filestore_path, filestore)
+            snapshot.filestore = filestore.as_posix()
+
+        if previous := self.store.snapshots.get(self.name, name):
+            self.drop_snapshot(previous)
+
+        self.store.snapshots.set(snapshot)
+        return snapshot
+
+    def rollback(self, snapshot: "Snapshot") -> bool:
+        """Replace the database and its filestore with the content of a snapshot.
+        The stored configuration of the database is kept.
+
+        :param snapshot: The snapshot to roll back to.
+        :return: Whether the database was recreated from the snapshot.
+        """
+        with self.psql() as psql, psql.nocache():
+            if not psql.database_exists(snapshot.template):
+                raise OdevError(f"Template {snapshot.template!r} of snapshot {snapshot.name!r} does not exist")
+
+        if isinstance(self.connector, PostgresConnector):
+            self.connector.disconnect()
+
+        self.trash_filestore()
+
+        with self.psql() as psql:
+            psql.drop_database(self.name)
+            created = psql.create_database(self.name, template=snapshot.template, file_copy=True)
+
+        if snapshot.filestore is not None and Path(snapshot.filestore).exists():
+            self.clone_filestore(Path(snapshot.filestore), self.filestore_path)
+
+        self.empty_filestore_trash()
+        self.store.facts.delete(self.name)
+        self.store.catalogue.discard(self.name)
+        self.store.catalogue.record(self.name)
+        return created
+
+    def drop_snapshot(self, snapshot: "Snapshot"):
+        """Drop the template and remove the filestore of a snapshot of the database, then forget about it.
+
+        :param snapshot: The snapshot to drop.
+        """
+        with self.psql() as psql, psql.nocache():
+            if psql.database_exists(snapshot.template):
+                psql.query(
+                    f"""
+                    ALTER DATABASE "{snapshot.template}"
+                    WITH IS_TEMPLATE false
+                    """,
+                    transaction=False,
+                )
+                psql.drop_database(snapshot.template)
+
+        if snapshot.filestore is not None and Path(snapshot.filestore).exists():
+            trash = self.filestore_path.parent / FILESTORE_TRASH_DIRECTORY / Path(snapshot.filestore).name
+            trash.parent.mkdir(parents=True, exist_ok=True)
+            Path(snapshot.filestore).rename(trash)
+            self.empty_filestore_trash()
+
+        self.store.snapshots.delete(self.name, snapshot.name)
+
+    def drop_snapshots(self):
+        """Drop all the snapshots of the database."""
+        for snapshot in self.store.snapshots.all(self.name):
+            self.drop_snapshot(snapshot)
+
     @property
     def url(self) -> str | None:
         if not self.is_odoo or self.process is None:
@@ -239,43 +444,19 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
     @property
     def expiration_date(self) -> datetime | None:
-        if not self.is_odoo:
-            return None
+        expiration_date = self.facts.expiration_date
 
-        with self:
-            result = cast(PostgresConnector, self.connector).query(
-                """
-                SELECT value
-                FROM ir_config_parameter
-                WHERE key = 'database.expiration_date'
-                LIMIT 1
-                """
-            )
-
-        if not result or result is True:
+        if not expiration_date:
             return None
 
         try:
-            return datetime.strptime(result[0][0], "%Y-%m-%d %H:%M:%S")
+            return datetime.strptime(expiration_date, "%Y-%m-%d %H:%M:%S")
         except ValueError:
-            return datetime.strptime(result[0][0], "%Y-%m-%d")
+            return datetime.strptime(expiration_date, "%Y-%m-%d")
 
     @property
     def uuid(self) -> str | None:
-        if not self.is_odoo:
-            return None
-
-        with self:
-            result = cast(PostgresConnector, self.connector).query(
-                """
-                SELECT value
-                FROM ir_config_parameter
-                WHERE key = 'database.uuid'
-                LIMIT 1
-                """
-            )
-
-        return None if not result or isinstance(result, bool) else result[0][0]
+        return self.facts.uuid
 
     @property
     def last_date(self) -> datetime | None:
@@ -323,6 +504,67 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         return None if not result or isinstance(result, bool) else result[0][0]
 
+    async def async_size(self) -> int:
+        """Asynchronous variant of `size`."""
+        async with self.async_psql() as psql:
+            result = await psql.query(
+                f"""
+                SELECT pg_database_size(datname)
+                FROM pg_database
+                WHERE datname = '{self.name}'
+                LIMIT 1
+                """
+            )
+
+        return cast(int, result[0][0]) if result and result is not True else 0
+
+    async def async_last_date(self) -> datetime | None:
+        """Asynchronous variant of `last_date`, reading both dates concurrently."""
+        if not (await self.async_facts()).odoo:
+            return None
+
+        last_access, last_usage = await asyncio.gather(self.async_last_access_date(), self.async_last_usage_date())
+
+        if last_access and last_usage:
+            return max(last_access, last_usage)
+
+        return last_access or last_usage
+
+    async def async_last_usage_date(self) -> datetime | None:
+        """Asynchronous variant of `last_usage_date`."""
+        if not (await self.async_facts()).odoo:
+            return None
+
+        async with self.async_psql(self.odev.name) as psql:
+            result = await psql.query(
+                f"""
+                SELECT date
+                FROM history
+                WHERE database = '{self.name}'
+                ORDER BY date DESC
+                LIMIT 1
+                """
+            )
+
+        return None if not result or isinstance(result, bool) else result[0][0]
+
+    async def async_last_access_date(self) -> datetime | None:
+        """Asynchronous variant of `last_access_date`."""
+        if not (await self.async_facts()).odoo:
+            return None
+
+        async with self.async_psql(self.name) as psql:
+            result = await psql.query(
+                """
+                SELECT create_date
+                FROM res_users_log
+                ORDER BY create_date DESC
+                LIMIT 1
+                """
+            )
+
+        return None if not result or isinstance(result, bool) else result[0][0]
+
     @property
     def exists(self) -> bool:
         """Check if the database exists."""
@@ -407,15 +649,7 @@ class LocalDatabase(PostgresConnectorMixin, Database):
     @property
     def neutralized(self):
         """Whether the database is neutralized."""
-        return self.is_odoo and bool(
-            self.query(
-                """
-                SELECT value
-                FROM ir_config_parameter
-                WHERE key = 'database.is_neutralized'
-                """
-            )
-        )
+        return self.facts.neutralized
 
     @property
     def installed_modules(self) -> list[str]:
@@ -447,13 +681,22 @@ class LocalDatabase(PostgresConnectorMixin, Database):
         with self.psql() as psql:
             created = psql.create_database(self.name, template=template)
 
+        self.store.facts.delete(self.name)
+
         if created and self.is_odoo:
             self.store.databases.set(self)
+            self.store.catalogue.record(self.name)
 
         return created
 
-    def drop(self) -> bool:
-        shutil.rmtree(self.filestore.path, ignore_errors=True)
+    def drop(self, keep_snapshots: bool = False) -> bool:
+        """Drop the database and remove its filestore.
+
+        :param keep_snapshots: Keep the snapshots of the database, to roll back to them later.
+        :return: Whether the database was dropped.
+        """
+        self.trash_filestore()
+        self.empty_filestore_trash()
 
         if isinstance(self.connector, PostgresConnector):
             self.connector.disconnect()
@@ -463,6 +706,11 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         if deleted:
             self.store.databases.delete(self)
+            self.store.facts.delete(self.name)
+            self.store.catalogue.discard(self.name)
+
+            if not keep_snapshots:
+                self.drop_snapshots()
 
         return deleted
 
@@ -474,8 +722,12 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             # Artificially wait for SQL transaction to be committed and for the process to be ready
             # before running the neutralize command
             # This is not clean but it works, I guess
-            while (not self.process or not self.version) and (retries := 0) < max_retries:
-                retries += 1
+            for _ in range(max_retries):
+                self.store.facts.invalidate(self.name)
+
+                if self.process and self.version:
+                    break
+
                 sleep(0.2)
 
         admin = self._db_user_admin()
@@ -501,34 +753,58 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             self.process.run(["-d", self.name], subcommand="neutralize")
             self.console.print()
 
-        installed_modules: set[str] = set(self.installed_modules) & {
-            path.name for path in self.process.additional_addons_paths
-        }
+        modules_index = self.process.modules_index(self.process.additional_addons_paths)
         scripts: list[Path] = [self.odev.static_path / "neutralize-pre.sql"]
 
-        with progress.spinner(f"Looking up neutralization scripts in {len(installed_modules)} installed modules"):
-            for addon in self.process.additional_addons_paths:
-                for module in installed_modules:
-                    neutralize_path: Path = addon / module / "data" / "neutralize.sql"
-
-                    if neutralize_path.is_file():
-                        scripts.append(neutralize_path)
+        scripts.extend(
+            path
+            for path in (
+                modules_index[module] / "data" / "neutralize.sql"
+                for module in self.installed_modules
+                if module in modules_index
+            )
+            if path.is_file()
+        )
 
         scripts.append(self.odev.static_path / "neutralize-post.sql")
 
         if self.version < NEUTRALIZE_BEFORE_ODOO_VERSION:
             scripts.append(self.odev.static_path / "neutralize-post-before-15.0.sql")
 
-        tracker = progress.Progress()
+        self._run_neutralize_scripts(scripts)
+        self.store.facts.delete(self.name)
 
+    def _run_neutralize_scripts(self, scripts: list[Path]):
+        """Run neutralization scripts in a single transaction, rolling back all changes if any of them fails.
+        :param scripts: Paths to the SQL scripts to run, in order.
+        """
+        connector = cast(PostgresConnector, self.connector)
+        timings: list[tuple[Path, float]] = []
+        tracker = progress.Progress()
         task = tracker.add_task(f"Running {len(scripts)} neutralization scripts", total=len(scripts))
         tracker.start()
 
-        for python_file in scripts:
-            tracker.update(task, advance=1, description=self.console.render_str(f"Running {python_file.as_posix()}"))  # type: ignore [attr-defined]
-            self.query(python_file.read_text())
+        try:
+            with connector.nocache(), cast(Cursor, connector.cr).transaction():
+                for script in scripts:
+                    tracker.update(task, advance=1, description=self.console.render_str(f"Running {script.as_posix()}"))  # type: ignore [attr-defined]
+                    start = perf_counter()
+
+                    if connector.query(script.read_text(), transaction=False) is False:
+                        raise OdevError(f"Neutralization was interrupted while running {script.as_posix()}")
 
-        tracker.stop()
+                    timings.append((script, perf_counter() - start))
+        finally:
+            tracker.stop()
+
+        for script, elapsed in timings:
+            logger.debug(f"Ran neutralization script {script.as_posix()} in {elapsed:.3f}s")
+
+        slowest, slowest_elapsed = max(timings, key=lambda timing: timing[1])
+        logger.info(
+            f"Ran {len(timings)} neutralization scripts in {sum(elapsed for _, elapsed in timings):.2f}s, "
+            f"slowest was {slowest.as_posix()} ({slowest_elapsed:.2f}s)"
+        )
 
     def dump(self, filestore: bool = False, path: Path | None = None) -> Path:
         if path is None:
@@ -565,8 +841,9 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         return file
 
-    def restore(self, file: Path):
+    def restore(self, file: Path, filters: Mapping[str, float] | None = None, fast_restore: bool = False):
         tracker = progress.Progress(download=True)
+        self._restore_timings = {}
 
         def signal_handler_progress(
             signal_number: int,
@@ -582,24 +859,29 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             raise KeyboardInterrupt
 
         with capture_signals(handler=signal_handler_progress):
-            if file.suffix == ".sql":
-                self._restore_sql(file, tracker)
+            if file.suffix in [".sql", ".gz", ".bz", ".bz2"]:
+                self._restore_buffer(file, tracker, filters, fast_restore)
             elif file.suffix == ".dump":
-                self._restore_dump(file, tracker)
+                self._restore_dump(file, tracker, filters, fast_restore)
             elif file.suffix == ".zip":
-                self._restore_zip(file, tracker)
-            elif file.suffix == ".gz":
-                self._restore_gzip(file, tracker)
-            elif file.suffix in [".bz", ".bz2"]:
-                self._restore_bzip(file, tracker)
+                self._restore_zip(file, tracker, filters, fast_restore)
             else:
                 logger.error(f"Unrecognized extension {file.suffix!r} for dump {file}")
 
         tracker.stop()
 
+        if fast_restore:
+            self._restore_analyze()
+            self._restore_report_phases()
+
         if self.connector is not None:
             self.connector.invalidate_cache()
 
+        self.store.facts.delete(self.name)
+
+        if self.is_odoo:
+            self.store.catalogue.record(self.name)
+
     def _restore_zip_filestore(self, tracker: progress.Progress, archive: ZipFile) -> Thread | None:
         """Restore the filestore from a zip archive.
         :param archive: The archive to restore the filestore from.
@@ -706,20 +988,26 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         tracker.remove_task(task_id)
 
-    def _restore_buffered_sql(
+    def _restore_buffered_sql(  # noqa: PLR0913
         self,
         tracker: progress.Progress,
-        dump: gzip.GzipFile | bz2.BZ2File | IO[bytes],
-        bytes_count: int,
+        dump: RestoreInput,
         mode: Literal["sql", "dump"] = "sql",
         fast_mode: bool = True,
+        *,
+        filters: Mapping[str, float] | None = None,
+        restore_list: Path | None = None,
+        fast_restore: bool = False,
     ) -> Thread:
         """Restore SQL data from a buffered dump file.
         :param tracker: An instance of Progress to track the restore process.
-        :param dump: The dump file to restore SQL data from.
-        :param bytes_count: The total number of bytes to track.
+        :param dump: The opened dump file to restore SQL data from.
         :param mode: The mode to use when restoring the dump, either `sql` or `dump`.
         :param fast_mode: Whether to run the restore in fast mode.
+        :param filters: A mapping of table names to the ratio of their rows to restore, plain SQL dumps only.
+        :param restore_list: Path to the filtered table of contents to restore, custom dumps only.
+        :param fast_restore: Whether to restore with settings suited to bulk loads and track the time spent
+            in each phase of the restore, plain SQL dumps only.
         """
         if mode == "sql":
             self._buffered_sql_check_restrict(dump)
@@ -727,21 +1015,28 @@ class LocalDatabase(PostgresConnectorMixin, Database):
         elif mode == "dump":
             self.unaccent()
 
-        command = self._buffered_sql_restore_command(mode=mode, fast_mode=fast_mode)
-
-        # Adding 1 to the bytes count so that the progress bar doesn't reach 100%
-        # until the process is complete and the last buffered line has been processed
-        extract_task_id = tracker.add_task("Restoring dump from archive", total=bytes_count)
+        command = self._buffered_sql_restore_command(
+            mode=mode, fast_mode=fast_mode, restore_list=restore_list, fast_restore=fast_restore
+        )
+        sql_filter = SqlFilter(filters or {}) if mode == "sql" and (filters or fast_restore) else None
+        extract_task_id = tracker.add_task("Restoring dump from archive", total=dump.size)
         tracker.start()
 
         psql_process: Popen[bytes] = Popen(command, shell=True, stdin=PIPE, stdout=PIPE, stderr=PIPE, bufsize=-1)  # noqa: S602
         thread = Thread(target=self._restore_zip_sql_threaded, args=(psql_process,))
         thread.start()
+        start = phase_start = perf_counter()
+        ingest_time: float = 0.0
 
         try:
-            for line in dump:
-                psql_process.stdin.write(line)
-                tracker.update(extract_task_id, advance=len(line))
+            for chunk in sql_filter.filter(dump.chunks()) if sql_filter is not None else dump.chunks():
+                write_start = perf_counter()
+                psql_process.stdin.write(chunk)
+                ingest_time += perf_counter() - write_start
+                tracker.update(extract_task_id, completed=dump.consumed, total=dump.size)
+
+                if fast_restore and sql_filter is not None:
+                    phase_start = self._restore_track_phase(sql_filter.phase, phase_start)
 
         except BrokenPipeError as error:
             # Close the buffered writer, avoid BrokenPipe errors
@@ -760,14 +1055,21 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             )
 
             if fast_mode:
-                dump.seek(0)
                 logger.warning("Retrying in degraded mode (slower and ignoring errors)")
-                return self._restore_buffered_sql(tracker, dump, bytes_count, mode, fast_mode=False)
+                return self._restore_buffered_sql(
+                    tracker,
+                    dump.reopen(),
+                    mode,
+                    fast_mode=False,
+                    filters=filters,
+                    restore_list=restore_list,
+                    fast_restore=fast_restore,
+                )
 
             if mode == "sql":
                 odev_psql_version = OdoobinProcess.get_psql_version()
                 dump_psql_version = re.search(
-                    r"Dumped from database version (\d+\.\d+)", dump.read(4000).decode()
+                    r"Dumped from database version (\d+\.\d+)", dump.peek(4000).decode(errors="replace")
                 ).group(1)
                 logger.warning(
                     "This could be a PostgreSQL version mismatch between the dump and the installed psql client:\n"
@@ -780,14 +1082,94 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
             raise OdevError("Restore aborted") from error
 
+        write_start = perf_counter()
         psql_process.stdin.close()
         thread.join()
+        ingest_time += perf_counter() - write_start
+        self._restore_report_timings(dump, perf_counter() - start, ingest_time)
+
+        if fast_restore and sql_filter is not None:
+            self._restore_track_phase(sql_filter.phase, phase_start)
+
+        if sql_filter is not None:
+            self._restore_report_filter(sql_filter)
 
         if psql_process.returncode or (errors := psql_process.stderr.read().decode().replace("\n" * 3, "\n")):
             logger.error(f"Errors occurred during the restore process:\n{errors}")
 
         return thread
 
+    def _restore_report_timings(self, dump: RestoreInput, elapsed: float, ingest_time: float):
+        """Log the time spent decompressing and ingesting a dump to identify the slowest side of the restore.
+        :param dump: The restored dump.
+        :param elapsed: Total time spent restoring the dump, in seconds.
+        :param ingest_time: Time spent waiting for the restore process to accept data, in seconds.
+        """
+        if dump.compression is None:
+            logger.info(f"Restored {dump.name} in {elapsed:.1f}s")
+            return
+
+        logger.info(
+            f"Restored {dump.name} in {elapsed:.1f}s "
+            f"(decompression: {dump.decompression_time:.1f}s, ingest: {ingest_time:.1f}s)"
+        )
+        bottleneck = "decompression" if dump.decompression_wait_time > ingest_time else "ingest"
+        logger.debug(
+            f"Restore was bound by {bottleneck}: waited {dump.decompression_wait_time:.1f}s for decompressed data "
+            f"and {ingest_time:.1f}s for the restore process to accept it"
+        )
+
+    def _restore_track_phase(self, phase: str, start: float) -> float:
+        """Add the time elapsed since `start` to the time spent in a phase of the restore.
+        :param phase: The phase of the restore, see `RESTORE_PHASES`.
+        :param start: When the phase was last entered or tracked, as returned by `perf_counter`.
+        :return: The current time, to be used as the start of the next tracked period.
+        """
+        now = perf_counter()
+        self._restore_timings[phase] = self._restore_timings.get(phase, 0.0) + now - start
+        return now
+
+    def _restore_report_phases(self):
+        """Log the time spent in each phase of the last restore."""
+        phases = [
+            f"{phase}: {self._restore_timings[phase]:.1f}s"
+            for phase in RESTORE_PHASES
+            if phase in self._restore_timings
+        ]
+
+        if phases:
+            logger.info(f"Restore phases: {', '.join(phases)}")
+
+    def _restore_analyze(self):
+        """Collect minimal planner statistics on the restored database so that it can be used right away,
+        then refine them in the background.
+        """
+        database = shlex.quote(self.name)
+        jobs = os.cpu_count() or 1
+        start = perf_counter()
+        logger.debug(f"Analyzing database {self.name!r}")
+        bash.execute(
+            "PGOPTIONS='-c default_statistics_target=1 -c vacuum_cost_delay=0' "
+            f"vacuumdb --analyze-only --jobs {jobs} --dbname {database}",
+            raise_on_error=False,
+        )
+        self._restore_track_phase("analyze", start)
+        bash.detached(f"vacuumdb --analyze-in-stages --jobs {jobs} --dbname {database}")
+        logger.debug(f"Refining planner statistics of database {self.name!r} in the background")
+
+    def _restore_report_filter(self, sql_filter: SqlFilter):
+        """Log the number of rows filtered out of a restored dump.
+        :param sql_filter: The filter applied to the dump.
+        """
+        for table, rows in sql_filter.rows.items():
+            logger.info(f"Restored {sql_filter.rows_kept[table]:,} out of {rows:,} rows of table {table!r}")
+
+        if sql_filter.constraints:
+            logger.debug(
+                f"Created {len(sql_filter.constraints)} foreign keys referencing filtered tables as NOT VALID:\n"
+                + string.join_bullet(sql_filter.constraints)
+            )
+
     def _restore_zip_sql_threaded(self, process: Popen[bytes]):
         """Thread to monitor the restore process of a zipped dump file and update the progress tracker.
         :param process: The process to monitor.
@@ -796,12 +1178,24 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             if process.poll() is not None:
                 break
 
-    def _restore_zip(self, file: Path, tracker: progress.Progress):
+    def _restore_zip(
+        self,
+        file: Path,
+        tracker: progress.Progress,
+        filters: Mapping[str, float] | None = None,
+        fast_restore: bool = False,
+    ):
         """Restore a database from a zip archive containing a dump file and optionally a filestore.
 
         :param file: The path to the zip archive.
         :param tracker: An instance of Progress to track the restore process.
+        :param filters: A mapping of table names to the ratio of their rows to restore.
+        :param fast_restore: Whether to restore with the fast-restore profile.
         """
+        if (download := StreamingDownload.get(file)) is not None:
+            self._restore_zip_streaming(file, download, tracker, filters, fast_restore)
+            return
+
         with ZipFile(file, "r") as archive:
             if ARCHIVE_DUMP not in archive.namelist():
                 logger.error(
@@ -817,8 +1211,12 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
             neuter_filestore = None in threads
 
-            with archive.open(ARCHIVE_DUMP) as dump:
-                threads.append(self._restore_buffered_sql(tracker, dump, archive.getinfo(dump.name).file_size))
+            dump = RestoreInput(
+                ARCHIVE_DUMP, lambda: archive.open(ARCHIVE_DUMP), archive.getinfo(ARCHIVE_DUMP).file_size
+            )
+
+            with dump:
+                threads.append(self._restore_buffered_sql(tracker, dump, filters=filters, fast_restore=fast_restore))
 
             [thread.join() for thread in threads if thread is not None and thread.is_alive()]
 
@@ -828,57 +1226,157 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
             tracker.stop()
 
-    def _restore_buffer(self, tracker: progress.Progress, dump: gzip.GzipFile | bz2.BZ2File | IO[bytes]):
-        """Restore a database from a stream containing a dump file and optionally a filestore.
-        :param tracker: An instance of Progress to track the restore process.
-        :param dump: The buffered dump file to restore SQL data from.
-        """
-        dump.seek(0, 2)
-        bytes_count: int = dump.tell()
-        dump.seek(0)
-        self._restore_buffered_sql(tracker, dump, bytes_count)
-
-    def _restore_gzip(self, file: Path, tracker: progress.Progress):
-        """Restore a database from a gzip archive containing a dump file and optionally a filestore.
-        :param file: The path to the gzip archive.
-        :param tracker: An instance of Progress to track the restore process.
-        """
-        with gzip.open(file, "r") as dump:
-            self._restore_buffer(tracker, dump)
+    def _restore_zip_streaming(
+        self,
+        file: Path,
+        download: StreamingDownload,
+        tracker: progress.Progress,
+        filters: Mapping[str, float] | None = None,
+        fast_restore: bool = False,
+    ):
+        """Restore a database from a zip archive that is still being downloaded, restoring its SQL dump as soon
+        as it is received and its filestore once the download is complete.
 
-    def _restore_bzip(self, file: Path, tracker: progress.Progress):
-        """Restore a database from a bzip2 archive containing a dump file and optionally a filestore.
-        :param file: The path to the bzip2 archive.
+        :param file: The path to the zip archive.
+        :param download: The download of the archive.
         :param tracker: An instance of Progress to track the restore process.
+        :param filters: A mapping of table names to the ratio of their rows to restore.
+        :param fast_restore: Whether to restore with the fast-restore profile.
         """
-        with bz2.open(file, "rb") as dump:
-            self._restore_buffer(tracker, dump)
+        dump = RestoreInput(ARCHIVE_DUMP, lambda: ZipMemberReader(download.open(), ARCHIVE_DUMP), lambda: download.size)
+
+        try:
+            with dump:
+                self._restore_buffered_sql(tracker, dump, filters=filters, fast_restore=fast_restore)
+        except ValueError as error:
+            logger.error(f"Invalid dump file {file.as_posix()}: {error}")
+            return
+
+        logger.debug(f"Waiting for the download of {file.name!r} to complete")
+        download.wait()
+
+        with ZipFile(file, "r") as archive:
+            if ARCHIVE_FILESTORE in archive.namelist():
+                if (thread := self._restore_zip_filestore(tracker, archive)) is not None:
+                    thread.join()
+                else:
+                    self.neuter_filestore()
+                    logger.info("Neutered filestore")
+
+        tracker.stop()
 
-    def _restore_sql(self, file: Path, tracker: progress.Progress):
-        """Restore a database from a plaintext SQL dump file.
+    def _restore_buffer(
+        self,
+        file: Path,
+        tracker: progress.Progress,
+        filters: Mapping[str, float] | None = None,
+        fast_restore: bool = False,
+    ):
+        """Restore a database from a plaintext SQL dump file, optionally compressed with gzip or bzip2.
         :param file: The path to the dump file.
         :param tracker: An instance of Progress to track the restore process.
+        :param filters: A mapping of table names to the ratio of their rows to restore.
+        :param fast_restore: Whether to restore with the fast-restore profile.
         """
-        with open(file, "rb") as dump:
-            self._restore_buffer(tracker, dump)
+        with RestoreInput.from_path(file) as dump:
+            self._restore_buffered_sql(tracker, dump, filters=filters, fast_restore=fast_restore)
 
-    def _restore_dump(self, file: Path, tracker: progress.Progress):
+    def _restore_dump(
+        self,
+        file: Path,
+        tracker: progress.Progress,
+        filters: Mapping[str, float] | None = None,
+        fast_restore: bool = False,
+    ):
         """Restore a database from a dump file generated with `pg_dump`.
         :param file: The path to the dump file.
         :param tracker: An instance of Progress to track the restore process.
+        :param filters: A mapping of table names to the ratio of their rows to restore, only tables
+            whose rows are all skipped are filtered out of custom dumps.
+        :param fast_restore: Whether to restore with the fast-restore profile, in parallel and phase by phase.
+        """
+        if sampled := [table for table, ratio in (filters or {}).items() if ratio]:
+            logger.warning(f"Rows cannot be sampled from custom dumps, restoring all rows of {', '.join(sampled)}")
+
+        if not fast_restore and (not filters or all(filters.values())):
+            with RestoreInput.from_path(file) as dump:
+                self._restore_buffered_sql(tracker, dump, "dump")
+
+            return
+
+        if (download := StreamingDownload.get(file)) is not None:
+            logger.debug(f"Waiting for the download of {file.name!r} to complete")
+            download.wait()
+
+        restore_list = bash.execute(f"pg_restore --list {shlex.quote(file.as_posix())}").stdout.decode()
+        constraints: list[str] = []
+
+        if filters and not all(filters.values()):
+            restore_list, constraints = filter_restore_list(
+                restore_list,
+                bash.execute(f"pg_restore --section=post-data --file=- {shlex.quote(file.as_posix())}").stdout.decode(),
+                filters,
+            )
+
+        if fast_restore:
+            self._restore_dump_phases(file, restore_list)
+            self._restore_foreign_keys(constraints)
+            return
+
+        with tempfile.NamedTemporaryFile("w", suffix=".list") as restore_list_file:
+            restore_list_file.write(restore_list)
+            restore_list_file.flush()
+
+            with RestoreInput.from_path(file) as dump:
+                self._restore_buffered_sql(tracker, dump, "dump", restore_list=Path(restore_list_file.name))
+
+        self._restore_foreign_keys(constraints)
+
+    def _restore_dump_phases(self, file: Path, restore_list: str):
+        """Restore a custom dump phase by phase, loading data and building indexes in parallel.
+        :param file: The path to the dump file.
+        :param restore_list: The table of contents of the dump to restore.
+        """
+        self.unaccent()
+        without_indexes, only_indexes = split_restore_list(restore_list)
+        phases: list[tuple[str, str, str]] = [
+            ("ddl", "pre-data", restore_list),
+            ("data", "data", restore_list),
+            ("indexes", "post-data", only_indexes),
+            ("constraints", "post-data", without_indexes),
+        ]
+        command = self._buffered_sql_restore_command(mode="dump", fast_mode=False, fast_restore=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for phase, section, phase_list in phases:
+                list_path = Path(directory) / f"{phase}.list"
+                list_path.write_text(phase_list)
+                logger.debug(f"Restoring {phase} from {file.name}")
+                start = perf_counter()
+                bash.execute(
+                    f"{command} --section={section} --jobs {os.cpu_count() or 1} "
+                    f"--use-list {shlex.quote(list_path.as_posix())} {shlex.quote(file.as_posix())}",
+                    raise_on_error=False,
+                )
+                self._restore_track_phase(phase, start)
+
+    @ensure_connected
+    def _restore_foreign_keys(self, statements: list[str]):
+        """Create foreign keys that were left out of a filtered restore, without validating existing rows.
+        :param statements: Statements creating the foreign keys.
         """
-        with file.open("rb") as dump:
-            self._restore_buffered_sql(tracker, dump, file.stat().st_size, "dump")
+        for statement in statements:
+            self.query(statement)
+
+        if statements:
+            logger.debug(f"Created {len(statements)} foreign keys referencing filtered tables as NOT VALID")
 
-    def _buffered_sql_check_restrict(self, dump: gzip.GzipFile | bz2.BZ2File | IO[bytes]):
+    def _buffered_sql_check_restrict(self, dump: RestoreInput):
         """Ensure the dump can be restored on the current version of PostgreSQL.
 
         :param dump: The dump file to restore SQL data from.
         """
-        dump.seek(0)
-
-        if not re.match(r"^\\restrict .*", dump.read(4000).decode()):
-            dump.seek(0)
+        if not re.match(r"^\\restrict .*", dump.peek(4000).decode(errors="replace")):
             return
 
         odev_psql_version = OdoobinProcess.get_psql_version()
@@ -901,16 +1399,31 @@ class LocalDatabase(PostgresConnectorMixin, Database):
             logger.info(f"Supported PostgreSQL versions:\n{supported_versions}")
             raise OdevError("Restore aborted")
 
-    def _buffered_sql_restore_command(self, mode: Literal["sql", "dump"], fast_mode: bool = True) -> str:
+    def _buffered_sql_restore_command(
+        self,
+        mode: Literal["sql", "dump"],
+        fast_mode: bool = True,
+        restore_list: Path | None = None,
+        fast_restore: bool = False,
+    ) -> str:
         """Build the command to restore SQL data from a buffered dump file.
 
         :param mode: Whether working with plain SQL files or a dump;
         :param fast_mode: Whether to run the restore in fast mode.
+        :param restore_list: Path to the filtered table of contents to restore, custom dumps only.
+        :param fast_restore: Whether to apply session settings suited to bulk loads.
         :return: The command to restore SQL data from a buffered dump file.
         """
         command = "psql" if mode != "dump" else "pg_restore --disable-triggers --no-owner --no-privileges"
         command += f" --dbname {self.name}"
 
+        if fast_restore:
+            options = " ".join(f"-c {key}={value}" for key, value in FAST_RESTORE_SETTINGS.items())
+            command = f"PGOPTIONS={shlex.quote(options)} {command}"
+
+        if mode == "dump" and restore_list is not None:
+            command += f" --use-list {shlex.quote(restore_list.as_posix())}"
+
         if fast_mode:
             command += " --single-transaction"
 
@@ -919,7 +1432,7 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         return command
 
-    def _buffered_sql_enable_extensions(self, dump: gzip.GzipFile | bz2.BZ2File | IO[bytes]):
+    def _buffered_sql_enable_extensions(self, dump: RestoreInput):
         """Enable PostgreSQL extensions before restoring the dump.
         In the event the SQL dump doesn't set the unaccent function as immutable, we need to force it on the database
         ourselves. The creation of the function should be around the 50th line in the SQL file, we crawl up to
@@ -927,14 +1440,12 @@ class LocalDatabase(PostgresConnectorMixin, Database):
 
         :param dump: The dump file to restore SQL data from.
         """
-        for index, line in enumerate(dump):
-            if index >= SQL_DUMP_IGNORE_LINES_NUMBER or "LANGUAGE sql IMMUTABLE" in line.decode():
+        for index, line in enumerate(dump.peek().splitlines()):
+            if index >= SQL_DUMP_IGNORE_LINES_NUMBER or b"LANGUAGE sql IMMUTABLE" in line:
                 break
         else:
             self.unaccent()
 
-        dump.seek(0)
-
     @ensure_connected
     def unaccent(self) -> bool:
         """Install the unaccent extension on the database."""
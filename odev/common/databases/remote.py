@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import (
     ClassVar,
@@ -8,9 +9,40 @@ from urllib.parse import urlparse
 
 from odev.common.config import DATETIME_FORMAT
 from odev.common.databases import Branch, Database, Filestore, Repository
+from odev.common.errors import ConnectorError
+from odev.common.logging import logging
 from odev.common.version import OdooVersion
 
 
+logger = logging.getLogger(__name__)
+
+EXPIRATION_DATE_PARAMETER = "database.expiration_date"
+"""Key of the system parameter holding the expiration date of the database."""
+
+UUID_PARAMETER = "database.uuid"
+"""Key of the system parameter holding the UUID of the database."""
+
+
+@dataclass(frozen=True)
+class RemoteSnapshot:
+    """Facts about a remote database, fetched together to save round-trips to the server."""
+
+    is_odoo: bool
+    """Whether the database is an Odoo database."""
+
+    version: OdooVersion | None
+    """The version of Odoo running on the database."""
+
+    edition: Literal["community", "enterprise"]
+    """The edition of Odoo running on the database."""
+
+    expiration_date: datetime | None
+    """The expiration date of the database."""
+
+    uuid: str | None
+    """The UUID of the database."""
+
+
 class RemoteDatabase(Database):
     """Interact with remote Odoo databases, mainly through RPC."""
 
@@ -32,6 +64,9 @@ class RemoteDatabase(Database):
     _branch: Branch | None = None
     """The branch of the repository containing custom code for the database."""
 
+    _snapshot: RemoteSnapshot | None = None
+    """Facts about the database, memoized until invalidated."""
+
     def __init__(self, url: str, name: str | None = None) -> None:
         super().__init__(url)
         self._name, self._url = self.get_name_from_url(url)
@@ -59,36 +94,74 @@ class RemoteDatabase(Database):
             else (url, f"http://{url}")
         )
 
+    @property
+    def snapshot(self) -> RemoteSnapshot:
+        """Facts about the database, fetched in a single batch of RPC calls on first access
+        and memoized until `invalidate` is called.
+        """
+        if self._snapshot is None:
+            self._snapshot = self._load_snapshot()
+
+        return self._snapshot
+
+    def invalidate(self):
+        """Discard the memoized facts about the database, to fetch them again on next access."""
+        self._snapshot = None
+
+    def _load_snapshot(self) -> RemoteSnapshot:
+        """Fetch facts about the database from the server."""
+        modules, enterprise_modules, parameters = self.rpc.batch(
+            [
+                ("ir.module.module", "search_read", [[("name", "=", "base")]], {"fields": ["latest_version"]}),
+                (
+                    "ir.module.module",
+                    "search_count",
+                    [[("license", "=like", "OEEL-%"), ("state", "=", "installed")]],
+                    {},
+                ),
+                (
+                    "ir.config_parameter",
+                    "search_read",
+                    [[("key", "in", [EXPIRATION_DATE_PARAMETER, UUID_PARAMETER])]],
+                    {"fields": ["key", "value"]},
+                ),
+            ],
+            raise_on_error=False,
+        )
+
+        for result in (modules, enterprise_modules):
+            if isinstance(result, ConnectorError):
+                raise result
+
+        # System parameters are only readable by administrators, other users still get the other facts
+        if isinstance(parameters, ConnectorError):
+            logger.debug(f"Cannot read system parameters of database {self.name!r}: {parameters}")
+            parameters = []
+
+        values = {parameter["key"]: parameter["value"] for parameter in parameters}
+        version = modules[0].get("latest_version") if modules else None
+        expiration_date = values.get(EXPIRATION_DATE_PARAMETER)
+        return RemoteSnapshot(
+            is_odoo=bool(modules),
+            version=OdooVersion(cast(str, version)) if version else None,
+            edition="enterprise" if enterprise_modules else "community",
+            expiration_date=(
+                datetime.strptime(expiration_date, DATETIME_FORMAT) if isinstance(expiration_date, str) else None
+            ),
+            uuid=cast(str, values.get(UUID_PARAMETER)) or None,
+        )
+
     @property
     def is_odoo(self) -> bool:
-        return bool(self.rpc["ir.module.module"].search_count([("name", "=", "base")]))
+        return self.snapshot.is_odoo
 
     @property
     def version(self) -> OdooVersion | None:
-        version = (
-            self.rpc["ir.module.module"]
-            .search_read(
-                [("name", "=", "base")],
-                ["latest_version"],
-            )[0]
-            .get("latest_version")
-        )
-        return OdooVersion(cast(str, version))
+        return self.snapshot.version
 
     @property
     def edition(self) -> Literal["community", "enterprise"]:
-        has_enterprise_modules = bool(
-            self.rpc["ir.module.module"].search_count(
-                [
-                    ("license", "=like", "OEEL-%"),
-                    ("state", "=", "installed"),
-                ]
-            )
-        )
-
-        if has_enterprise_modules:
-            return "enterprise"
-        return "community"
+        return self.snapshot.edition
 
     @property
     def filestore(self) -> Filestore | None:
@@ -100,18 +173,11 @@ class RemoteDatabase(Database):
 
     @property
     def expiration_date(self) -> datetime | None:
-        date = (
-            self.rpc["ir.config_parameter"]
-            .search_read([("key", "=", "database.expiration_date")], ["value"])[0]
-            .get("value")
-        )
-        return datetime.strptime(date, DATETIME_FORMAT) if isinstance(date, str) else None
+        return self.snapshot.expiration_date
 
     @property
     def uuid(self) -> str | None:
-        return cast(
-            str, self.rpc["ir.config_parameter"].search_read([("key", "=", "database.uuid")], ["value"])[0].get("value")
-        )
+        return self.snapshot.uuid
 
     @property
     def last_access_date(self) -> datetime | None:
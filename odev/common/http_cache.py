@@ -0,0 +1,258 @@
+"""Persistent cache of HTTP responses, revalidated with conditional requests."""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections.abc import Mapping
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from odev.common.logging import logging
+
+
+__all__ = ["HTTP_CACHE_MAX_SIZE", "HttpCache"]
+
+
+logger = logging.getLogger(__name__)
+
+
+HTTP_CACHE_MAX_SIZE = 64 * 1024 * 1024
+"""Maximum number of bytes of response bodies kept in the cache, least recently used responses are evicted first."""
+
+HTTP_CACHE_MAX_AGE_REGEX = re.compile(r"(?:^|,)\s*max-age=(?P<seconds>\d+)", re.IGNORECASE)
+"""Directive of the `Cache-Control` header setting for how long a response is fresh."""
+
+HTTP_CACHE_NO_STORE_REGEX = re.compile(r"(?:^|,)\s*(?:no-store|private)\s*(?:,|=|$)", re.IGNORECASE)
+"""Directives of the `Cache-Control` header forbidding to store a response, or to share it between users."""
+
+HTTP_CACHE_VARY_IGNORED_HEADERS = {"accept-encoding"}
+"""Request headers a response may vary on and still be stored, as they are the same for all requests of odev."""
+
+HTTP_CACHE_IGNORED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+"""Headers describing the encoding of response bodies on the wire, not kept as stored bodies are decoded."""
+
+
+class HttpCache:
+    """Least-recently-used cache of HTTP responses stored in a SQLite file, shared between runs of odev.
+    Responses are stored with their validators (`ETag` and `Last-Modified` headers) so that they can be
+    revalidated with conditional requests once they are not fresh anymore.
+    """
+
+    def __init__(self, path: Path, max_size: int = HTTP_CACHE_MAX_SIZE):
+        """Open the cache, creating it if needed.
+
+        :param path: Path to the cache file.
+        :param max_size: Maximum number of bytes of response bodies to keep in the cache.
+        """
+        self.path: Path = path
+        """Path to the cache file."""
+
+        self.max_size: int = max_size
+        """Maximum number of bytes of response bodies to keep in the cache."""
+
+        self._lock = Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                reason TEXT,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                expires REAL,
+                accessed REAL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+            """
+        )
+
+    def __enter__(self) -> "HttpCache":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(method: str, url: str, params: Mapping[str, Any] | None = None, body: Any = None) -> str:
+        """Compute the key of a request, independent of the order of its parameters.
+        Keys are hashed so that sensitive parameter values are not stored in clear.
+
+        :param method: The HTTP method of the request.
+        :param url: The URL of the request, without parameters.
+        :param params: The parameters of the request.
+        :param body: The body of the request, if any.
+        """
+        normalized = sorted((str(name), str(value)) for name, value in (params or {}).items())
+        payload = json.dumps([method.upper(), url, normalized, body], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def storable(response: Response) -> bool:
+        """Whether a response can be stored and later revalidated.
+        Responses to authenticated requests, responses setting cookies or marked as private, and responses
+        varying on request headers other than the encodings accepted are never stored as they could be
+        served to another user.
+
+        :param response: The response to store.
+        """
+        request = response.request
+        vary = {header.strip().lower() for header in response.headers.get("Vary", "").split(",") if header.strip()}
+        return (
+            response.status_code == HTTPStatus.OK
+            and not (request is not None and ("Authorization" in request.headers or "Cookie" in request.headers))
+            and "Set-Cookie" not in response.headers
+            and vary <= HTTP_CACHE_VARY_IGNORED_HEADERS
+            and not HTTP_CACHE_NO_STORE_REGEX.search(response.headers.get("Cache-Control", ""))
+            and bool(
+                response.headers.get("ETag")
+                or response.headers.get("Last-Modified")
+                or HTTP_CACHE_MAX_AGE_REGEX.search(response.headers.get("Cache-Control", ""))
+            )
+        )
+
+    @staticmethod
+    def conditional_headers(response: Response) -> dict[str, str]:
+        """Headers of a conditional request revalidating a stored response.
+
+        :param response: The stored response.
+        """
+        headers: dict[str, str] = {}
+
+        if etag := response.headers.get("ETag"):
+            headers["If-None-Match"] = etag
+
+        if last_modified := response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def get(self, key: str) -> tuple[Response, bool] | None:
+        """Get a stored response.
+
+        :param key: The key of the request.
+        :return: The stored response and whether it is still fresh, `None` if no response is stored for the key.
+        """
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT url, status, reason, headers, body, expires FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._connection.commit()
+        except sqlite3.Error as error:
+            logger.debug(f"Could not read from the HTTP cache: {error}")
+            return None
+
+        url, status, reason, headers, body, expires = row
+        response = Response()
+        response.url = url
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(0)
+        response._content = body
+        return response, expires is not None and expires > time.time()
+
+    def set(self, key: str, response: Response):
+        """Store a response, evicting the least recently used ones if the cache grows over its maximum size.
+
+        :param key: The key of the request.
+        :param response: The response to store, its content is read if it was not already.
+        """
+        body = response.content
+        headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in HTTP_CACHE_IGNORED_HEADERS
+        }
+        max_age = HTTP_CACHE_MAX_AGE_REGEX.search(response.headers.get("Cache-Control", ""))
+        now = time.time()
+
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        response.url,
+                        response.status_code,
+                        response.reason,
+                        json.dumps(headers),
+                        body,
+                        len(body),
+                        now + int(max_age.group("seconds")) if max_age else None,
+                        now,
+                    ),
+                )
+                self._evict()
+                self._connection.commit()
+        except sqlite3.Error as error:
+            logger.debug(f"Could not write to the HTTP cache: {error}")
+
+    def revalidated(self, key: str, stored: Response, response: Response) -> Response:
+        """Refresh a stored response after the server confirmed it did not change.
+
+        :param key: The key of the request.
+        :param stored: The stored response.
+        :param response: The response to the conditional request, with status 304.
+        :return: The stored response, updated with the headers of the conditional response.
+        """
+        stored.headers.update(response.headers)
+        stored.elapsed = response.elapsed
+        self.set(key, stored)
+        return stored
+
+    def delete(self, key: str):
+        """Remove a stored response.
+
+        :param key: The key of the request.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._connection.commit()
+
+    def clear(self):
+        """Remove all stored responses."""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self):
+        """Close the cache file."""
+        self._connection.close()
+
+    def _evict(self):
+        """Remove the least recently used responses until the cache fits in its maximum size."""
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        if total <= self.max_size:
+            return
+
+        for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+            if total <= self.max_size:
+                break
@@ -1,6 +1,6 @@
 """Mixins for commands that need to use a connection to a local PostgreSQL database."""
 
-from odev.common.connectors import PostgresConnector
+from odev.common.connectors import AsyncPostgresConnector, PostgresConnector
 from odev.common.mixins.connectors.base import ConnectorMixin
 
 
@@ -13,3 +13,7 @@ class PostgresConnectorMixin(ConnectorMixin):
     def psql(self, name: str = "postgres") -> PostgresConnector:
         """Return a PostgreSQL connector to the selected database."""
         return self._connector_class(name)
+
+    def async_psql(self, name: str = "postgres") -> AsyncPostgresConnector:
+        """Return an asynchronous PostgreSQL connector to the selected database."""
+        return AsyncPostgresConnector(name)
@@ -33,7 +33,7 @@ from packaging import version
 
 from odev._version import __version__
 from odev.commands.database.delete import DeleteCommand
-from odev.common import progress, string
+from odev.common import concurrency, progress, string
 from odev.common.commands import CommandType
 from odev.common.commands.database import DatabaseType
 from odev.common.config import Config
@@ -211,6 +211,16 @@ class Odev(Generic[CommandType]):
         """Local path to the static directory where common immutable files are stored."""
         return self.base_path / "static"
 
+    @property
+    def logs_path(self) -> Path:
+        """Local path to the directory where parsed odoo-bin logs are captured."""
+        return self.home_path / "logs"
+
+    @property
+    def cache_path(self) -> Path:
+        """Local path to the directory where data cached between runs of odev is stored."""
+        return self.home_path / "cache"
+
     @property
     def dumps_path(self) -> Path:
         """Local path to the directory where database dumps are stored."""
@@ -450,12 +460,15 @@ class Odev(Generic[CommandType]):
             delete_command_cls = cast(type[CommandType], self.commands.get("delete"))
             delete_command = cast(DeleteCommand, delete_command_cls(delete_command_cls.parse_arguments([])))
 
-            def filter_databases(name: str) -> bool:
-                database = LocalDatabase(name)
-                today = datetime.today()
-                return not database.whitelisted and (today - (database.last_date or today)).days >= PRUNING_INTERVAL
-
-            databases = delete_command.list_databases(predicate=filter_databases)
+            today = datetime.today()
+            candidates = [LocalDatabase(name) for name in delete_command.list_databases()]
+            candidates = [database for database in candidates if not database.whitelisted]
+            last_dates = concurrency.run(database.async_last_date() for database in candidates)
+            databases = [
+                database.name
+                for database, last_date in zip(candidates, last_dates, strict=True)
+                if (today - (last_date or today)).days >= PRUNING_INTERVAL
+            ]
 
             if databases:
                 logger.warning(
@@ -487,11 +500,12 @@ class Odev(Generic[CommandType]):
                         databases.remove(database)
 
             if databases:
-                for database in databases:
-                    delete_command.delete_one(LocalDatabase(database))
-
-                logger.info(f"Deleted {len(databases)} databases:\n{join_bullet(databases)}")
+                dropped = delete_command.delete_many([LocalDatabase(database) for database in databases])
+                logger.info(
+                    f"Deleted {len(dropped)} databases:\n{join_bullet([database.name for database in dropped])}"
+                )
 
+            self.store.databases.flush()
             self.config.pruning.date = datetime.today()
 
     def list_commands(self, sources: Iterable[Path]) -> Iterator[pkgutil.ModuleInfo]:
@@ -850,6 +864,9 @@ class Odev(Generic[CommandType]):
             try:
                 logger.debug(f"Cleaning up after {command!r}")
                 command.cleanup()
+                self.store.databases.invalidate()
+                self.store.facts.invalidate()
+                command.report_sql_profile()
 
                 if telemetry and self.config.telemetry.enabled:
                     telemetry[0].join()
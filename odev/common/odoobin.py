@@ -6,8 +6,10 @@ from ast import literal_eval
 from collections.abc import Callable, Generator, Mapping, Sequence
 from contextlib import nullcontext
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from subprocess import CalledProcessError, CompletedProcess
+from types import MappingProxyType
 from typing import (
     TYPE_CHECKING,
     Literal,
@@ -57,6 +59,36 @@ ODOO_PYTHON_VERSIONS: Mapping[int, str] = {
 }
 
 
+@lru_cache(maxsize=256)
+def _addons_index(path: Path, mtime: float) -> Mapping[str, Path]:
+    """Map the names of the modules found in an addons path to their directory.
+    The modification time of the addons path is part of the cache key so that adding or removing
+    a module invalidates the cached index.
+    :param path: The addons path to index.
+    :param mtime: The modification time of the addons path.
+    """
+    globs = (path.glob(f"*/__{manifest}__.py") for manifest in ["manifest", "openerp"])
+    return MappingProxyType(
+        {
+            manifest.parent.name: manifest.parent
+            for glob in globs
+            for manifest in glob
+            if manifest.is_file() and (manifest.parent / "__init__.py").is_file()
+        }
+    )
+
+
+def addons_index(path: Path) -> Mapping[str, Path]:
+    """Return the modules available in an addons path, mapped by name to their directory.
+    Results are cached until the content of the addons path changes.
+    :param path: The addons path to index.
+    """
+    try:
+        return _addons_index(path, path.stat().st_mtime)
+    except (FileNotFoundError, NotADirectoryError):
+        return MappingProxyType({})
+
+
 def odoo_repositories(enterprise: bool = True) -> Generator[GitConnector, None, None]:
     """List of Odoo repositories depending on the edition passed."""
     repo_names: list[str] = [*ODOO_COMMUNITY_REPOSITORIES]
@@ -287,6 +319,18 @@ class OdoobinProcess(OdevFrameworkMixin):
             if OdoobinProcess.check_addons_path(path)
         ]
 
+    def modules_index(self, addons_paths: Sequence[Path] | None = None) -> Mapping[str, Path]:
+        """Return the modules available in the given addons paths, mapped by name to their directory.
+        When a module is present in multiple addons paths, the first one wins as it would in odoo-bin.
+        :param addons_paths: Addons paths to index, defaults to all addons paths of the process.
+        """
+        index: dict[str, Path] = {}
+
+        for path in reversed(self.addons_paths if addons_paths is None else addons_paths):
+            index.update(addons_index(path.expanduser()))
+
+        return index
+
     @property
     def addons_requirements(self) -> Generator[Path, None, None]:
         """Return the list of addons requirements files."""
@@ -569,6 +613,8 @@ class OdoobinProcess(OdevFrameworkMixin):
                 with spinner(info_message) if not stream else nullcontext():  # type: ignore[attr-defined]
                     self.database.venv = self.venv
                     self.database.worktree = self.worktree
+                    # Other odev processes read the environment of the database while odoo-bin runs
+                    self.store.databases.flush()
                     process = self.venv.run_script(
                         self.odoobin_path,
                         odoobin_args,
@@ -588,6 +634,8 @@ class OdoobinProcess(OdevFrameworkMixin):
                 return None
             else:
                 return process
+            finally:
+                self.store.facts.delete(self.database.name)
 
     def prepare_psql(self):
         """Prepare the PostgreSQL for the Odoo installation.
@@ -747,13 +795,7 @@ class OdoobinProcess(OdevFrameworkMixin):
         :return: True if the path is a valid Odoo addons path, False otherwise.
         :rtype: bool
         """
-        if not path.is_dir():
-            return False
-
-        globs = (path.glob(f"*/__{manifest}__.py") for manifest in ["manifest", "openerp"])
-        return path.is_dir() and any(
-            manifest.is_file() and (manifest.parent / "__init__.py").is_file() for glob in globs for manifest in glob
-        )
+        return path.is_dir() and bool(addons_index(path))
 
     @classmethod
     def check_addon_path(cls, path: Path) -> bool:
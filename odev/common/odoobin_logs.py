@@ -0,0 +1,472 @@
+"""Parse and render the log output of odoo-bin processes."""
+
+import re
+import sqlite3
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from odev.common import string
+
+
+__all__ = [
+    "ODOO_LOG_LEVELS",
+    "ODOO_LOG_REGEX",
+    "ODOO_LOG_WERKZEUG_REGEX",
+    "Histogram",
+    "LogCapture",
+    "RequestProfiler",
+    "colorize_duration",
+    "format_log_line",
+    "parse_log_line",
+]
+
+
+ODOO_LOG_REGEX: re.Pattern = re.compile(
+    r"""
+        (?:
+            (?P<date>\d{4}-\d{2}-\d{2})\s
+            (?P<time>\d{2}:\d{2}:\d{2},\d{3})\s
+            (?P<pid>\d+)\s
+            (?P<level>[A-Z]+)\s
+            (?P<database>[^\s]+)\s
+            (?P<logger>
+                ((?:odoo\.addons\.)(?P<module>[^\.]+))?[^:]+
+            ):\s
+            (?P<description>.*)
+        )
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+"""Regular expression to match the output of odoo-bin."""
+
+ODOO_LOG_WERKZEUG_REGEX: re.Pattern = re.compile(
+    r"""
+        (?:
+            (?P<ip>(?:\d{1,3}\.){3}\d{1,3}).+?\]\s\"
+            (?P<verb>\w+)\s
+            (?P<url>.+?(?=\s))\s
+            (?P<http>.+?(?=\"))\"\s
+            (?P<code>\d+)\s-\s
+            (?P<count_query>\d+)\s
+            (?P<time_query>[\d\.]+)\s
+            (?P<time_remaining>[\d\.]+)
+        )
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+"""Regular expression to match the output of odoo-bin Werkzeug-specific logs."""
+
+ODOO_LOG_LEVELS: Mapping[str, int] = {
+    "debug": 10,
+    "info": 20,
+    "warning": 30,
+    "error": 40,
+    "critical": 50,
+}
+"""Severity of the log-levels output by odoo-bin, as defined in the `logging` module."""
+
+ROUTE_ID_REGEX: re.Pattern = re.compile(r"(?<=/)\d+(?=/|$)")
+"""Regular expression to match numeric identifiers in the path of requested URLs."""
+
+DURATION_THRESHOLDS: Mapping[float, str] = {0.3: "color.yellow", 1.0: "color.red"}
+"""Thresholds above which durations of HTTP requests are highlighted."""
+
+DURATION_THRESHOLDS_DIM: Mapping[float, str] = {key: f"{value} dim" for key, value in DURATION_THRESHOLDS.items()}
+"""Thresholds above which partial durations of HTTP requests are highlighted."""
+
+
+def parse_log_line(line: str) -> re.Match | None:
+    """Parse a line of odoo-bin output.
+    Lines that do not start with a date are discarded without running the full regular expression,
+    which is the case of tracebacks and other lines printed outside of the logger.
+
+    :param line: The line to parse.
+    :return: The match of the line against `ODOO_LOG_REGEX`, or None if the line is not a log record.
+    """
+    if "\x1b" in line:
+        line = string.strip_ansi_colors(line)
+
+    if line[4:5] != "-" or not line[:4].isdigit():
+        return None
+
+    return ODOO_LOG_REGEX.match(line)
+
+
+def format_log_line(match: re.Match) -> str:
+    """Render a parsed line of odoo-bin output to a string with markup.
+
+    :param match: The match of the line against `ODOO_LOG_REGEX`.
+    :return: The line formatted for printing to the console.
+    """
+    level = match.group("level")
+    level_color = "bold color.green" if level == "INFO" else f"logging.level.{level.lower()}"
+    logger = match.group("logger")
+    description = match.group("description")
+
+    if logger == "werkzeug" and (http_match := ODOO_LOG_WERKZEUG_REGEX.match(description)):
+        dash = string.stylize("-", "color.black")
+        code = http_match.group("code")
+
+        match code[0]:
+            case "4":
+                code = string.stylize(code, "color.yellow")
+            case "5":
+                code = string.stylize(code, "color.red")
+            case _:
+                code = string.stylize(code, "color.black")
+
+        time_query_num = float(http_match.group("time_query"))
+        time_python_num = float(http_match.group("time_remaining"))
+        time_total = colorize_duration(time_query_num + time_python_num, DURATION_THRESHOLDS)
+        time_query = colorize_duration(time_query_num, DURATION_THRESHOLDS_DIM)
+        time_python = colorize_duration(time_python_num, DURATION_THRESHOLDS_DIM)
+
+        description = (
+            f"{string.stylize(http_match.group('ip'), 'color.black')} {dash} "
+            f"{http_match.group('verb')} {http_match.group('url')} ({code}) {dash} "
+            f"{time_total} "
+            + string.stylize(
+                f"[SQL: {time_query} ({http_match.group('count_query')} queries), Python: {time_python}]",
+                "color.black",
+            )
+        )
+
+    return (
+        f"{string.stylize(match.group('time'), 'color.black')} "
+        f"{string.stylize(level, level_color)} "
+        f"{string.stylize(match.group('database'), 'color.purple')} "
+        f"{string.stylize(logger, 'color.black')}: {description}"
+    )
+
+
+def colorize_duration(time: str | float, thresholds: Mapping[float, str]) -> str:
+    """Colorize the textual representation of a duration according to thresholds.
+
+    :param time: The duration to colorize.
+    :param thresholds: A mapping of thresholds to the color to apply to durations above them.
+    :return: The colorized duration.
+    """
+    time = float(time)
+    style = thresholds.get(max(filter(lambda x: x < time, thresholds.keys()), default=0.0))
+    return string.stylize(f"{time:.3f}", style) if style else f"{time:.3f}"
+
+
+class LogCapture:
+    """Append-only storage of parsed odoo-bin log records in a SQLite file, one file per run."""
+
+    suffix: str = ".sqlite3"
+    """Extension of log capture files."""
+
+    batch_size: int = 1000
+    """Number of records to buffer in memory before writing them to disk."""
+
+    def __init__(self, path: Path):
+        """Open a log capture file, creating it if needed.
+
+        :param path: Path to the log capture file.
+        """
+        self.path: Path = path
+        """Path to the log capture file."""
+
+        self._buffer: list[tuple[Any, ...]] = []
+        """Records waiting to be written to disk."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS records (
+                time TEXT,
+                level TEXT,
+                severity INTEGER,
+                database TEXT,
+                logger TEXT,
+                module TEXT,
+                description TEXT,
+                verb TEXT,
+                url TEXT,
+                code INTEGER,
+                count_query INTEGER,
+                time_query REAL,
+                time_python REAL
+            );
+            """
+        )
+
+    def __enter__(self) -> "LogCapture":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @classmethod
+    def create(cls, directory: Path, database: str, command: str, keep: int = 20) -> "LogCapture":
+        """Create a new log capture file for a run of odoo-bin and remove the oldest ones.
+
+        :param directory: Directory in which to store log capture files.
+        :param database: Name of the database odoo-bin is run on.
+        :param command: The odev command running odoo-bin.
+        :param keep: Number of log capture files to keep, including the new one.
+        :return: The new log capture.
+        """
+        for path in cls.list_captures(directory)[max(keep - 1, 0) :]:
+            path.unlink(missing_ok=True)
+
+        now = datetime.now()
+        capture = cls(directory / f"{database}-{now:%Y%m%d-%H%M%S}-{string.suid()}{cls.suffix}")
+        capture.set_metadata(database=database, command=command, date=now.isoformat(timespec="seconds"))
+        return capture
+
+    @classmethod
+    def list_captures(cls, directory: Path) -> list[Path]:
+        """List log capture files in a directory, most recent first.
+
+        :param directory: Directory in which log capture files are stored.
+        """
+        if not directory.is_dir():
+            return []
+
+        return sorted(directory.glob(f"*{cls.suffix}"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+    @property
+    def metadata(self) -> dict[str, str]:
+        """Information about the captured run."""
+        return dict(self._connection.execute("SELECT key, value FROM metadata").fetchall())
+
+    def set_metadata(self, **values: str) -> None:
+        """Store information about the captured run."""
+        self._connection.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)", values.items())
+        self._connection.commit()
+
+    def record(self, match: re.Match) -> None:
+        """Store a parsed line of odoo-bin output.
+
+        :param match: The match of the line against `ODOO_LOG_REGEX`.
+        """
+        level = match.group("level")
+        logger = match.group("logger")
+        description = match.group("description")
+        http: Sequence[Any] = (None,) * 6
+
+        if logger == "werkzeug" and (http_match := ODOO_LOG_WERKZEUG_REGEX.match(description)):
+            http = (
+                http_match.group("verb"),
+                http_match.group("url"),
+                int(http_match.group("code")),
+                int(http_match.group("count_query")),
+                float(http_match.group("time_query")),
+                float(http_match.group("time_remaining")),
+            )
+
+        self._buffer.append(
+            (
+                f"{match.group('date')} {match.group('time')}",
+                level,
+                ODOO_LOG_LEVELS.get(level.lower(), ODOO_LOG_LEVELS["critical"]),
+                match.group("database"),
+                logger,
+                match.group("module"),
+                description,
+                *http,
+            )
+        )
+
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        if not self._buffer:
+            return
+
+        self._connection.executemany(f"INSERT INTO records VALUES ({', '.join('?' * 13)})", self._buffer)
+        self._connection.commit()
+        self._buffer.clear()
+
+    def index(self) -> None:
+        """Create indexes to speed up queries on captured records."""
+        self._connection.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS records_severity_index ON records (severity);
+            CREATE INDEX IF NOT EXISTS records_logger_index ON records (logger);
+            CREATE INDEX IF NOT EXISTS records_url_index ON records (url) WHERE url IS NOT NULL;
+            """
+        )
+
+    def query(self, query: str, params: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+        """Run a query against captured records.
+
+        :param query: The SQL query to run.
+        :param params: Parameters to pass to the query.
+        :return: The rows returned by the query.
+        """
+        self.flush()
+        return self._connection.execute(query, params).fetchall()
+
+    def close(self) -> None:
+        """Write pending records to disk, index them and close the file."""
+        self.flush()
+        self.index()
+        self._connection.close()
+
+
+class Histogram:
+    """Streaming histogram of non-negative integer values using a bounded amount of memory.
+    Values are recorded in log-linear buckets similar to those of HdrHistogram: each power of two
+    is split in `2 ** precision` linear buckets, giving a relative precision of `1 / 2 ** precision`
+    on the reported percentiles whatever the range of recorded values.
+    """
+
+    precision: int = 6
+    """Number of bits of precision of the recorded values."""
+
+    def __init__(self):
+        self.counts: dict[int, int] = defaultdict(int)
+        """Number of values recorded per bucket index."""
+
+        self.count: int = 0
+        """Number of recorded values."""
+
+        self.sum: int = 0
+        """Sum of recorded values."""
+
+        self.max: int = 0
+        """Highest recorded value."""
+
+    def record(self, value: int) -> None:
+        """Record a value in the histogram.
+
+        :param value: The value to record, negative values are recorded as 0.
+        """
+        value = max(value, 0)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value under which a given percentage of the recorded values fall.
+
+        :param percentile: The percentile to compute, between 0 and 100.
+        :return: The highest value of the bucket containing the percentile, capped to the highest recorded value.
+        """
+        if not self.count:
+            return 0
+
+        threshold = max(1, round(self.count * percentile / 100))
+        cumulated = 0
+
+        for index in sorted(self.counts):
+            cumulated += self.counts[index]
+
+            if cumulated >= threshold:
+                return min(self._highest_value(index), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Average of the recorded values."""
+        return self.sum / self.count if self.count else 0.0
+
+    def _index(self, value: int) -> int:
+        """Return the index of the bucket in which a value is recorded."""
+        shift = max(value.bit_length() - self.precision - 1, 0)
+        return (shift << self.precision) + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """Return the highest value recorded in the bucket at a given index."""
+        sub_buckets = 1 << self.precision
+
+        if index < sub_buckets * 2:
+            return index
+
+        shift = (index >> self.precision) - 1
+        return ((index - (shift << self.precision) + 1) << shift) - 1
+
+
+class RequestProfiler:
+    """Aggregate timings of HTTP requests logged by odoo-bin into per-route histograms."""
+
+    max_routes: int = 1000
+    """Maximum number of distinct routes to keep track of, requests to other routes are aggregated together."""
+
+    other_route: str = "(other)"
+    """Name of the route aggregating requests over the maximum number of routes."""
+
+    metrics: Sequence[str] = ("total", "sql", "python", "queries")
+    """Metrics recorded for each request."""
+
+    percentiles: Sequence[int] = (50, 95, 99)
+    """Percentiles reported for each metric."""
+
+    def __init__(self):
+        self.routes: dict[str, dict[str, Histogram]] = {}
+        """Histograms of each metric, by route."""
+
+    def record(self, match: re.Match) -> None:
+        """Record the timings of an HTTP request from a parsed line of odoo-bin output.
+        Lines that are not HTTP requests logged by werkzeug are ignored.
+
+        :param match: The match of the line against `ODOO_LOG_REGEX`.
+        """
+        if match.group("logger") != "werkzeug":
+            return
+
+        http_match = ODOO_LOG_WERKZEUG_REGEX.match(match.group("description"))
+
+        if http_match is None:
+            return
+
+        route = self.route(http_match.group("verb"), http_match.group("url"))
+
+        if route not in self.routes:
+            if len(self.routes) >= self.max_routes:
+                route = self.other_route
+
+            self.routes.setdefault(route, {metric: Histogram() for metric in self.metrics})
+
+        time_query = round(float(http_match.group("time_query")) * 1_000_000)
+        time_python = round(float(http_match.group("time_remaining")) * 1_000_000)
+        histograms = self.routes[route]
+        histograms["total"].record(time_query + time_python)
+        histograms["sql"].record(time_query)
+        histograms["python"].record(time_python)
+        histograms["queries"].record(int(http_match.group("count_query")))
+
+    @staticmethod
+    def route(verb: str, url: str) -> str:
+        """Normalize a requested URL to a route, removing the query string and replacing numeric
+        path segments with a placeholder to limit the number of distinct routes.
+
+        :param verb: The HTTP verb of the request.
+        :param url: The requested URL.
+        """
+        path = ROUTE_ID_REGEX.sub(":id", url.split("?", 1)[0])
+        return f"{verb} {path}"
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Return statistics of each metric by route, timings in milliseconds.
+        Routes are sorted by the cumulated time spent serving them, highest first.
+        """
+        summary: dict[str, dict[str, dict[str, float]]] = {}
+
+        for route, histograms in sorted(self.routes.items(), key=lambda item: item[1]["total"].sum, reverse=True):
+            summary[route] = {}
+
+            for metric, histogram in histograms.items():
+                factor = 1 if metric == "queries" else 1000
+                summary[route][metric] = {
+                    "count": histogram.count,
+                    "mean": histogram.mean / factor,
+                    "max": histogram.max / factor,
+                    **{f"p{p}": histogram.percentile(p) / factor for p in self.percentiles},
+                }
+
+        return summary
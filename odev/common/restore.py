@@ -0,0 +1,1074 @@
+"""Readers for the dump files restored to local databases."""
+
+import bz2
+import io
+import os
+import re
+import struct
+import zlib
+from collections import Counter, deque
+from collections.abc import Callable, Generator, Iterable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Event
+from time import perf_counter
+from typing import IO, Any, ClassVar, Literal, cast
+
+from odev.common.logging import logging
+from odev.common.thread import Thread
+
+
+__all__ = [
+    "FAST_RESTORE_SETTINGS",
+    "RESTORE_PHASES",
+    "RestoreInput",
+    "SqlFilter",
+    "StreamingDownload",
+    "ZipMemberReader",
+    "filter_restore_list",
+    "parse_table_filters",
+    "split_restore_list",
+]
+
+
+logger = logging.getLogger(__name__)
+
+
+RESTORE_CHUNK_SIZE = 1024 * 1024
+"""Number of bytes to read at once from a dump when feeding it to the restore process."""
+
+RESTORE_HEADER_SIZE = 64 * 1024
+"""Number of bytes at the beginning of a dump kept in memory for inspection."""
+
+COMPRESSION_MAGIC_NUMBERS: dict[bytes, Literal["gzip", "bzip2"]] = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bzip2",
+}
+"""Leading bytes identifying compressed files."""
+
+DECOMPRESSION_QUEUE_SIZE = 16
+"""Maximum number of decompressed chunks waiting to be consumed."""
+
+GZIP_WBITS = zlib.MAX_WBITS | 16
+"""Window size and header format of gzip members for `zlib`."""
+
+BZIP2_STREAM_REGEX = re.compile(rb"BZh[1-9]1AY&SY")
+"""Header of a bzip2 stream, followed by the magic number of its first block."""
+
+BZIP2_SEGMENT_SIZE = 4 * 1024 * 1024
+"""Minimum number of compressed bytes, made of whole bzip2 streams, to decompress at once in parallel."""
+
+BZIP2_PROBE_SIZE = 16 * 1024 * 1024
+"""Number of bytes at the beginning of a bzip2 file searched for multiple streams to decompress in parallel."""
+
+SQL_COPY_REGEX = re.compile(rb"^COPY (?P<table>(?:\"[^\"]+\"|[\w$]+)(?:\.(?:\"[^\"]+\"|[\w$]+))?) .*FROM stdin;$")
+"""Statement starting a block of table data in plain SQL dumps."""
+
+SQL_COPY_TERMINATOR = b"\\.\n"
+"""Line marking the end of a block of table data in plain SQL dumps."""
+
+SQL_FOREIGN_KEY_REGEX = re.compile(
+    rb"^    ADD CONSTRAINT (?P<name>\S+) (?P<definition>FOREIGN KEY \(.*\) REFERENCES (?P<reference>[^\s(]+)\(.*?);$"
+)
+"""Second line of a statement creating a foreign key in plain SQL dumps."""
+
+SQL_FOREIGN_KEY_STATEMENT_REGEX = re.compile(
+    r"^ALTER TABLE ONLY (?P<table>\S+)\n    ADD CONSTRAINT (?P<name>\S+) "
+    r"(?P<definition>FOREIGN KEY \(.*\) REFERENCES (?P<reference>[^\s(]+)\(.*?);$",
+    re.MULTILINE,
+)
+"""Statement creating a foreign key in plain SQL dumps."""
+
+DOWNLOAD_POLL_INTERVAL = 0.1
+"""Number of seconds to wait for more data when reading a file that is still being downloaded."""
+
+ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+"""Local header preceding each member of a zip archive."""
+
+ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+"""Leading bytes of the local header of a member of a zip archive."""
+
+ZIP_DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+"""Optional leading bytes of the data descriptor following members of unknown size in a zip archive."""
+
+ZIP_FLAG_ENCRYPTED = 0x01
+"""Flag of encrypted members in zip archives."""
+
+ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+"""Flag of members whose sizes are written after their data in zip archives."""
+
+ZIP_FLAG_UTF8 = 0x800
+"""Flag of members whose name is encoded in UTF-8 in zip archives."""
+
+ZIP_EXTRA_FIELD_HEADER = struct.Struct("<HH")
+"""Header of the extra fields of members of zip archives."""
+
+ZIP_EXTRA_ZIP64 = 0x0001
+"""Identifier of the extra field holding 64-bit sizes in zip archives."""
+
+ZIP64_LIMIT = 0xFFFFFFFF
+"""Value of the sizes of members of zip archives whose actual sizes are stored in their zip64 extra field."""
+
+ZIP_STORED = 0
+"""Compression method of uncompressed members in zip archives."""
+
+ZIP_DEFLATED = 8
+"""Compression method of deflated members in zip archives."""
+
+RESTORE_PHASES = ("ddl", "data", "indexes", "constraints", "analyze")
+"""Phases of a restore, in order."""
+
+FAST_RESTORE_SETTINGS: dict[str, str] = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "512MB",
+    "jit": "off",
+}
+"""PostgreSQL settings applied to the sessions restoring dumps with the fast-restore profile."""
+
+RESTORE_LIST_INDEX_TYPES = ("INDEX", "INDEX ATTACH")
+"""Types of the entries of the table of contents of a custom dump building indexes."""
+
+RESTORE_LIST_ENTRY_REGEX = re.compile(
+    r"^\d+; \d+ \d+ (?P<type>TABLE DATA|FK CONSTRAINT|INDEX ATTACH|INDEX|[A-Z][A-Z ]*?) "
+    r"(?P<schema>\S+) (?P<table>\S+) (?P<name>\S+)"
+)
+"""Entry of the table of contents of a custom dump, as listed by `pg_restore --list`."""
+
+
+class CountingReader(io.RawIOBase):
+    """Raw reader counting the bytes consumed from an underlying file."""
+
+    def __init__(self, file: IO[bytes]):
+        super().__init__()
+        self.file = file
+        """The underlying file."""
+
+        self.count: int = 0
+        """Number of bytes read from the underlying file."""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore [override]
+        size = self.file.readinto(buffer)  # type: ignore [attr-defined]
+        self.count += size or 0
+        return size
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+class GrowingFile(io.RawIOBase):
+    """Raw reader over a file still being written to by another thread, waiting for more data
+    whenever its current end is reached until the file is complete.
+    """
+
+    def __init__(self, path: Path, complete: Event):
+        """Initialize the reader.
+        :param path: Path to the file, which may not exist yet.
+        :param complete: Event set once the file has been fully written.
+        """
+        super().__init__()
+        self.path = path
+        """Path to the file."""
+
+        self.complete = complete
+        """Event set once the file has been fully written."""
+
+        self._file: IO[bytes] | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore [override]
+        while True:
+            complete = self.complete.is_set()
+
+            if self._file is None and self.path.exists():
+                self._file = self.path.open("rb", buffering=0)
+
+            if self._file is not None:
+                size = self._file.readinto(buffer)  # type: ignore [attr-defined]
+
+                if size or complete:
+                    return size or 0
+            elif complete:
+                raise FileNotFoundError(f"File {self.path} was not downloaded")
+
+            self.complete.wait(DOWNLOAD_POLL_INTERVAL)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+        super().close()
+
+
+class ZipMemberReader(io.RawIOBase):
+    """Raw reader extracting a member of a zip archive from the local headers of its members, reading the archive
+    sequentially so that the member can be consumed before the rest of the archive, and its central directory,
+    are available. Only stored and deflated members are supported.
+    """
+
+    def __init__(self, file: IO[bytes], name: str):
+        """Find the member in the archive.
+        :param file: The zip archive, read sequentially.
+        :param name: Name of the member to extract.
+        :raise ValueError: If the member is not found or cannot be extracted sequentially.
+        """
+        super().__init__()
+        self.file = file
+        """The zip archive."""
+
+        self.name = name
+        """Name of the member to extract."""
+
+        self._pending: bytes = b""
+        self._method: int = ZIP_STORED
+        self._remaining: int | None = None
+        self._descriptor: bool = False
+        self._zip64: bool = False
+        self._decompressor: Any = None
+        self._done: bool = True
+
+        while self._next_member() != name:
+            while self._read_member(RESTORE_CHUNK_SIZE):
+                pass
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore [override]
+        data = self._read_member(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+    def _read(self, size: int, exact: bool = True) -> bytes:
+        """Read bytes from the archive, starting with those read ahead of their use.
+        :param size: Number of bytes to read.
+        :param exact: Whether to keep reading until `size` bytes are read or the end of the archive is reached.
+        """
+        data, self._pending = self._pending[:size], self._pending[size:]
+
+        while len(data) < size and (not data or exact) and (chunk := self.file.read(size - len(data))):
+            data += chunk
+
+        return data
+
+    def _next_member(self) -> str:
+        """Read the local header of the next member of the archive and prepare to extract its content.
+        :return: The name of the member.
+        """
+        header = self._read(ZIP_LOCAL_HEADER.size)
+
+        if len(header) < ZIP_LOCAL_HEADER.size or not header.startswith(ZIP_LOCAL_HEADER_SIGNATURE):
+            raise ValueError(f"Member {self.name!r} not found in archive")
+
+        _, _, flags, method, _, _, _, compressed_size, size, name_length, extra_length = ZIP_LOCAL_HEADER.unpack(header)
+        name = self._read(name_length).decode("utf-8" if flags & ZIP_FLAG_UTF8 else "cp437")
+        extra = self._read(extra_length)
+
+        if flags & ZIP_FLAG_ENCRYPTED or method not in (ZIP_STORED, ZIP_DEFLATED):
+            raise ValueError(f"Member {name!r} of archive cannot be extracted sequentially")
+
+        self._zip64 = False
+
+        while len(extra) >= ZIP_EXTRA_FIELD_HEADER.size:
+            field, length = ZIP_EXTRA_FIELD_HEADER.unpack(extra[: ZIP_EXTRA_FIELD_HEADER.size])
+            extra = extra[ZIP_EXTRA_FIELD_HEADER.size :]
+
+            if field == ZIP_EXTRA_ZIP64:
+                self._zip64 = True
+                values = list(struct.unpack(f"<{length // 8}Q", extra[: length - length % 8]))
+
+                if size == ZIP64_LIMIT and values:
+                    values.pop(0)
+
+                if compressed_size == ZIP64_LIMIT and values:
+                    compressed_size = values.pop(0)
+
+            extra = extra[length:]
+
+        self._descriptor = bool(flags & ZIP_FLAG_DATA_DESCRIPTOR)
+
+        if self._descriptor and method == ZIP_STORED:
+            raise ValueError(f"Member {name!r} of archive cannot be extracted sequentially")
+
+        self._method = method
+        self._remaining = None if self._descriptor else compressed_size
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == ZIP_DEFLATED else None
+        self._done = False
+
+        if self._remaining == 0 and method == ZIP_STORED:
+            self._end_member()
+
+        return name
+
+    def _read_member(self, size: int) -> bytes:
+        """Extract the content of the current member.
+        :param size: Maximum number of bytes to return.
+        :return: The extracted bytes, empty once the whole member has been extracted.
+        """
+        while not self._done:
+            if self._decompressor is None:
+                data = self._read(min(size, self._remaining or 0), exact=False)
+                self._remaining = (self._remaining or 0) - len(data)
+            else:
+                raw = self._decompressor.unconsumed_tail
+
+                if not raw:
+                    raw = self._read(
+                        RESTORE_CHUNK_SIZE if self._remaining is None else min(RESTORE_CHUNK_SIZE, self._remaining),
+                        exact=False,
+                    )
+
+                    if self._remaining is not None:
+                        self._remaining -= len(raw)
+
+                if not raw:
+                    raise EOFError(f"Archive ended before the end of member {self.name!r}")
+
+                data = self._decompressor.decompress(raw, size)
+
+            if not data and self._decompressor is None:
+                raise EOFError(f"Archive ended before the end of member {self.name!r}")
+
+            if self._decompressor is not None and self._decompressor.eof:
+                self._pending = self._decompressor.unused_data + self._pending
+                self._end_member()
+            elif self._decompressor is None and not self._remaining:
+                self._end_member()
+
+            if data:
+                return data
+
+        return b""
+
+    def _end_member(self):
+        """Skip the data descriptor following the content of the current member, if any."""
+        if self._descriptor:
+            signature = self._read(len(ZIP_DATA_DESCRIPTOR_SIGNATURE))
+
+            if signature != ZIP_DATA_DESCRIPTOR_SIGNATURE:
+                self._pending = signature + self._pending
+
+            self._read(20 if self._zip64 else 12)
+
+        self._done = True
+
+
+class PipelinedDecompressor(io.RawIOBase):
+    """Raw reader decompressing a file in a background thread, ahead of its consumer.
+    Bzip2 files made of multiple streams, as produced by `pbzip2`, are split on stream boundaries and the resulting
+    segments are decompressed in parallel by a pool of threads, `bz2` releasing the GIL while decompressing.
+    Other files are decompressed sequentially, though still concurrently with their consumer.
+    """
+
+    def __init__(self, file: IO[bytes], compression: Literal["gzip", "bzip2"], workers: int | None = None):
+        """Start decompressing the file.
+        :param file: The compressed file.
+        :param compression: Compression of the file.
+        :param workers: Number of threads decompressing bzip2 streams in parallel, defaults to the number of CPUs.
+        """
+        super().__init__()
+        self.file = file
+        """The compressed file."""
+
+        self.compression = compression
+        """Compression of the file."""
+
+        self.workers: int = workers or os.cpu_count() or 1
+        """Number of threads decompressing bzip2 streams in parallel."""
+
+        self.decompression_time: float = 0.0
+        """Time spent decompressing, excluding time spent waiting for the consumer to catch up, in seconds."""
+
+        self.wait_time: float = 0.0
+        """Time the consumer spent waiting for decompressed data, in seconds."""
+
+        self._queue: Queue[bytes | Exception | None] = Queue(DECOMPRESSION_QUEUE_SIZE)
+        self._pending: memoryview = memoryview(b"")
+        self._finished: bool = False
+        self._stopped = Event()
+        self._blocked_time: float = 0.0
+        self._thread = Thread(target=self._produce, name="odev-decompress", daemon=True)
+        self._thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore [override]
+        while not self._pending and not self._finished:
+            start = perf_counter()
+            item = self._queue.get()
+            self.wait_time += perf_counter() - start
+
+            if item is None or isinstance(item, Exception):
+                self._finished = True
+
+                if item is not None:
+                    raise item
+            else:
+                self._pending = memoryview(item)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if self.closed:
+            return
+
+        self._stopped.set()
+
+        # Unblock the decompression thread if it is waiting for room in the queue
+        while self._thread.is_alive():
+            with suppress(Empty):
+                self._queue.get(timeout=0.1)
+
+        self.file.close()
+        super().close()
+
+    def _produce(self):
+        """Decompress the file and queue the decompressed chunks."""
+        start = perf_counter()
+
+        try:
+            for chunk in self._decompress_gzip() if self.compression == "gzip" else self._decompress_bzip2():
+                if chunk and not self._put(chunk):
+                    return
+
+            self._put(None)
+        except Exception as error:  # noqa: BLE001 - raised again in the consumer thread
+            self._put(error)
+        finally:
+            self.decompression_time = perf_counter() - start - self._blocked_time
+
+    def _put(self, item: bytes | Exception | None) -> bool:
+        """Queue an item for the consumer, waiting for room in the queue unless stopped.
+        :return: Whether the item was queued.
+        """
+        start = perf_counter()
+
+        try:
+            while not self._stopped.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                except Full:
+                    continue
+                else:
+                    return True
+
+            return False
+        finally:
+            self._blocked_time += perf_counter() - start
+
+    def _read(self, head: bytes = b"") -> Generator[bytes, None, None]:
+        """Read the compressed file in chunks.
+        :param head: Bytes already read from the file, yielded first.
+        """
+        if head:
+            yield head
+
+        while not self._stopped.is_set() and (data := self.file.read(RESTORE_CHUNK_SIZE)):
+            yield data
+
+    def _decompress_gzip(self, head: bytes = b"") -> Generator[bytes, None, None]:
+        """Decompress gzip data, including files made of multiple members.
+        :param head: Bytes already read from the file.
+        """
+        decompressor, started = zlib.decompressobj(GZIP_WBITS), False
+
+        for received in self._read(head):
+            data = received
+
+            while data:
+                if not started:
+                    # Ignore the null padding allowed between and after members
+                    data = data.lstrip(b"\x00")
+                    started = bool(data)
+
+                    if not started:
+                        break
+
+                yield decompressor.decompress(data)
+
+                if not decompressor.eof:
+                    break
+
+                data = decompressor.unused_data
+                decompressor, started = zlib.decompressobj(GZIP_WBITS), False
+
+        if started:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+    def _decompress_bzip2(self) -> Generator[bytes, None, None]:
+        """Decompress bzip2 data, in parallel if the file is made of multiple streams."""
+        head = self.file.read(BZIP2_PROBE_SIZE)
+
+        if self.workers > 1 and BZIP2_STREAM_REGEX.search(head, 1):
+            logger.debug(f"Decompressing multi-stream bzip2 file with {self.workers} threads")
+            yield from self._decompress_bzip2_parallel(head)
+        else:
+            yield from self._decompress_bzip2_sequential(head)
+
+    def _decompress_bzip2_sequential(self, head: bytes) -> Generator[bytes, None, None]:
+        """Decompress bzip2 data in the current thread.
+        :param head: Bytes already read from the file.
+        """
+        decompressor, started = bz2.BZ2Decompressor(), False
+
+        for received in self._read(head):
+            data = received
+
+            while data:
+                started = True
+                yield decompressor.decompress(data)
+
+                if not decompressor.eof:
+                    break
+
+                data = decompressor.unused_data
+                decompressor, started = bz2.BZ2Decompressor(), False
+
+        if started:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+    def _decompress_bzip2_parallel(self, head: bytes) -> Generator[bytes, None, None]:
+        """Decompress bzip2 data split on stream boundaries in a pool of threads, in order.
+        :param head: Bytes already read from the file.
+        """
+        pending = bytearray()
+        results: deque[Future[bytes]] = deque()
+        executor = ThreadPoolExecutor(self.workers, thread_name_prefix="odev-bzip2")
+
+        try:
+            for data in self._read(head):
+                pending += data
+
+                if len(pending) < BZIP2_SEGMENT_SIZE or not (boundary := self._bzip2_last_stream(pending)):
+                    continue
+
+                results.append(executor.submit(bz2.decompress, bytes(pending[:boundary])))
+                del pending[:boundary]
+
+                while len(results) > self.workers * 2:
+                    yield results.popleft().result()
+
+            if pending:
+                results.append(executor.submit(bz2.decompress, bytes(pending)))
+
+            while results:
+                yield results.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _bzip2_last_stream(data: bytearray) -> int:
+        """Return the position of the last complete bzip2 stream header in data, or 0 if there is none
+        other than the one at the beginning.
+        """
+        position = data.rfind(b"BZh", 1)
+
+        while position > 0 and not BZIP2_STREAM_REGEX.match(data, position):
+            position = data.rfind(b"BZh", 1, position + 2)
+
+        return max(position, 0)
+
+
+class StreamingDownload:
+    """File downloaded in a background thread to a known path, that can be restored while it is still being
+    downloaded. Restoring a file being downloaded reads it as it grows instead of waiting for the download to end.
+
+    Without a target, the download is deferred: the code resolving what to download runs in the foreground
+    and hands the download itself over to the background thread by calling `start` once it is ready.
+    """
+
+    _active: ClassVar[dict[Path, "StreamingDownload"]] = {}
+
+    def __init__(self, path: Path, target: Callable[[], Any] | None = None):
+        """Initialize the download.
+        :param path: Path to which the file is downloaded.
+        :param target: Callable downloading the file, run in a background thread, or `None` to defer the download
+            until `start` is called.
+        """
+        self.path = path
+        """Path to which the file is downloaded."""
+
+        self.complete = Event()
+        """Event set once the download has ended."""
+
+        self.stop = Event()
+        """Event set to interrupt the download, i.e. when restoring the file failed."""
+
+        self.result: Any = None
+        """Value returned by the callable downloading the file."""
+
+        self._target = target
+        self._thread = Thread(target=self._run, name=f"download-{path.name}")
+
+    def __enter__(self) -> "StreamingDownload":
+        self._active[self.path.resolve()] = self
+
+        if self._target is not None:
+            self._thread.start()
+
+        return self
+
+    def __exit__(self, exc_type, *args):
+        try:
+            if exc_type is None:
+                self.wait()
+            else:
+                # Do not keep downloading a file that will not be restored, nor mask the original error
+                self.stop.set()
+
+                try:
+                    self.wait()
+                except RuntimeError as error:
+                    logger.debug(f"Interrupted download of {self.path.name}: {error}")
+        finally:
+            self.complete.set()
+            self._active.pop(self.path.resolve(), None)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path.as_posix()!r})"
+
+    @classmethod
+    def get(cls, path: Path) -> "StreamingDownload | None":
+        """Return the download in progress to the given path, if any.
+        :param path: Path to the downloaded file.
+        """
+        download = cls._active.get(path.resolve())
+        return download if download is not None and not download.complete.is_set() else None
+
+    @property
+    def size(self) -> int:
+        """Number of bytes downloaded so far."""
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the download was started in the background thread."""
+        return self._thread.ident is not None
+
+    def _run(self):
+        try:
+            self.result = cast(Callable[[], Any], self._target)()
+        finally:
+            self.complete.set()
+
+    def start(self, target: Callable[[], Any]):
+        """Start a deferred download in the background thread.
+        :param target: Callable downloading the file.
+        """
+        if self.running:
+            raise RuntimeError(f"Download of {self.path.name} already started")
+
+        self._target = target
+        self._thread.start()
+
+    def started(self) -> bool:
+        """Wait for the file to be created.
+        :return: Whether the file exists, `False` if the download ended without creating it.
+        """
+        if not self.running:
+            # A deferred download that was not started by now will not be, the file was written in the foreground
+            self.complete.set()
+
+        while not self.path.exists() and not self.complete.wait(DOWNLOAD_POLL_INTERVAL):
+            pass
+
+        return self.path.exists()
+
+    def open(self) -> GrowingFile:
+        """Open the file for reading, waiting for more data until the download ends."""
+        return GrowingFile(self.path, self.complete)
+
+    def wait(self):
+        """Wait for the download to end, raising errors that occurred while downloading."""
+        if self.running:
+            self._thread.join()
+
+
+class RestoreInput:
+    """Single-pass reader over a dump, decompressing it on the fly if needed.
+    Progress is tracked on the bytes consumed from the underlying file so that the total is known upfront
+    without inflating compressed files, and the beginning of the dump is buffered so that it can be
+    inspected without seeking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        opener: Callable[[], IO[bytes]],
+        size: int | Callable[[], int],
+        compression: Literal["gzip", "bzip2"] | None = None,
+    ):
+        """Initialize the reader.
+        :param name: Name of the dump, for display purposes.
+        :param opener: Callable returning the underlying file, called again if the dump needs to be read anew.
+        :param size: Size of the underlying file in bytes, or a callable returning it if the file is still growing.
+        :param compression: Compression of the underlying file, if any.
+        """
+        self.name = name
+        """Name of the dump."""
+
+        self._size = size
+
+        self.compression = compression
+        """Compression of the underlying file."""
+
+        self._opener = opener
+        self._raw: CountingReader | None = None
+        self._decompressor: PipelinedDecompressor | None = None
+        self._stream: IO[bytes] | None = None
+        self._head: bytes = b""
+        self._consuming: bool = False
+
+    def __enter__(self) -> "RestoreInput":
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r}, compression={self.compression!r})"
+
+    @classmethod
+    def from_path(cls, path: Path) -> "RestoreInput":
+        """Create a reader for a file on disk, detecting its compression from its leading bytes.
+        Files still being downloaded are read as they grow.
+        :param path: Path to the dump file.
+        """
+        download = StreamingDownload.get(path)
+        opener: Callable[[], IO[bytes]] = download.open if download is not None else lambda: path.open("rb")
+
+        with io.BufferedReader(opener()) as file:  # type: ignore [arg-type]
+            magic = file.read(max(len(number) for number in COMPRESSION_MAGIC_NUMBERS))
+
+        compression = next(
+            (value for number, value in COMPRESSION_MAGIC_NUMBERS.items() if magic.startswith(number)),
+            None,
+        )
+
+        if download is not None:
+            return cls(path.name, opener, lambda: download.size, compression)
+
+        return cls(path.name, opener, path.stat().st_size, compression)
+
+    @property
+    def size(self) -> int:
+        """Size of the underlying file in bytes."""
+        return self._size() if callable(self._size) else self._size
+
+    @property
+    def consumed(self) -> int:
+        """Number of bytes consumed from the underlying file."""
+        return self._raw.count if self._raw is not None else 0
+
+    @property
+    def decompression_time(self) -> float:
+        """Time spent decompressing the dump, in seconds."""
+        return self._decompressor.decompression_time if self._decompressor is not None else 0.0
+
+    @property
+    def decompression_wait_time(self) -> float:
+        """Time spent waiting for decompressed data, in seconds."""
+        return self._decompressor.wait_time if self._decompressor is not None else 0.0
+
+    def open(self) -> "RestoreInput":
+        """Open the underlying file and start decompressing it if needed."""
+        self._raw = CountingReader(self._opener())
+
+        if self.compression is None:
+            self._decompressor = None
+            self._stream = io.BufferedReader(self._raw, RESTORE_CHUNK_SIZE)
+        else:
+            self._decompressor = PipelinedDecompressor(self._raw, self.compression)
+            self._stream = io.BufferedReader(self._decompressor, RESTORE_CHUNK_SIZE)
+
+        self._head, self._consuming = b"", False
+        return self
+
+    def close(self):
+        """Close the underlying file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+        if self._raw is not None:
+            self._raw.close()
+
+    def reopen(self) -> "RestoreInput":
+        """Read the dump again from its beginning."""
+        logger.debug(f"Reading dump {self.name!r} again from the start")
+        self.close()
+        return self.open()
+
+    def peek(self, size: int = RESTORE_HEADER_SIZE) -> bytes:
+        """Return the first bytes of the (decompressed) dump without consuming them.
+        Once the dump is being consumed, only the bytes already peeked at remain available.
+        :param size: Number of bytes to return, less may be returned if the dump is shorter.
+        """
+        if self._stream is None:
+            raise ValueError(f"Dump {self.name!r} is not open")
+
+        while not self._consuming and len(self._head) < size and (data := self._stream.read(size - len(self._head))):
+            self._head += data
+
+        return self._head[:size]
+
+    def chunks(self, size: int = RESTORE_CHUNK_SIZE) -> Generator[bytes, None, None]:
+        """Read the (decompressed) dump in chunks, starting with the bytes already peeked at.
+        :param size: Maximum number of bytes per chunk.
+        """
+        if self._stream is None:
+            raise ValueError(f"Dump {self.name!r} is not open")
+
+        self._consuming = True
+
+        for start in range(0, len(self._head), size):
+            yield self._head[start : start + size]
+
+        while chunk := self._stream.read(size):
+            yield chunk
+
+
+def parse_table_filters(values: Iterable[str]) -> dict[str, float]:
+    """Parse the tables whose data should be filtered out of restored dumps.
+    Each value is the name of a table, optionally followed by the ratio of rows to keep:
+    `mail_message` skips all rows, `mail_message:0.1` or `mail_message:10%` keeps one row out of ten.
+    Names qualified with their schema, i.e. `public.mail_message`, are matched without it.
+    :param values: Tables to filter, with their optional ratio.
+    :return: A mapping of unqualified table names to the ratio of rows to keep.
+    :raise ValueError: If a ratio is invalid.
+    """
+    filters: dict[str, float] = {}
+
+    for value in values:
+        table, _, ratio = value.strip().partition(":")
+        table = _unqualify(table)
+
+        if not table:
+            continue
+
+        try:
+            filters[table] = float(ratio.rstrip("%")) / (100 if ratio.endswith("%") else 1) if ratio else 0.0
+        except ValueError as error:
+            raise ValueError(f"Invalid ratio {ratio!r} for table {table!r}") from error
+
+        if not 0 <= filters[table] <= 1:
+            raise ValueError(f"Ratio of rows to keep for table {table!r} must be between 0 and 1, got {ratio!r}")
+
+    return filters
+
+
+def _unqualify(name: str | bytes) -> str:
+    """Return the name of a table without its schema and quotes."""
+    if isinstance(name, bytes):
+        name = name.decode()
+
+    return name.rpartition(".")[2].strip('"')
+
+
+class SqlFilter:
+    """Streaming filter over plain SQL dumps generated by `pg_dump`, skipping or sampling the rows of
+    `COPY ... FROM stdin;` blocks of selected tables.
+    Foreign keys referencing filtered tables are created as `NOT VALID` so that the schema is restored as-is
+    although referenced rows may be missing.
+    The phase of the restore the stream is in is tracked along the way, see `RESTORE_PHASES`.
+    """
+
+    def __init__(self, tables: Mapping[str, float]):
+        """Initialize the filter.
+        :param tables: A mapping of table names to the ratio of rows to keep, 0 to skip all rows.
+        """
+        self.tables = tables
+        """Ratio of rows to keep per filtered table."""
+
+        self.rows: Counter[str] = Counter()
+        """Number of rows read per filtered table."""
+
+        self.rows_kept: Counter[str] = Counter()
+        """Number of rows kept per filtered table."""
+
+        self.constraints: list[str] = []
+        """Foreign keys created as `NOT VALID`."""
+
+        self.phase: str = RESTORE_PHASES[0]
+        """Phase of the restore the last processed statement belongs to."""
+
+        self._table: str | None = None
+        self._copying: bool = False
+        self._credit: float = 0.0
+
+    def filter(self, chunks: Iterable[bytes]) -> Generator[bytes, None, None]:
+        """Filter a stream of SQL.
+        :param chunks: Chunks of a plain SQL dump, split at arbitrary positions.
+        """
+        buffer = bytearray()
+
+        for chunk in chunks:
+            buffer += chunk
+            output = bytearray()
+            position = self._process(buffer, output)
+            del buffer[:position]
+
+            if output:
+                yield bytes(output)
+
+        if buffer:
+            yield bytes(buffer)
+
+    def _process(self, buffer: bytearray, output: bytearray) -> int:
+        """Process all complete lines in buffer, appending the lines to keep to output.
+        :return: The position in buffer up to which data was processed.
+        """
+        position = 0
+
+        while position < len(buffer):
+            if not self._copying:
+                end = buffer.find(b"\n", position)
+
+                if end < 0:
+                    break
+
+                output += self._process_statement(bytes(buffer[position : end + 1]))
+                position = end + 1
+                continue
+
+            # The end of COPY data is marked by a line containing only `\.`
+            if buffer.startswith(SQL_COPY_TERMINATOR, position):
+                terminator = position
+            else:
+                terminator = buffer.find(b"\n" + SQL_COPY_TERMINATOR, position)
+                terminator = terminator + 1 if terminator >= 0 else -1
+
+            end = terminator if terminator >= 0 else buffer.rfind(b"\n", position) + 1
+
+            if end > position:
+                output += self._process_rows(buffer, position, end)
+                position = end
+
+            if terminator < 0:
+                break
+
+            output += SQL_COPY_TERMINATOR
+            position += len(SQL_COPY_TERMINATOR)
+            self._table, self._copying = None, False
+
+        return position
+
+    def _process_statement(self, line: bytes) -> bytes:
+        """Process a line of SQL statements outside of COPY data."""
+        if line.startswith(b"COPY ") and (match := SQL_COPY_REGEX.match(line)):
+            table = _unqualify(match.group("table"))
+            self._copying = True
+            self._table = table if table in self.tables else None
+            self._credit = 1.0 - self.tables.get(table, 0.0)  # always keep the first row of sampled tables
+            self.phase = "data"
+            return line
+
+        if line.startswith((b"CREATE INDEX ", b"CREATE UNIQUE INDEX ")):
+            self.phase = "indexes"
+        elif line.startswith((b"    ADD CONSTRAINT ", b"CREATE TRIGGER ")) and self.phase != "ddl":
+            self.phase = "constraints"
+
+        if (
+            line.startswith(b"    ADD CONSTRAINT ")
+            and (match := SQL_FOREIGN_KEY_REGEX.match(line))
+            and _unqualify(match.group("reference")) in self.tables
+        ):
+            self.constraints.append(match.group("name").decode())
+            return line[: match.end("definition")] + b" NOT VALID;\n"
+
+        return line
+
+    def _process_rows(self, buffer: bytearray, start: int, end: int) -> bytes | bytearray:
+        """Process complete rows of COPY data, returning the ones to keep."""
+        if self._table is None:
+            return buffer[start:end]
+
+        rows = buffer[start:end].split(b"\n")[:-1]
+        self.rows[self._table] += len(rows)
+        ratio = self.tables[self._table]
+
+        if not ratio:
+            return b""
+
+        kept = bytearray()
+
+        for row in rows:
+            self._credit += ratio
+
+            if self._credit >= 1:
+                self._credit -= 1
+                kept += row + b"\n"
+                self.rows_kept[self._table] += 1
+
+        return kept
+
+
+def split_restore_list(restore_list: str) -> tuple[str, str]:
+    """Split the table of contents of a custom dump in two, so that indexes can be built separately from
+    the other objects of the post-data section.
+    :param restore_list: The table of contents of the dump, as listed by `pg_restore --list`.
+    :return: The table of contents without indexes and the table of contents with only indexes.
+    """
+    without_indexes: list[str] = []
+    only_indexes: list[str] = []
+
+    for line in restore_list.splitlines():
+        match = RESTORE_LIST_ENTRY_REGEX.match(line)
+        is_index = match is not None and match.group("type") in RESTORE_LIST_INDEX_TYPES
+        is_entry = line[:1].isdigit()
+        without_indexes.append(f";{line}" if is_index else line)
+        only_indexes.append(f";{line}" if is_entry and not is_index else line)
+
+    return "\n".join(without_indexes) + "\n", "\n".join(only_indexes) + "\n"
+
+
+def filter_restore_list(restore_list: str, definitions: str, tables: Mapping[str, float]) -> tuple[str, list[str]]:
+    """Filter the table of contents of a dump generated by `pg_dump --format=custom`, as listed by
+    `pg_restore --list`, so that the data of the given tables is not restored.
+    Foreign keys referencing these tables are removed from the list and returned as statements
+    creating them as `NOT VALID`, to run after the restore. Rows cannot be sampled from custom dumps,
+    the data of sampled tables is restored in full.
+    :param restore_list: The table of contents of the dump.
+    :param definitions: The SQL definitions of the post-data section of the dump.
+    :param tables: A mapping of table names to the ratio of rows to keep.
+    :return: The filtered table of contents and the statements creating removed foreign keys.
+    """
+    skipped = {table for table, ratio in tables.items() if not ratio}
+    constraints: dict[tuple[str, str], str] = {}
+
+    for match in SQL_FOREIGN_KEY_STATEMENT_REGEX.finditer(definitions):
+        if _unqualify(match.group("reference")) in skipped:
+            constraints[(_unqualify(match.group("table")), match.group("name"))] = (
+                f"ALTER TABLE ONLY {match.group('table')} ADD CONSTRAINT {match.group('name')} "
+                f"{match.group('definition')} NOT VALID"
+            )
+
+    lines: list[str] = []
+
+    for line in restore_list.splitlines():
+        match = RESTORE_LIST_ENTRY_REGEX.match(line)
+
+        if match and (
+            (match.group("type") == "TABLE DATA" and match.group("table") in skipped)
+            or (match.group("type") == "FK CONSTRAINT" and (match.group("table"), match.group("name")) in constraints)
+        ):
+            line = f";{line}"  # noqa: PLW2901 - comment out the entry
+
+        lines.append(line)
+
+    return "\n".join(lines) + "\n", list(constraints.values())
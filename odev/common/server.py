@@ -0,0 +1,327 @@
+"""Background odev server keeping the framework initialized between commands.
+
+Clients (see `odev/client.py`) connect to a Unix socket and send a request made of a 4-bytes
+big-endian length followed by a JSON object, with their standard input, output and error
+file descriptors attached. Requests hold the action to perform ("run", "ping" or "stop") and,
+for commands to run, the arguments, working directory and environment of the client.
+The server replies with JSON lines: for commands, the process id running the command
+followed by its exit code once done, or by a request to run the command in-process if odev
+was updated before running it.
+
+Each command runs in a process forked from the server, which inherits the loaded modules,
+registered commands and parsed configuration and takes over the terminal of the client.
+Caches of the server are reset and the checks done when odev starts (updates, pruning of databases)
+run again in that process before the command.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from contextlib import suppress
+from pathlib import Path
+from signal import SIG_DFL, SIG_IGN, SIGCHLD, SIGTTOU, signal
+from time import monotonic
+from typing import Any
+
+from odev.common.connectors import PostgresConnector, RestConnector
+from odev.common.console import console
+from odev.common.logging import logging
+from odev.common.mixins.framework import OdevFrameworkMixin
+
+
+__all__ = ["SERVER_IDLE_TIMEOUT", "OdevServer"]
+
+
+logger = logging.getLogger(__name__)
+
+
+SERVER_SOCKET_NAME = "server.sock"
+"""Name of the Unix socket the server listens on, in the odev home directory.
+Must be kept in sync with `odev/client.py`.
+"""
+
+SERVER_IDLE_TIMEOUT = 60 * 60
+"""Number of seconds after which a server that received no request exits."""
+
+SERVER_MESSAGE_HEADER = struct.Struct("!I")
+"""Header of requests sent to the server, holding the length of the JSON payload."""
+
+SERVER_BUFFER_SIZE = 1024 * 1024
+"""Maximum number of bytes read at once from clients."""
+
+SERVER_MAX_FDS = 3
+"""Number of file descriptors sent along with requests (stdin, stdout and stderr)."""
+
+SERVER_RECEIVE_TIMEOUT = 5
+"""Maximum number of seconds to wait for a client to send its request."""
+
+
+class OdevServer(OdevFrameworkMixin):
+    """Serve odev commands from a process where the framework is already started."""
+
+    def __init__(self, idle_timeout: int = SERVER_IDLE_TIMEOUT):
+        """Initialize the server.
+
+        :param idle_timeout: Number of seconds after which the server exits if it received no request.
+        """
+        super().__init__()
+
+        self.idle_timeout: int = idle_timeout
+        """Number of seconds after which the server exits if it received no request."""
+
+        self.started_at: float = monotonic()
+        """Time at which the server started."""
+
+    @property
+    def socket_path(self) -> Path:
+        """Path to the Unix socket the server listens on."""
+        return self.odev.home_path / SERVER_SOCKET_NAME
+
+    @property
+    def main_path(self) -> Path:
+        """Path to the script running odev in-process."""
+        return self.odev.path / "main.py"
+
+    def signature(self) -> tuple[float, ...]:
+        """Modification times of the files loaded at startup, the server must be restarted
+        to serve commands once one of them changed (after an update or a change of configuration).
+        """
+        paths = [self.odev.path / "odev" / "_version.py", self.config.path, self.odev.plugins_path]
+        return tuple(path.stat().st_mtime if path.exists() else 0.0 for path in paths)
+
+    def request(self, action: str) -> dict[str, Any] | None:
+        """Send a request to the running server.
+
+        :param action: The action to perform, one of "ping" or "stop".
+        :return: The reply of the server, or `None` if it is not running.
+        """
+        payload = json.dumps({"action": action}).encode()
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(self.socket_path.as_posix())
+                client.sendall(SERVER_MESSAGE_HEADER.pack(len(payload)) + payload)
+                reply = client.makefile("rb").readline()
+        except OSError as error:
+            logger.debug(f"Could not reach odev server at {self.socket_path}: {error}")
+            return None
+
+        return json.loads(reply) if reply else None
+
+    def serve(self):
+        """Accept requests until idle for too long, asked to stop or outdated.
+        Outdated servers are replaced by a new process loading the latest version of odev and its configuration.
+        """
+        signature = self.signature()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        listener.bind(self.socket_path.as_posix())
+        self.socket_path.chmod(0o600)
+        listener.listen()
+        listener.settimeout(self.idle_timeout)
+        signal(SIGCHLD, SIG_IGN)
+        outdated = False
+        logger.debug(f"Odev server listening on {self.socket_path}")
+
+        try:
+            while not outdated:
+                try:
+                    connection, _ = listener.accept()
+                except TimeoutError:
+                    logger.debug("Odev server idle for too long, exiting")
+                    break
+
+                with connection:
+                    try:
+                        action, outdated = self._handle(listener, connection, signature)
+                    except (OSError, ValueError) as error:
+                        logger.debug(f"Invalid request received by odev server: {error}")
+                        continue
+
+                if action == "stop":
+                    break
+        finally:
+            listener.close()
+            self.socket_path.unlink(missing_ok=True)
+
+        if outdated:
+            logger.debug("Odev server outdated, restarting")
+            os.execv(sys.executable, [sys.executable, self.main_path.as_posix(), "server", "--foreground"])  # noqa: S606
+
+    def _handle(
+        self, listener: socket.socket, connection: socket.socket, signature: tuple[float, ...]
+    ) -> tuple[str, bool]:
+        """Reply to a request, forking a child process for commands to run.
+
+        :param listener: The socket the server listens on.
+        :param connection: The connection to the client.
+        :param signature: The signature of the files loaded when the server started.
+        :return: The action requested and whether the server is outdated.
+        """
+        connection.settimeout(SERVER_RECEIVE_TIMEOUT)
+        request, fds = self._receive(connection)
+        connection.settimeout(None)
+        action = request.get("action", "run")
+        outdated = action == "run" and self.signature() != signature
+
+        try:
+            if action == "ping":
+                self._reply(connection, pid=os.getpid(), uptime=monotonic() - self.started_at)
+            elif action == "stop":
+                self._reply(connection, stopped=True)
+            elif action != "run":
+                self._reply(connection, error=f"Unknown action {action!r}")
+            elif outdated or len(fds) != SERVER_MAX_FDS:
+                self._reply(connection, fallback=True)
+            else:
+                self._fork(listener, connection, request, fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        return action, outdated
+
+    def _receive(self, connection: socket.socket) -> tuple[dict[str, Any], list[int]]:
+        """Read a request and the file descriptors attached to it.
+
+        :param connection: The connection to the client.
+        :return: The request and the file descriptors received.
+        """
+        data, fds, _, _ = socket.recv_fds(connection, SERVER_BUFFER_SIZE, SERVER_MAX_FDS)
+
+        def complete() -> bool:
+            header = SERVER_MESSAGE_HEADER.size
+            return len(data) >= header and len(data) >= header + SERVER_MESSAGE_HEADER.unpack_from(data)[0]
+
+        while not complete():
+            chunk = connection.recv(SERVER_BUFFER_SIZE)
+
+            if not chunk:
+                return {"action": "invalid"}, fds
+
+            data += chunk
+
+        try:
+            return json.loads(data[SERVER_MESSAGE_HEADER.size :]), fds
+        except ValueError:
+            return {"action": "invalid"}, fds
+
+    def _reply(self, connection: socket.socket, **payload: Any):
+        """Send a JSON line to the client.
+
+        :param connection: The connection to the client.
+        :param payload: The content of the reply.
+        """
+        connection.sendall(json.dumps(payload).encode() + b"\n")
+
+    def _fork(self, listener: socket.socket, connection: socket.socket, request: dict[str, Any], fds: list[int]):
+        """Run a command in a child process taking over the terminal and environment of the client.
+        The child process reports its pid, then its exit code, and never returns.
+
+        :param listener: The socket the server listens on, closed in the child process.
+        :param connection: The connection to the client.
+        :param request: The request of the client.
+        :param fds: The standard input, output and error of the client.
+        """
+        if os.fork():
+            return
+
+        exit_code: int | None = 1
+        foreground: int | None = None
+
+        try:
+            listener.close()
+            os.setpgid(0, 0)
+            signal(SIGCHLD, SIG_DFL)
+
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+
+            foreground = self._take_terminal()
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            sys.argv = [self.main_path.as_posix(), *request["argv"]]
+            console.reattach()
+            self.odev._command_stack.clear()
+            self._reply(connection, pid=os.getpid())
+            exit_code = None if self._refresh() else self._run()
+        finally:
+            console.flush_batch()
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            if foreground is not None:
+                self._set_foreground(foreground)
+
+            try:
+                self._reply(connection, **({"fallback": True} if exit_code is None else {"exit": exit_code}))
+            finally:
+                os._exit(exit_code or 0)
+
+    def _take_terminal(self) -> int | None:
+        """Move the process group of the command to the foreground of the terminal of the client,
+        so that it is not stopped when reading from or writing to it. Only applies to servers running
+        in the foreground of the same terminal as the client, other servers have no control over it.
+
+        :return: The process group previously in the foreground, `None` if the terminal was not taken over.
+        """
+        try:
+            foreground = os.tcgetpgrp(0)
+        except OSError:
+            return None
+
+        return foreground if self._set_foreground(os.getpgrp()) else None
+
+    def _set_foreground(self, process_group: int) -> bool:
+        """Set the foreground process group of the terminal attached to the standard input.
+
+        :param process_group: The process group to move to the foreground.
+        :return: Whether the process group was moved to the foreground.
+        """
+        previous_handler = signal(SIGTTOU, SIG_IGN)
+
+        try:
+            with suppress(OSError):
+                os.tcsetpgrp(0, process_group)
+                return True
+        finally:
+            signal(SIGTTOU, previous_handler)
+
+        return False
+
+    def _refresh(self) -> bool:
+        """Forget the state inherited from the server, which may be outdated by now, and run the checks
+        done when odev starts as the framework of the server is already started and skips them.
+
+        :return: Whether odev was updated, in which case the command must run in a new process
+            loading the new version.
+        """
+        PostgresConnector._query_cache = {}
+        RestConnector._cache.clear()
+        self.odev.store.databases.invalidate()
+        self.odev.check_release()
+
+        if self.odev.update(restart=False):
+            return True
+
+        self.odev.prune_databases()
+        return False
+
+    def _run(self) -> int:
+        """Run the command in `sys.argv` as the odev entry point would.
+
+        :return: The exit code of the command.
+        """
+        from odev.__main__ import main  # noqa: PLC0415 - the entry point is not part of the common package
+
+        try:
+            main()
+        except SystemExit as error:
+            return error.code if isinstance(error.code, int) else int(error.code is not None)
+
+        return 0
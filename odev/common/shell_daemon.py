@@ -0,0 +1,194 @@
+"""Persistent odoo-bin shell process serving scripts over a Unix socket, to avoid loading
+the registry of a database on each script run.
+"""
+
+import hashlib
+import json
+import shlex
+import socket
+import time
+from pathlib import Path
+from subprocess import Popen
+from typing import TYPE_CHECKING, Any
+
+from odev.common import bash
+from odev.common.errors import OdevError
+from odev.common.logging import logging
+from odev.common.mixins.framework import OdevFrameworkMixin
+from odev.common.progress import spinner
+
+
+if TYPE_CHECKING:
+    from odev.common.odoobin import OdoobinProcess
+
+
+__all__ = ["SHELL_DAEMON_IDLE_TIMEOUT", "ShellDaemon"]
+
+
+logger = logging.getLogger(__name__)
+
+
+SHELL_DAEMON_IDLE_TIMEOUT = 15 * 60
+"""Number of seconds after which a shell daemon that received no request exits."""
+
+SHELL_DAEMON_START_TIMEOUT = 10 * 60
+"""Maximum number of seconds to wait for a shell daemon to load the registry of its database."""
+
+SHELL_DAEMON_POLL_INTERVAL = 0.1
+"""Interval in seconds between two checks of whether a starting shell daemon accepts requests."""
+
+
+class ShellDaemon(OdevFrameworkMixin):
+    """Warm odoo-bin shell process kept alive for a database, running scripts sent over a Unix socket.
+    The daemon is restarted when the installed modules, the worktrees or the arguments of odoo-bin change,
+    and exits by itself after being idle for too long.
+    """
+
+    def __init__(
+        self,
+        odoobin: "OdoobinProcess",
+        args: list[str] | None = None,
+        idle_timeout: int = SHELL_DAEMON_IDLE_TIMEOUT,
+    ):
+        """Initialize the daemon client.
+
+        :param odoobin: The odoo-bin process of the database to run scripts on.
+        :param args: Additional arguments to pass to odoo-bin.
+        :param idle_timeout: Number of seconds after which the daemon exits if it received no request.
+        """
+        super().__init__()
+
+        self.odoobin: OdoobinProcess = odoobin
+        """The odoo-bin process of the database to run scripts on."""
+
+        self.args: list[str] = args or []
+        """Additional arguments to pass to odoo-bin."""
+
+        self.idle_timeout: int = idle_timeout
+        """Number of seconds after which the daemon exits if it received no request."""
+
+        self._process: Popen[bytes] | None = None
+        """The daemon process, if started by this instance."""
+
+    def __repr__(self) -> str:
+        return f"ShellDaemon(database={self.odoobin.database.name!r})"
+
+    @property
+    def socket_path(self) -> Path:
+        """Path to the Unix socket the daemon listens on."""
+        return self.odev.cache_path / "shell" / f"{self.odoobin.database.name}.sock"
+
+    @property
+    def server_script_path(self) -> Path:
+        """Path to the script serving requests inside of odoo-bin shell."""
+        return self.odev.scripts_path / "shell_server.py"
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the state the registry of the daemon was loaded from: changes to the installed modules,
+        to the commits of the worktrees, to the content of the addons paths or to the arguments of odoo-bin
+        require restarting the daemon.
+        """
+        modules = self.odoobin.database.query(
+            "SELECT name, latest_version FROM ir_module_module WHERE state = 'installed' ORDER BY name"
+        )
+        state = {
+            "version": str(self.odoobin.version),
+            "venv": self.odoobin.venv.name,
+            "commits": sorted(worktree.commit for worktree in self.odoobin.odoo_worktrees),
+            "addons": {path.as_posix(): path.stat().st_mtime for path in self.odoobin.addons_paths},
+            "modules": [list(module) for module in modules or []],
+            "args": self.args,
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+    def request(self, action: str, **payload: Any) -> dict[str, Any] | None:
+        """Send a request to the daemon and wait for its reply.
+
+        :param action: The action to perform, one of "run", "ping" or "stop".
+        :param payload: Additional data to send with the request.
+        :return: The reply of the daemon, or `None` if it is not running.
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(self.socket_path.as_posix())
+                client.sendall(json.dumps({"action": action, **payload}).encode() + b"\n")
+                reply = client.makefile("rb").readline()
+        except OSError as error:
+            logger.debug(f"Could not reach shell daemon at {self.socket_path}: {error}")
+            return None
+
+        return json.loads(reply) if reply else None
+
+    def start(self, fingerprint: str):
+        """Start the daemon and wait for it to accept requests.
+
+        :param fingerprint: The fingerprint of the state the registry is loaded from.
+        """
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.socket_path.unlink(missing_ok=True)
+        self.odoobin.prepare_odoobin()
+        serve = f"shell_server(env, {self.socket_path.as_posix()!r}, {fingerprint!r}, {self.idle_timeout!r})"
+        odoobin_args = shlex.join(self.odoobin.prepare_odoobin_args(self.args, "shell"))
+        self._process = bash.detached(
+            f"{{ cat {shlex.quote(self.server_script_path.as_posix())}; echo {shlex.quote(serve)}; }} "
+            f"| {self.odoobin.venv.python} {self.odoobin.odoobin_path} {odoobin_args}"
+        )
+        deadline = time.monotonic() + SHELL_DAEMON_START_TIMEOUT
+
+        with spinner(f"Loading the registry of database {self.odoobin.database.name!r} in a shell daemon"):
+            while self.request("ping") is None:
+                if self._process.poll() is not None:
+                    raise OdevError(f"Shell daemon for database {self.odoobin.database.name!r} exited on startup")
+
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise OdevError(f"Shell daemon for database {self.odoobin.database.name!r} did not start")
+
+                time.sleep(SHELL_DAEMON_POLL_INTERVAL)
+
+        logger.debug(f"Started shell daemon for database {self.odoobin.database.name!r}")
+
+    def stop(self):
+        """Stop the daemon if it is running."""
+        if self.request("stop") is None and self._process is not None:
+            self._process.kill()
+
+        self._process = None
+
+    def ensure_started(self):
+        """Start the daemon if it is not running, or restart it if its registry is outdated."""
+        fingerprint = self.fingerprint
+        status = self.request("ping")
+
+        if status is not None and status.get("fingerprint") == fingerprint:
+            return
+
+        if status is not None:
+            logger.debug(f"Restarting outdated shell daemon for database {self.odoobin.database.name!r}")
+            self.stop()
+
+        self.start(fingerprint)
+
+    def run(self, script: str) -> str | None:
+        """Run a script in the daemon, starting it if needed.
+
+        :param script: The python code to run, with the shell environment available as `env`.
+        :return: The output printed by the script, or `None` if it failed.
+        """
+        self.ensure_started()
+        reply = self.request("run", script=script)
+
+        if reply is not None and reply.get("restart"):
+            logger.debug(f"Registry of database {self.odoobin.database.name!r} changed, restarting shell daemon")
+            self.start(self.fingerprint)
+            reply = self.request("run", script=script)
+
+        if reply is None:
+            raise OdevError(f"Shell daemon for database {self.odoobin.database.name!r} did not reply")
+
+        if reply.get("error"):
+            logger.error(f"Script failed in shell daemon:\n{reply['error'].rstrip()}")
+            return None
+
+        return reply.get("output", "")
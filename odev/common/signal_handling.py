@@ -11,6 +11,7 @@ from signal import (
     getsignal,
     signal,
 )
+from threading import current_thread, main_thread
 from types import FrameType
 from typing import Any
 
@@ -59,10 +60,15 @@ def capture_signals(
     handler: SignalHandler | None = None,
 ):
     """Capture OS signals and interrupts and handle them gracefully.
+    Signals can only be captured in the main thread, other threads leave them to it.
 
     :param list signals: The signals to capture.
     :param callable handler: The handler to use for the signals.
     """
+    if current_thread() is not main_thread():
+        yield
+        return
+
     if signals is None:
         signals = [SIGINT, SIGTERM]
     elif isinstance(signals, Signals):
@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import cast
 
 from odev.common.postgres import PostgresDatabase, PostgresTable
-from odev.common.store.tables import DatabaseStore, HistoryStore, SecretStore
+from odev.common.store.tables import CatalogueStore, DatabaseStore, FactStore, HistoryStore, SecretStore, SnapshotStore
 
 
 class DataStore(PostgresDatabase):
@@ -16,17 +16,29 @@ class DataStore(PostgresDatabase):
     databases: DatabaseStore
     """A class for managing Odoo databases."""
 
+    catalogue: CatalogueStore
+    """A class for listing local Odoo databases without connecting to each of them."""
+
+    facts: FactStore
+    """A class for caching metadata of local databases."""
+
     history: HistoryStore
     """A class for managing the history of Odoo operations."""
 
     secrets: SecretStore
     """A class for managing credentials in a vault database."""
 
+    snapshots: SnapshotStore
+    """A class for managing snapshots of local databases."""
+
     def __init__(self, name: str = "odev"):
         super().__init__(name)
         self.databases = DatabaseStore(self)
+        self.catalogue = CatalogueStore(self)
+        self.facts = FactStore(self)
         self.history = HistoryStore(self)
         self.secrets = SecretStore(self)
+        self.snapshots = SnapshotStore(self)
         self.__load_plugins_tables()
 
     def __load_plugins_tables(self):
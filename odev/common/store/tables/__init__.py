@@ -1,3 +1,6 @@
+from .catalogue import CatalogueStore
 from .databases import DatabaseStore
+from .facts import FactStore
 from .history import HistoryStore
 from .secrets import SecretStore
+from .snapshots import SnapshotStore
@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from psycopg2 import OperationalError
+
+from odev.common.connectors import PostgresConnector
+from odev.common.logging import logging
+from odev.common.mixins.databases.list import SYSTEM_DATABASES
+from odev.common.postgres import PostgresTable
+from odev.common.string import join, quote
+
+
+logger = logging.getLogger(__name__)
+
+
+CATALOGUE_CACHE_FILENAME = "databases"
+"""Name of the file in the odev cache directory listing Odoo databases, read by the completion script."""
+
+DATABASE_WRITES = "COALESCE(s.tup_inserted + s.tup_updated + s.tup_deleted, 0)"
+"""SQL expression counting rows written to a database, from `pg_stat_database` aliased as `s`.
+Unlike transactions, it is not increased by the read-only queries odev runs to inspect databases.
+"""
+
+
+@dataclass
+class CatalogueEntry:
+    """A class for storing what is known about a local database."""
+
+    oid: int
+    """The object identifier of the database in PostgreSQL, kept when the database is renamed."""
+
+    name: str
+    """The name of the database."""
+
+    odoo: bool
+    """Whether the database is an Odoo database."""
+
+    writes: int
+    """Number of rows written to the database when it was last inspected."""
+
+
+class CatalogueStore(PostgresTable):
+    """A catalogue of local databases kept in sync with `pg_database`, to list Odoo databases
+    without connecting to each of them. Databases are identified by their oid to follow renames,
+    only new databases and databases not yet recognized as Odoo databases in which rows
+    were written since last inspected are connected to.
+    """
+
+    name = "catalogue"
+
+    _columns = {
+        "oid": "BIGINT PRIMARY KEY",
+        "name": "VARCHAR NOT NULL",
+        "odoo": "BOOLEAN NOT NULL DEFAULT FALSE",
+        "writes": "BIGINT NOT NULL DEFAULT 0",
+    }
+
+    @property
+    def cache_path(self) -> Path:
+        """Path to the file listing Odoo databases, one per line.
+        Datastores other than the one of odev, i.e. in test mode, do not overwrite the file read by the completion script.
+        """
+        from odev.common.odev import HOME_PATH  # noqa: PLC0415 - the framework imports the datastore
+
+        filename = CATALOGUE_CACHE_FILENAME
+
+        if self.database.name != "odev":
+            filename = f"{filename}.{self.database.name}"
+
+        return HOME_PATH / "cache" / filename
+
+    def all(self) -> list[CatalogueEntry]:
+        """Get the databases in the catalogue."""
+        result = self.database.query(f"SELECT oid, name, odoo, writes FROM {self.name}", nocache=True)
+        return [CatalogueEntry(*row) for row in result or []]
+
+    def refresh(self) -> list[str]:
+        """Synchronize the catalogue with the databases existing in PostgreSQL and update the cache file.
+
+        :return: The names of local Odoo databases, sorted alphabetically.
+        """
+        known = {entry.oid: entry for entry in self.all()}
+        current = self._current()
+        inspected = [
+            entry
+            for entry in current
+            if entry.oid not in known or (not known[entry.oid].odoo and entry.writes != known[entry.oid].writes)
+        ]
+
+        for entry in inspected:
+            entry.odoo = self._is_odoo(entry.name)
+
+        renamed = [
+            CatalogueEntry(entry.oid, entry.name, known[entry.oid].odoo, known[entry.oid].writes)
+            for entry in current
+            if entry.oid in known and entry not in inspected and entry.name != known[entry.oid].name
+        ]
+        self._save(inspected + renamed)
+
+        if removed := known.keys() - {entry.oid for entry in current}:
+            self.database.query(f"DELETE FROM {self.name} WHERE oid IN ({join([str(oid) for oid in removed])})")
+
+        return self.write_cache()
+
+    def record(self, name: str):
+        """Mark a database as an Odoo database after odev created or restored it.
+
+        :param name: The name of the database.
+        """
+        entries = [entry for entry in self._current() if entry.name == name]
+
+        for entry in entries:
+            entry.odoo = True
+
+        self._save(entries)
+        self.write_cache()
+
+    def discard(self, *names: str):
+        """Remove databases from the catalogue after odev deleted them.
+
+        :param names: The names of the databases.
+        """
+        if not names:
+            return
+
+        self.database.query(f"DELETE FROM {self.name} WHERE name IN ({join([repr(name) for name in names])})")
+        self.write_cache()
+
+    def write_cache(self) -> list[str]:
+        """Write the names of Odoo databases to the cache file read by the completion script.
+        Templates are left out, as in `odev list --names-only`.
+
+        :return: The names of local Odoo databases, sorted alphabetically.
+        """
+        result = self.database.query(f"SELECT name FROM {self.name} WHERE odoo ORDER BY name", nocache=True)
+        names = [row[0] for row in result or []]
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_text("".join(f"{name}\n" for name in names if not name.endswith(":template")))
+        except OSError as error:
+            logger.debug(f"Could not write databases cache file {self.cache_path}: {error}")
+
+        return names
+
+    def _current(self) -> list[CatalogueEntry]:
+        """Read the databases existing in PostgreSQL along with the number of rows written to them.
+        Both `pg_database` and `pg_stat_database` are shared across databases and can be read from the datastore.
+        """
+        excluded = join([quote(database, force_single=True) for database in [*SYSTEM_DATABASES, self.database.name]])
+        result = self.database.query(
+            f"""
+            SELECT d.oid, d.datname, FALSE, {DATABASE_WRITES}
+            FROM pg_database d
+            LEFT JOIN pg_stat_database s ON s.datid = d.oid
+            WHERE d.datistemplate = false
+                AND d.datname NOT IN ({excluded})
+            """,
+            nocache=True,
+        )
+        return [CatalogueEntry(*row) for row in result or []]
+
+    def _is_odoo(self, name: str) -> bool:
+        """Connect to a database to check whether it is an Odoo database."""
+        logger.debug(f"Inspecting database {name!r} for the catalogue of local databases")
+
+        try:
+            with PostgresConnector(name) as psql, psql.nocache():
+                return bool(psql.table_exists("ir_module_module"))
+        except OperationalError as error:
+            logger.debug(f"Could not inspect database {name!r}: {error}")
+            return False
+
+    def _save(self, entries: list[CatalogueEntry]):
+        """Insert or update entries in the catalogue."""
+        if not entries:
+            return
+
+        values = join([f"({entry.oid}, {entry.name!r}, {entry.odoo}, {entry.writes})" for entry in entries])
+        self.database.query(
+            f"""
+            INSERT INTO {self.name} (oid, name, odoo, writes)
+            VALUES {values}
+            ON CONFLICT (oid) DO
+                UPDATE SET name = EXCLUDED.name, odoo = EXCLUDED.odoo, writes = EXCLUDED.writes
+            """
+        )
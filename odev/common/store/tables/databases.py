@@ -4,6 +4,7 @@ from typing import Literal
 
 from odev.common.databases import Database, LocalDatabase
 from odev.common.postgres import PostgresTable
+from odev.common.string import join
 
 
 @dataclass
@@ -16,10 +17,10 @@ class DatabaseInfo:
     platform: Literal["local", "remote", "saas", "paas"]
     """The platform of the database."""
 
-    virtualenv: str
+    virtualenv: str | None
     """The path to the virtualenv of the database."""
 
-    arguments: str
+    arguments: str | None
     """The arguments used to create the database."""
 
     whitelisted: bool
@@ -31,10 +32,10 @@ class DatabaseInfo:
     branch: str | None
     """Branch in the custom repository with the code for the database."""
 
-    worktree: str
+    worktree: str | None
     """The name of the worktree of the database."""
 
-    url: str
+    url: str | None
     """The URL of the database."""
 
 
@@ -61,56 +62,103 @@ class DatabaseStore(PostgresTable):
         "databases_unique_name_url": "UNIQUE(name, url)",
     }
 
-    def get(self, database: Database) -> DatabaseInfo | None:
-        """Get the saved values of a database."""
-        keys = ", ".join([key for key in self._columns if key != "id"])
-        result = self.database.query(
-            f"""
-            SELECT {keys} FROM {self.name}
-            WHERE name = {database.name!r}
-                AND platform = {database.platform.name!r}
-            LIMIT 1
-            """,
-            nocache=True,
-        )
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._identity_map: dict[tuple[str, str], DatabaseInfo | None] = {}
+        """Saved values of databases already loaded or set during the current command, by name and platform."""
 
-        if not result:
-            return None
+        self._dirty: dict[tuple[str, str], DatabaseInfo] = {}
+        """Values set during the current command and not yet written to the datastore."""
 
-        return DatabaseInfo(*result[0])
+    def _key(self, database: Database) -> tuple[str, str]:
+        """Key of a database in the identity map."""
+        return database.name, database.platform.name
+
+    def get(self, database: Database) -> DatabaseInfo | None:
+        """Get the saved values of a database, loaded once per command and shared by all instances
+        of the same database.
+        """
+        key = self._key(database)
+
+        if key not in self._identity_map:
+            keys = [column for column in self._columns if column != "id"]
+            result = self.database.query(
+                f"""
+                SELECT {", ".join(keys)} FROM {self.name}
+                WHERE name = {database.name!r}
+                    AND platform = {database.platform.name!r}
+                LIMIT 1
+                """,
+                nocache=True,
+            )
+            self._identity_map[key] = DatabaseInfo(**dict(zip(keys, result[0], strict=True))) if result else None
+
+        return self._identity_map[key]
 
     def set(self, database: Database, arguments: str | None = None):
-        """Save values for a database."""
-        values = {
-            "name": f"{database.name!r}",
-            "platform": f"{database.platform.name!r}",
-            "virtualenv": f"{database.venv.name!r}"
+        """Save values for a database. Changes are written to the datastore in a single query
+        when calling `flush`, at the latest once the current command is done.
+        """
+        info = DatabaseInfo(
+            name=database.name,
+            platform=database.platform.name,
+            virtualenv=database.venv.name
             if isinstance(database, LocalDatabase) and not database.venv._global
-            else "NULL",
-            "arguments": f"{arguments!r}" if arguments else "NULL",
-            "whitelisted": str(not isinstance(database, LocalDatabase) or database._whitelisted),
-            "repository": f"{database.repository.full_name!r}" if database.repository else "NULL",
-            "branch": f"{database.branch.name!r}" if database.branch is not None and database.branch.name else "NULL",
-            "worktree": f"{database.worktree!r}"
-            if isinstance(database, LocalDatabase) and database.worktree
-            else "NULL",
-            "url": f"{database.url!r}" if database.url else "NULL",
-        }
+            else None,
+            arguments=arguments or None,
+            whitelisted=not isinstance(database, LocalDatabase) or database._whitelisted,
+            repository=database.repository.full_name if database.repository else None,
+            branch=database.branch.name if database.branch is not None and database.branch.name else None,
+            worktree=database.worktree if isinstance(database, LocalDatabase) and database.worktree else None,
+            url=database.url or None,
+        )
+        key = self._key(database)
+
+        if key in self._dirty or self.get(database) != info:
+            self._identity_map[key] = self._dirty[key] = info
 
+    def flush(self):
+        """Write values set since the last flush to the datastore."""
+        if not self._dirty:
+            return
+
+        def literal(value: str | bool | None) -> str:
+            return "NULL" if value is None else str(value) if isinstance(value, bool) else repr(value)
+
+        keys = [key for key in self._columns if key != "id"]
+        values = ", ".join(
+            f"({', '.join(literal(getattr(info, key)) for key in keys)})" for info in self._dirty.values()
+        )
         self.database.query(
             f"""
-            INSERT INTO {self.name} ({", ".join(values.keys())})
-            VALUES ({", ".join(values.values())})
+            INSERT INTO {self.name} ({", ".join(keys)})
+            VALUES {values}
             ON CONFLICT (name, platform) DO
-                UPDATE SET {", ".join(f"{key} = {value}" for key, value in values.items())}
+                UPDATE SET {", ".join(f"{key} = EXCLUDED.{key}" for key in keys)}
             """
         )
+        self._dirty.clear()
+
+    def invalidate(self):
+        """Write pending changes and forget loaded values, for them to be loaded again from the datastore."""
+        self.flush()
+        self._identity_map.clear()
+
+    def delete(self, *databases: Database):
+        """Delete the saved values of databases in a single query."""
+        names = {database.name for database in databases}
+
+        if not names:
+            return
+
+        for key in [key for key in self._identity_map.keys() | self._dirty.keys() if key[0] in names]:
+            self._identity_map.pop(key, None)
+            self._dirty.pop(key, None)
 
-    def delete(self, database: Database):
-        """Delete the saved values of a database."""
         self.database.query(
             f"""
             DELETE FROM {self.name}
-            WHERE name = {database.name!r}
+            WHERE name IN ({join([repr(name) for name in sorted(names)])})
             """
         )
@@ -0,0 +1,141 @@
+from dataclasses import astuple, dataclass
+from datetime import datetime
+
+from odev.common.postgres import PostgresTable
+from odev.common.store.tables.catalogue import DATABASE_WRITES
+from odev.common.string import join
+
+
+@dataclass
+class DatabaseFacts:
+    """A class for storing metadata of a local database."""
+
+    odoo: bool = False
+    """Whether the database is an Odoo database."""
+
+    version: str | None = None
+    """The version of the `base` module installed in the database."""
+
+    edition: str | None = None
+    """The edition of Odoo installed in the database, "community" or "enterprise"."""
+
+    uuid: str | None = None
+    """The unique identifier of the database."""
+
+    neutralized: bool = False
+    """Whether the database is neutralized."""
+
+    expiration_date: str | None = None
+    """The raw expiration date of the database."""
+
+
+class FactStore(PostgresTable):
+    """A cache of metadata of local databases persisted across runs of odev. Stored facts are valid as long
+    as no row was written to their database since they were read, which is checked from `pg_stat_database`
+    without connecting to the database itself. Facts are read from the datastore at most once per command.
+    """
+
+    name = "facts"
+
+    _columns = {
+        "oid": "BIGINT PRIMARY KEY",
+        "name": "VARCHAR NOT NULL",
+        "writes": "BIGINT NOT NULL DEFAULT 0",
+        "stats_reset": "TIMESTAMPTZ",
+        "odoo": "BOOLEAN NOT NULL DEFAULT FALSE",
+        "version": "VARCHAR",
+        "edition": "VARCHAR",
+        "uuid": "VARCHAR",
+        "neutralized": "BOOLEAN NOT NULL DEFAULT FALSE",
+        "expiration_date": "VARCHAR",
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._loaded: dict[str, DatabaseFacts] = {}
+        """Facts already validated during the current command, by database name."""
+
+        self._observed: dict[str, tuple[int, int, datetime | None]] = {}
+        """Oid, number of rows written and date of the last reset of statistics of databases
+        whose facts were missing or outdated, as observed before inspecting them.
+        """
+
+    def get(self, name: str) -> DatabaseFacts | None:
+        """Get the facts about a database if they are still valid.
+
+        :param name: The name of the database.
+        :return: The facts about the database, or `None` if they must be read from the database again.
+        """
+        if name not in self._loaded:
+            result = self.database.query(
+                f"""
+                SELECT d.oid, {DATABASE_WRITES}, s.stats_reset,
+                    f.writes = {DATABASE_WRITES} AND f.stats_reset IS NOT DISTINCT FROM s.stats_reset,
+                    f.odoo, f.version, f.edition, f.uuid, f.neutralized, f.expiration_date
+                FROM pg_database d
+                LEFT JOIN pg_stat_database s ON s.datid = d.oid
+                LEFT JOIN {self.name} f ON f.oid = d.oid::bigint
+                WHERE d.datname = {name!r}
+                LIMIT 1
+                """,
+                nocache=True,
+            )
+
+            if not result:
+                self._loaded[name] = DatabaseFacts()
+            elif not result[0][3]:
+                self._observed[name] = result[0][:3]
+                return None
+            else:
+                self._loaded[name] = DatabaseFacts(*result[0][4:])
+
+        return self._loaded[name]
+
+    def set(self, name: str, facts: DatabaseFacts):
+        """Save the facts read from a database, valid until rows are written to it.
+
+        :param name: The name of the database.
+        :param facts: The facts read from the database.
+        """
+        self._loaded[name] = facts
+
+        if name not in self._observed:
+            return
+
+        oid, writes, stats_reset = self._observed.pop(name)
+        values = [oid, name, writes, stats_reset.isoformat() if stats_reset else None, *astuple(facts)]
+        keys = list(self._columns)
+        self.database.query(
+            f"""
+            INSERT INTO {self.name} ({", ".join(keys)})
+            VALUES ({", ".join("NULL" if value is None else repr(value) for value in values)})
+            ON CONFLICT (oid) DO
+                UPDATE SET {", ".join(f"{key} = EXCLUDED.{key}" for key in keys)}
+            """
+        )
+
+    def invalidate(self, name: str | None = None):
+        """Forget facts validated during the current command, for them to be validated again.
+
+        :param name: The name of the database to forget facts about, all databases if omitted.
+        """
+        if name is None:
+            self._loaded.clear()
+            self._observed.clear()
+        else:
+            self._loaded.pop(name, None)
+            self._observed.pop(name, None)
+
+    def delete(self, *names: str):
+        """Delete the facts about databases after odev changed them.
+
+        :param names: The names of the databases.
+        """
+        if not names:
+            return
+
+        for name in names:
+            self.invalidate(name)
+
+        self.database.query(f"DELETE FROM {self.name} WHERE name IN ({join([repr(name) for name in names])})")
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from odev.common.postgres import PostgresTable
+from odev.common.string import join
+
+
+@dataclass
+class Snapshot:
+    """A class for storing information about a snapshot of a local database."""
+
+    database: str
+    """The name of the database the snapshot was taken from."""
+
+    name: str
+    """The name of the snapshot, unique per database."""
+
+    template: str
+    """The name of the PostgreSQL template database holding the content of the snapshot."""
+
+    filestore: str | None
+    """The path to the copy of the filestore of the database, if it had one."""
+
+    date: datetime
+    """The date the snapshot was taken."""
+
+
+class SnapshotStore(PostgresTable):
+    """A class for managing snapshots of local databases, taken as PostgreSQL templates
+    from which databases can be recreated without restoring a dump.
+    """
+
+    name = "snapshots"
+
+    _columns = {
+        "database": "VARCHAR NOT NULL",
+        "name": "VARCHAR NOT NULL",
+        "template": "VARCHAR NOT NULL",
+        "filestore": "VARCHAR",
+        "date": "TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP",
+    }
+    _constraints = {"snapshots_unique_database_name": "UNIQUE(database, name)"}
+
+    def all(self, database: str) -> list[Snapshot]:
+        """Get the snapshots of a database.
+
+        :param database: The name of the database.
+        :return: The snapshots of the database, the most recent first.
+        """
+        result = self.database.query(
+            f"""
+            SELECT database, name, template, filestore, date
+            FROM {self.name}
+            WHERE database = {database!r}
+            ORDER BY date DESC
+            """,
+            nocache=True,
+        )
+        return [Snapshot(*row) for row in result or []]
+
+    def get(self, database: str, name: str | None = None) -> Snapshot | None:
+        """Get a snapshot of a database.
+
+        :param database: The name of the database.
+        :param name: The name of the snapshot, the most recent snapshot if omitted.
+        :return: The snapshot, or `None` if it does not exist.
+        """
+        return next((snapshot for snapshot in self.all(database) if name is None or snapshot.name == name), None)
+
+    def set(self, snapshot: Snapshot):
+        """Save a snapshot of a database, replacing any existing snapshot with the same name.
+
+        :param snapshot: The snapshot to save.
+        """
+        filestore = "NULL" if snapshot.filestore is None else repr(snapshot.filestore)
+        self.database.query(
+            f"""
+            INSERT INTO {self.name} (database, name, template, filestore, date)
+            VALUES ({snapshot.database!r}, {snapshot.name!r}, {snapshot.template!r}, {filestore},
+                {snapshot.date.isoformat()!r})
+            ON CONFLICT (database, name) DO
+                UPDATE SET template = EXCLUDED.template, filestore = EXCLUDED.filestore, date = EXCLUDED.date
+            """
+        )
+
+    def delete(self, database: str, *names: str):
+        """Delete snapshots of a database after their templates were dropped.
+
+        :param database: The name of the database.
+        :param names: The names of the snapshots.
+        """
+        if not names:
+            return
+
+        self.database.query(
+            f"""
+            DELETE FROM {self.name}
+            WHERE database = {database!r}
+                AND name IN ({join([repr(name) for name in names])})
+            """
+        )
+
+    def rename(self, database: str, name: str):
+        """Move the snapshots of a database to its new name after it was renamed.
+
+        :param database: The previous name of the database.
+        :param name: The new name of the database.
+        """
+        self.database.query(f"UPDATE {self.name} SET database = {name!r} WHERE database = {database!r}")
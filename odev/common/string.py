@@ -25,6 +25,9 @@ __all__ = [
 
 BYTES_UNIT_FACTOR = 1024
 
+ANSI_COLORS_REGEX = re.compile(r"\x1b[^m]*m")
+"""Regular expression matching ANSI color codes."""
+
 
 def normalize_indent(text: str) -> str:
     """Normalize the indentation of a string.
@@ -194,7 +197,7 @@ def strip_ansi_colors(text: str) -> str:
     """Strip ANSI colors from a text, leave other control characters and escape codes.
     :param text: The text to strip color codes from.
     """
-    return re.sub(r"\x1b[^m]*m", "", text)
+    return ANSI_COLORS_REGEX.sub("", text)
 
 
 def join(parts: Sequence[str], last_delimiter: str | None = None) -> str:
@@ -0,0 +1,88 @@
+# Serve scripts sent over a Unix socket inside of a warm odoo-bin shell environment
+
+import contextlib
+import io
+import json
+import os
+import socket
+import traceback
+
+
+def shell_server_execute(env, namespace, script):
+    """Execute a script in a fresh transaction and capture its output."""
+    output = io.StringIO()
+    error = None
+    env.cr.rollback()
+
+    try:
+        with contextlib.redirect_stdout(output):
+            exec(compile(script, "<odev>", "exec"), dict(namespace))  # noqa: S102
+    except Exception:  # noqa: BLE001
+        error = traceback.format_exc()
+    finally:
+        env.cr.rollback()
+
+    return {"output": output.getvalue(), "error": error}
+
+
+def shell_server_registry_changed(env):
+    """Check whether another process signaled changes to the registry of the database."""
+    check_signaling = getattr(env.registry, "check_signaling", None)
+
+    if check_signaling is None:
+        return False
+
+    try:
+        return check_signaling() is not env.registry
+    except Exception:  # noqa: BLE001
+        return False
+
+
+def shell_server(env, socket_path, fingerprint, idle_timeout):
+    """Accept requests on a Unix socket until idle for too long or asked to stop."""
+    namespace = dict(globals())
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen()
+    server.settimeout(idle_timeout)
+    running = True
+
+    try:
+        while running:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:  # noqa: UP041 - odoo-bin may run on python versions older than 3.10
+                break
+
+            with connection:
+                connection.settimeout(None)
+
+                try:
+                    request = json.loads(connection.makefile("rb").readline() or b"{}")
+                    action = request.get("action")
+                except (OSError, ValueError, AttributeError):
+                    request, action = {}, None
+
+                if action == "run" and shell_server_registry_changed(env):
+                    reply, running = {"restart": True}, False
+                elif action == "run":
+                    reply = shell_server_execute(env, namespace, request.get("script", ""))
+                elif action == "ping":
+                    reply = {"fingerprint": fingerprint, "pid": os.getpid()}
+                elif action == "stop":
+                    reply, running = {"stopped": True}, False
+                else:
+                    reply = {"error": "Invalid request with action %r" % (action,)}
+
+                with contextlib.suppress(OSError):
+                    connection.sendall(json.dumps(reply).encode() + b"\n")
+    finally:
+        server.close()
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
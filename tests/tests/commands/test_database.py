@@ -1,5 +1,9 @@
+from pathlib import Path
+from unittest.mock import patch
+
 from odev.common.commands.odoobin import TEMPLATE_SUFFIX as ODOO_DB_TEMPLATE_SUFFIX
-from odev.common.config import Config
+from odev.common.config import Config, SnapshotsSection
+from odev.common.connectors import AsyncPostgresConnector, PostgresConnector
 from odev.common.connectors.git import GitConnector
 from odev.common.databases import LocalDatabase
 from odev.common.odoobin import OdoobinProcess
@@ -434,3 +438,251 @@ class TestDatabaseCommands(OdevCommandTestCase):
         self.assertDatabaseNotExist(self.template_name)
         self.assertIn("You are about to delete the following databases:", stdout)
         self.assertRegex(stdout, r"Deleted \d+ databases")
+
+
+class TestDatabaseCommandsTestShards(OdevCommandTestCase):
+    """Tests should be split into shards, each running on its own database."""
+
+    def command(self, *arguments: str):
+        """Build an instance of the test command on a database that does not exist."""
+        command_cls = self.odev.commands["test"]
+        return command_cls(command_cls.parse_arguments(["--version", ODOO_DB_VERSION, *arguments]))
+
+    def test_01_split_tags(self):
+        """Inclusion tags should be distributed across shards and exclusion tags given to every shard."""
+        command = self.command("--jobs", "2", "--tags", "a,b,-c,d", f"{self.run_name}-shards")
+        self.assertEqual(command.split_test_shards(), [([], ["a", "d", "-c"]), ([], ["b", "-c"])])
+
+        command = self.command("--jobs", "4", "--tags", "a,-c", f"{self.run_name}-shards")
+        self.assertEqual(command.split_test_shards(), [([], ["a", "-c"])])
+
+        command = self.command("--jobs", "2", "--tags", "-c", f"{self.run_name}-shards")
+        self.assertEqual(command.split_test_shards(), [([], ["-c"])])
+
+    def test_02_split_modules(self):
+        """Modules should be distributed across shards when no tags are given, each shard testing its modules."""
+        command = self.command("--jobs", "2", "--init", "base,web,mail", f"{self.run_name}-shards")
+        self.assertEqual(
+            command.split_test_shards(),
+            [(["base", "mail"], ["/base", "/mail"]), (["web"], ["/web"])],
+        )
+
+    def test_03_install_test_modules(self):
+        """Modules should be installed once with the selected tags, tests run after install being left to shards."""
+        command = self.command("--jobs", "2", "--tags", "a,-c", "--init", "base,web", f"{self.run_name}-shards")
+
+        with patch.object(command, "prepare_test_process") as prepare_test_process:
+            command.install_test_modules()
+
+        prepare_test_process.return_value.run.assert_called_once_with(
+            args=["--stop-after-init", "--test-enable", "--test-tags", "a,-c,-post_install", "--init", "base,web"],
+            progress=command.odoobin_progress,
+        )
+
+    def test_04_shard_commands(self):
+        """Each shard should run on its own database, whatever database is given in additional arguments."""
+        command = self.command(
+            "--jobs", "2", "--tags", "a,b,-c", f"{self.run_name}-shards", "-d", "other", "--database=other", "-dother"
+        )
+        databases = [LocalDatabase(f"{self.run_name}-shards-{index}") for index in (1, 2)]
+        shards = command.split_test_shards()
+
+        with patch.object(command, "_free_port", return_value=8069):
+            commands = [
+                command.prepare_shard_command(database, modules, tags)
+                for database, (modules, tags) in zip(databases, shards, strict=True)
+            ]
+
+        for database, shard_command, tags in zip(databases, commands, ["a,-c", "b,-c"], strict=True):
+            self.assertIn(f" --database {database.name} ", shard_command)
+            self.assertIn(f" --test-tags {tags} ", shard_command)
+            self.assertIn(" --http-port 8069", shard_command)
+            self.assertNotIn("other", shard_command)
+
+    def test_05_shard_commands_quoted(self):
+        """Additional arguments should reach odoo-bin as given, without being interpreted by the shell."""
+        command = self.command(
+            "--jobs", "2", "--tags", "a,b", f"{self.run_name}-shards", "--log-handler", "odoo:INFO; x"
+        )
+        database = LocalDatabase(f"{self.run_name}-shards-1")
+
+        with patch.object(command, "_free_port", return_value=8069):
+            shard_command = command.prepare_shard_command(database, [], ["a"])
+
+        self.assertIn(" --log-handler 'odoo:INFO; x' ", f"{shard_command} ")
+
+
+class TestDatabaseCommandsDeleteMany(OdevCommandTestCase):
+    """Deleting multiple databases should drop them concurrently and remove their resources at once."""
+
+    def setUp(self):
+        super().setUp()
+        self.databases = [LocalDatabase(f"{self.run_name}-many-{index}") for index in range(3)]
+
+        for database in self.databases:
+            with PostgresConnector() as psql:
+                psql.create_database(database.name)
+
+            self.addCleanup(self.drop_database, database.name)
+            (database.filestore_path / "ab").mkdir(parents=True)
+            (database.filestore_path / "ab" / "file").write_bytes(b"odev")
+            self.odev.store.databases.set(database)
+
+        self.odev.store.databases.flush()
+
+    def drop_database(self, name: str):
+        with PostgresConnector() as psql:
+            psql.drop_database(name)
+
+    def test_01_delete_many(self):
+        """Command `odev delete` should drop databases, trash their filestores and forget them in a single query."""
+        with (
+            self.patch(self.odev.console, "confirm", return_value=True),
+            patch.object(self.odev.store, "query", wraps=self.odev.store.query) as query,
+        ):
+            stdout, _ = self.dispatch_command(
+                "delete", "--include-whitelisted", "--expression", f"^{self.run_name}-many-"
+            )
+
+        self.assertIn("Deleted 3 databases", stdout)
+        deletes = [call.args[0].split()[:3] for call in query.call_args_list]
+        self.assertEqual(deletes.count(["DELETE", "FROM", "databases"]), 1)
+        self.odev.store.databases.invalidate()
+
+        for database in self.databases:
+            with PostgresConnector() as psql:
+                self.assertFalse(psql.database_exists(database.name))
+
+            self.assertFalse(database.filestore_path.exists())
+            self.assertIsNone(self.odev.store.databases.get(database))
+
+    def test_02_delete_many_failure(self):
+        """Databases that could not be dropped should keep their filestore and configuration,
+        without preventing other databases from being deleted.
+        """
+        failing = self.databases[0]
+        drop_database = AsyncPostgresConnector.drop_database
+
+        async def fail_drop_database(psql: AsyncPostgresConnector, database: str) -> bool:
+            if database == failing.name:
+                raise RuntimeError("Drop failed")
+
+            return await drop_database(psql, database)
+
+        with (
+            self.patch(self.odev.console, "confirm", return_value=True),
+            patch.object(AsyncPostgresConnector, "drop_database", autospec=True, side_effect=fail_drop_database),
+        ):
+            stdout, _ = self.dispatch_command(
+                "delete", "--include-whitelisted", "--expression", f"^{self.run_name}-many-"
+            )
+
+        self.assertIn("Deleted 2 databases", stdout)
+        self.odev.store.databases.invalidate()
+
+        with PostgresConnector() as psql, psql.nocache():
+            self.assertTrue(psql.database_exists(failing.name))
+
+        self.assertTrue((failing.filestore_path / "ab" / "file").exists())
+        self.assertIsNotNone(self.odev.store.databases.get(failing))
+
+        for database in self.databases[1:]:
+            self.assertFalse(database.filestore_path.exists())
+            self.assertIsNone(self.odev.store.databases.get(database))
+
+
+class TestDatabaseCommandsSnapshot(OdevCommandTestCase):
+    """Snapshots should copy databases and their filestores, for databases to be rolled back to them."""
+
+    def setUp(self):
+        super().setUp()
+        self.database = LocalDatabase(f"{self.run_name}-snapshot")
+
+        with PostgresConnector() as psql:
+            psql.create_database(self.database.name)
+
+        with PostgresConnector(self.database.name) as psql:
+            psql.query("CREATE TABLE snapshot_data (value VARCHAR)")
+            psql.query("INSERT INTO snapshot_data VALUES ('snapshot')")
+            psql.query(
+                "CREATE TABLE ir_module_module (name VARCHAR, latest_version VARCHAR, license VARCHAR, state VARCHAR)"
+            )
+            psql.query("INSERT INTO ir_module_module VALUES ('base', '17.0.1.3', 'LGPL-3', 'installed')")
+            psql.query("CREATE TABLE ir_config_parameter (key VARCHAR, value VARCHAR)")
+
+        (self.database.filestore_path / "ab").mkdir(parents=True)
+        (self.database.filestore_path / "ab" / "file").write_bytes(b"snapshot")
+        self.addCleanup(self.drop_database, self.database)
+
+    def drop_database(self, database: LocalDatabase):
+        database.drop()
+
+    def test_01_snapshot_rollback(self):
+        """Command `odev rollback` should restore the database and its filestore as they were
+        when `odev snapshot` was run.
+        """
+        stdout, _ = self.dispatch_command("snapshot", self.database.name, "first")
+        self.assertIn(f"Took snapshot 'first' of database {self.database.name!r}", stdout)
+
+        snapshot = self.odev.store.snapshots.get(self.database.name)
+        self.assertEqual(snapshot.name, "first")
+
+        with PostgresConnector() as psql, psql.nocache():
+            self.assertTrue(psql.database_exists(snapshot.template))
+
+        with PostgresConnector(self.database.name) as psql:
+            psql.query("UPDATE snapshot_data SET value = 'changed'")
+
+        (self.database.filestore_path / "ab" / "file").write_bytes(b"changed")
+
+        with self.patch(self.odev.console, "confirm", return_value=True):
+            stdout, _ = self.dispatch_command("rollback", self.database.name)
+
+        self.assertIn(f"Rolled back database {self.database.name!r} to snapshot 'first'", stdout)
+        self.assertEqual((self.database.filestore_path / "ab" / "file").read_bytes(), b"snapshot")
+
+        with PostgresConnector(self.database.name) as psql, psql.nocache():
+            self.assertEqual(psql.query("SELECT value FROM snapshot_data"), [("snapshot",)])
+
+    def test_02_retention(self):
+        """The oldest snapshots exceeding the retention should be removed."""
+        with self.patch_property(SnapshotsSection, "retention", 2):
+            for name in ("first", "second", "third"):
+                self.dispatch_command("snapshot", self.database.name, name)
+
+        snapshots = self.odev.store.snapshots.all(self.database.name)
+        self.assertEqual([snapshot.name for snapshot in snapshots], ["third", "second"])
+
+    def test_03_delete(self):
+        """Snapshots should be dropped along with their database unless kept."""
+        self.dispatch_command("snapshot", self.database.name, "first")
+        snapshot = self.odev.store.snapshots.get(self.database.name)
+
+        with self.patch(self.odev.console, "confirm", return_value=True):
+            self.dispatch_command("delete", "--keep", "snapshots", self.database.name)
+
+        self.assertEqual(self.odev.store.snapshots.get(self.database.name), snapshot)
+        stdout, _ = self.dispatch_command("snapshot", "--list", self.database.name)
+        self.assertRegex(stdout, r"\s+first\s+")
+
+        with self.patch(self.odev.console, "confirm", return_value=True):
+            self.dispatch_command("rollback", self.database.name)
+
+        with self.patch(self.odev.console, "confirm", return_value=True):
+            self.dispatch_command("delete", self.database.name)
+
+        self.assertIsNone(self.odev.store.snapshots.get(self.database.name))
+        self.assertFalse(Path(snapshot.filestore).exists())
+
+        with PostgresConnector() as psql, psql.nocache():
+            self.assertFalse(psql.database_exists(snapshot.template))
+
+    def test_04_rename(self):
+        """Snapshots should follow their database when it is renamed."""
+        self.dispatch_command("snapshot", self.database.name, "first")
+        renamed = LocalDatabase(f"{self.database.name}-renamed")
+        self.addCleanup(self.drop_database, renamed)
+        self.dispatch_command("rename", self.database.name, renamed.name)
+
+        self.assertIsNone(self.odev.store.snapshots.get(self.database.name))
+        self.assertEqual(self.odev.store.snapshots.get(renamed.name).name, "first")
@@ -1,7 +1,10 @@
+import re
 import shutil
 from pathlib import Path
+from typing import cast
 
 from odev._version import __version__
+from odev.common.odoobin_logs import LogCapture, parse_log_line
 from odev.common.python import PythonEnv
 
 from tests.fixtures import OdevCommandTestCase
@@ -120,6 +123,50 @@ class TestCommandUtilitiesHistory(OdevCommandTestCase):
         self.assertIn("No history available for all commands", stderr)
 
 
+class TestCommandUtilitiesLogs(OdevCommandTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.logs_path = cls.run_path / "logs"
+        werkzeug = "2024-05-03 10:12:01,003 42 INFO odev-logs werkzeug: 127.0.0.1 - - [03/May/2024 10:12:01]"
+
+        with LogCapture.create(cls.logs_path, "odev-logs", "run") as capture:
+            for line in [
+                "2024-05-03 10:12:01,001 42 INFO odev-logs odoo.modules.loading: loading 1 modules...",
+                "2024-05-03 10:12:01,002 42 WARNING odev-logs odoo.addons.base.models.ir_ui_view: Invalid view",
+                f'{werkzeug} "GET /web?debug=1 HTTP/1.1" 200 - 120 0.500 0.900',
+                f'{werkzeug} "POST /web/dataset/call_kw HTTP/1.1" 200 - 4 0.010 0.020',
+            ]:
+                capture.record(cast(re.Match, parse_log_line(line)))
+
+    def dispatch_command(self, *args, **kwargs):
+        with self.patch_property(type(self.odev), "logs_path", value=self.logs_path):
+            return super().dispatch_command(*args, **kwargs)
+
+    def test_01_list(self):
+        """Run the command with the `--list` flag, list captured runs."""
+        stdout, _ = self.dispatch_command("logs", "--list")
+        self.assertIn("odev-logs", stdout)
+
+    def test_02_filter_level(self):
+        """Run the command with a level filter, show matching records only."""
+        stdout, _ = self.dispatch_command("logs", "--level", "warning")
+        self.assertIn("Invalid view", stdout)
+        self.assertNotIn("loading 1 modules", stdout)
+
+    def test_03_slow_requests(self):
+        """Run the command with a duration threshold, show slow HTTP requests only."""
+        stdout, _ = self.dispatch_command("logs", "--slow", "1000")
+        self.assertIn("1.400", stdout)
+        self.assertNotIn("0.030", stdout)
+
+    def test_04_top_queries(self):
+        """Run the command to show endpoints executing the most queries, without query strings."""
+        stdout, _ = self.dispatch_command("logs", "--top-queries", "1")
+        self.assertRegex(stdout, r"GET\s+/web\s+1\s+120\.0")
+        self.assertNotIn("call_kw", stdout)
+
+
 class TestCommandUtilitiesList(OdevCommandTestCase):
     def test_01_list_all(self):
         """Run the command, list all existing databases."""
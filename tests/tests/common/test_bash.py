@@ -60,3 +60,23 @@ class TestCommonBash(OdevTestCase):
         start = monotonic()
         bash.detached("sleep 1")
         self.assertLess(monotonic() - start, 1)
+
+    def test_09_stream_parallel(self):
+        """Commands streamed in parallel should yield all their lines tagged with the index of their command."""
+        lines = list(bash.stream_parallel(["echo a; sleep 0.2; echo b", "echo c"]))
+        self.assertCountEqual(lines, [(0, "a"), (0, "b"), (1, "c")])
+        self.assertLess(lines.index((1, "c")), lines.index((0, "b")))
+
+    def test_10_stream_parallel_error(self):
+        """Commands streamed in parallel should raise once all are done if any of them failed."""
+        lines = []
+
+        with self.assertRaises(CalledProcessError):
+            lines.extend(bash.stream_parallel(["exit 1", "sleep 0.2; echo done"]))
+
+        self.assertEqual(lines, [(1, "done")])
+
+    def test_11_stream_parallel_partial_lines(self):
+        """Lines and UTF-8 sequences split across reads should be reassembled."""
+        lines = list(bash.stream_parallel([r"printf 'caf\303'; sleep 0.2; printf '\251\nlast'"]))
+        self.assertEqual(lines, [(0, "café"), (0, "last")])
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+from odev.common.connectors import PostgresConnector
+from odev.common.store.tables.catalogue import CatalogueStore
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonCatalogue(OdevTestCase):
+    """Local Odoo databases should be listed without connecting to each database."""
+
+    def setUp(self):
+        super().setUp()
+        self.catalogue = self.odev.store.catalogue
+        self.odoo_name = f"{self.run_name}-catalogue-odoo"
+        self.bare_name = f"{self.run_name}-catalogue-bare"
+        self.renamed_name = f"{self.run_name}-catalogue-renamed"
+
+        with PostgresConnector() as psql:
+            for name in (self.odoo_name, self.bare_name):
+                psql.create_database(name)
+                self.addCleanup(self.drop_database, name)
+
+            self.addCleanup(self.drop_database, self.renamed_name)
+
+        with PostgresConnector(self.odoo_name) as psql:
+            psql.query("CREATE TABLE ir_module_module (id SERIAL PRIMARY KEY)")
+
+    def drop_database(self, name: str):
+        with PostgresConnector() as psql:
+            psql.drop_database(name)
+
+    def refresh(self) -> tuple[list[str], list[str]]:
+        """Refresh the catalogue, return the names of Odoo databases created for the test
+        and the names of the databases connected to.
+        """
+        with patch.object(CatalogueStore, "_is_odoo", autospec=True, side_effect=CatalogueStore._is_odoo) as is_odoo:
+            names = self.catalogue.refresh()
+
+        prefix = f"{self.run_name}-catalogue"
+        inspected = [call.args[1] for call in is_odoo.call_args_list if call.args[1].startswith(prefix)]
+        return [name for name in names if name.startswith(prefix)], inspected
+
+    def test_01_refresh(self):
+        """New databases should be inspected once, then listed from the catalogue."""
+        names, inspected = self.refresh()
+        self.assertEqual(names, [self.odoo_name])
+        self.assertEqual(sorted(inspected), sorted([self.odoo_name, self.bare_name]))
+        self.assertIn(f"{self.odoo_name}\n", self.catalogue.cache_path.read_text())
+        self.assertEqual(self.catalogue.cache_path.name, "databases.odev-test")
+
+        names, inspected = self.refresh()
+        self.assertEqual(names, [self.odoo_name])
+        self.assertNotIn(self.odoo_name, inspected)
+
+    def test_02_rename_drop(self):
+        """Renamed and dropped databases should be reflected in the catalogue."""
+        self.refresh()
+
+        with PostgresConnector() as psql:
+            psql.query(f'ALTER DATABASE "{self.odoo_name}" RENAME TO "{self.renamed_name}"')
+
+        names, inspected = self.refresh()
+        self.assertEqual(names, [self.renamed_name])
+        self.assertNotIn(self.renamed_name, inspected)
+
+        self.drop_database(self.renamed_name)
+        names, _ = self.refresh()
+        self.assertEqual(names, [])
+        self.assertNotIn(self.renamed_name, self.catalogue.cache_path.read_text())
+
+    def test_03_record_discard(self):
+        """Databases created or deleted by odev should be recorded without being inspected."""
+        self.catalogue.record(self.bare_name)
+        self.assertIn(f"{self.bare_name}\n", self.catalogue.cache_path.read_text())
+        self.catalogue.discard(self.bare_name)
+        self.assertNotIn(self.bare_name, self.catalogue.cache_path.read_text())
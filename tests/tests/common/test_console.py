@@ -0,0 +1,41 @@
+from io import StringIO
+
+from odev.common.console import Console
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonConsole(OdevTestCase):
+    """Lines printed in batches should be written by the console that queued them."""
+
+    def test_01_batch_per_console(self):
+        """Lines queued by a console should not be printed by another one."""
+        first, second = Console(file=StringIO()), Console(file=StringIO())
+        first.print_batched("first line")
+        second.print("second line")
+        self.assertEqual(second.file.getvalue(), "second line\n")  # type: ignore [attr-defined]
+
+        first.flush_batch()
+        self.assertEqual(first.file.getvalue(), "first line\n")  # type: ignore [attr-defined]
+
+    def test_02_batch_invalid_markup(self):
+        """Lines with invalid markup should be printed as plain text along with the other lines of the batch."""
+        console = Console(file=StringIO())
+
+        for line in ["[bold]first line[/bold]", "[/invalid] line", "last line"]:
+            console.print_batched(line)
+
+        console.flush_batch()
+        output = console.file.getvalue()  # type: ignore [attr-defined]
+        self.assertEqual(output, "first line\n[/invalid] line\nlast line\n")
+
+    def test_03_batch_unclosed_markup(self):
+        """Styles left open by a line should not apply to the other lines of the batch."""
+        console = Console(file=StringIO(), force_terminal=True, color_system="standard")
+
+        for line in ["x = list[int] and [red]", "next"]:
+            console.print_batched(line)
+
+        console.flush_batch()
+        output = console.file.getvalue()  # type: ignore [attr-defined]
+        self.assertTrue(output.endswith("\nnext\n"), output)
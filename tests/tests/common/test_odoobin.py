@@ -0,0 +1,45 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from odev.common.odoobin import OdoobinProcess, addons_index
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonOdoobin(OdevTestCase):
+    """Addons paths should be indexed and cached until their content changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.addons_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.addons_path, ignore_errors=True)
+
+    def create_module(self, name: str, manifest: str = "__manifest__.py") -> Path:
+        """Create an empty module in the temporary addons path."""
+        path = self.addons_path / name
+        path.mkdir()
+        (path / manifest).write_text("{}")
+        (path / "__init__.py").touch()
+        return path
+
+    def test_01_addons_index(self):
+        """Modules with a manifest should be indexed by name."""
+        self.create_module("module_a")
+        self.create_module("module_b", "__openerp__.py")
+        (self.addons_path / "not_a_module").mkdir()
+        index = addons_index(self.addons_path)
+        self.assertEqual(set(index), {"module_a", "module_b"})
+        self.assertEqual(index["module_a"], self.addons_path / "module_a")
+        self.assertTrue(OdoobinProcess.check_addons_path(self.addons_path))
+
+    def test_02_addons_index_invalidation(self):
+        """Adding a module should invalidate the cached index."""
+        self.assertFalse(addons_index(self.addons_path))
+        self.assertFalse(OdoobinProcess.check_addons_path(self.addons_path))
+        self.create_module("module_a")
+        self.assertEqual(set(addons_index(self.addons_path)), {"module_a"})
+
+    def test_03_addons_index_missing_path(self):
+        """Missing addons paths should have an empty index."""
+        self.assertFalse(addons_index(self.addons_path / "missing"))
@@ -0,0 +1,72 @@
+import re
+from typing import cast
+
+from odev.common.odoobin_logs import Histogram, RequestProfiler, format_log_line, parse_log_line
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonOdoobinLogs(OdevTestCase):
+    """Lines of odoo-bin output should be parsed and rendered."""
+
+    def test_01_parse_record(self):
+        """A log record should be parsed into its components, ignoring ANSI colors."""
+        match = parse_log_line(
+            "2024-05-03 10:12:01,123 4242 \x1b[1;32m\x1b[1;49mINFO\x1b[0m odev odoo.addons.base.models.ir_ui_view: Hi"
+        )
+        self.assertIsNotNone(match)
+        self.assertEqual(match.group("level"), "INFO")
+        self.assertEqual(match.group("database"), "odev")
+        self.assertEqual(match.group("module"), "base")
+        self.assertEqual(match.group("description"), "Hi")
+
+    def test_02_parse_not_a_record(self):
+        """Lines not starting with a date should not be parsed as log records."""
+        self.assertIsNone(parse_log_line('  File "/odoo/odoo/models.py", line 42, in write'))
+        self.assertIsNone(parse_log_line("2024"))
+        self.assertIsNone(parse_log_line(""))
+
+    def test_03_format_werkzeug(self):
+        """HTTP requests should be rendered with their total duration."""
+        match = parse_log_line(
+            "2024-05-03 10:12:01,123 4242 INFO odev werkzeug: 127.0.0.1 - - [03/May/2024 10:12:01] "
+            '"GET /web HTTP/1.1" 200 - 12 0.100 0.250'
+        )
+        self.assertIsNotNone(match)
+        formatted = format_log_line(match)
+        self.assertIn("GET /web", formatted)
+        self.assertIn("0.350", formatted)
+        self.assertIn("12 queries", formatted)
+
+    def test_04_histogram_percentiles(self):
+        """Percentiles of a histogram should be accurate within its precision."""
+        histogram = Histogram()
+
+        for value in range(1, 100_001):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 100_000)
+        self.assertEqual(histogram.max, 100_000)
+
+        for percentile in (50, 95, 99):
+            expected = percentile * 1000
+            self.assertAlmostEqual(histogram.percentile(percentile), expected, delta=expected / 2**Histogram.precision)
+
+    def test_05_request_profiler(self):
+        """HTTP requests should be aggregated by route, ignoring query strings and numeric identifiers."""
+        profiler = RequestProfiler()
+        prefix = "2024-05-03 10:12:01,123 4242 INFO odev werkzeug: 127.0.0.1 - - [03/May/2024 10:12:01]"
+
+        for line in [
+            f'{prefix} "GET /web/image/res.partner/3/avatar?unique=1 HTTP/1.1" 200 - 10 0.100 0.200',
+            f'{prefix} "GET /web/image/res.partner/7/avatar HTTP/1.1" 200 - 30 0.300 0.400',
+            "2024-05-03 10:12:01,123 4242 INFO odev odoo.modules.loading: Modules loaded.",
+        ]:
+            profiler.record(cast(re.Match, parse_log_line(line)))
+
+        summary = profiler.summary()
+        self.assertEqual(list(summary), ["GET /web/image/res.partner/:id/avatar"])
+        stats = summary["GET /web/image/res.partner/:id/avatar"]
+        self.assertEqual(stats["total"]["count"], 2)
+        self.assertAlmostEqual(stats["total"]["max"], 700, delta=1)
+        self.assertEqual(stats["queries"]["p99"], 30)
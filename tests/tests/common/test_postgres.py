@@ -0,0 +1,158 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+
+from psycopg2.errors import UndefinedTable
+
+from odev.common import concurrency
+from odev.common.connectors import AsyncPostgresConnector, PostgresConnector
+from odev.common.connectors.postgres import QueryProfiler
+from odev.common.signal_handling import signal_handler_exit
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonPostgresConnector(OdevTestCase):
+    """Queries should run in the calling thread and remain interruptible."""
+
+    def test_01_interrupt(self):
+        """Interrupting a running query should cancel it and propagate the interruption."""
+        timer = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT))
+        start = time.monotonic()
+
+        with self.assertRaises(KeyboardInterrupt), PostgresConnector() as psql:
+            timer.start()
+            psql.query("SELECT pg_sleep(10)", transaction=False)
+
+        timer.join()
+        self.assertLess(time.monotonic() - start, 5)
+
+        with PostgresConnector() as psql:
+            self.assertEqual(psql.query("SELECT 1 WHERE pg_sleep(0) IS NOT NULL", transaction=False), [(1,)])
+
+    def test_02_errors(self):
+        """Errors raised by PostgreSQL should be propagated with their original exception as the cause."""
+        with PostgresConnector() as psql, self.assertRaises(RuntimeError) as error:
+            psql.query("DELETE FROM odev_missing_table", transaction=False)
+
+        self.assertIsInstance(error.exception.__cause__, UndefinedTable)
+
+    def test_03_interrupt_exit(self):
+        """Exiting on interruption through the signal handlers of odev should cancel the running query
+        and roll back its transaction.
+        """
+        previous_handler = signal.signal(signal.SIGINT, signal_handler_exit)
+        self.addCleanup(signal.signal, signal.SIGINT, previous_handler)
+        timer = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT))
+        start = time.monotonic()
+
+        with self.assertRaises(SystemExit), PostgresConnector() as psql:
+            timer.start()
+            psql.query("SELECT pg_sleep(10)")
+
+        timer.join()
+        self.assertLess(time.monotonic() - start, 5)
+
+        with PostgresConnector() as psql:
+            self.assertFalse(
+                psql.query(
+                    "SELECT pid FROM pg_stat_activity WHERE query = 'SELECT pg_sleep(10)' AND state = 'active'",
+                    transaction=False,
+                )
+            )
+
+
+class TestCommonPostgresAsync(OdevTestCase):
+    """Queries should be awaitable from coroutines and overlap across connections."""
+
+    def test_01_query(self):
+        """Asynchronous queries should return the same results as synchronous ones."""
+
+        async def query() -> list[tuple] | bool:
+            async with AsyncPostgresConnector() as psql:
+                return await psql.query("SELECT datname FROM pg_database WHERE datname = 'postgres'", nocache=True)
+
+        self.assertEqual(asyncio.run(query()), [("postgres",)])
+
+    def test_02_cancel(self):
+        """Cancelling the task awaiting a query should cancel the query."""
+
+        async def query():
+            async with AsyncPostgresConnector() as psql:
+                await asyncio.wait_for(psql.query("SELECT pg_sleep(10)"), timeout=0.2)
+
+        start = time.monotonic()
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(query())
+
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_03_gather(self):
+        """Queries should run concurrently up to the limit, results being returned in order."""
+        running: list[int] = [0, 0]
+
+        async def query(value: int) -> int:
+            running[0] += 1
+            running[1] = max(running)
+
+            async with AsyncPostgresConnector() as psql:
+                result = await psql.query(f"SELECT {value} FROM pg_sleep(0.05)", nocache=True)
+
+            running[0] -= 1
+            return result[0][0]  # type: ignore [index]
+
+        start = time.monotonic()
+        self.assertEqual(concurrency.run((query(value) for value in range(8)), limit=4), list(range(8)))
+        self.assertEqual(running[1], 4)
+        self.assertLess(time.monotonic() - start, 0.05 * 8)
+
+
+class TestCommonPostgresProfiler(OdevTestCase):
+    """Queries executed through PostgreSQL connectors should be recorded when profiling."""
+
+    def setUp(self):
+        super().setUp()
+        self.profiler = QueryProfiler()
+        PostgresConnector.set_profiler(self.profiler)
+        self.addCleanup(PostgresConnector.set_profiler, None)
+
+    def test_01_normalize(self):
+        """Literals and lists of values should be replaced by placeholders."""
+        self.assertEqual(
+            QueryProfiler.normalize(
+                """
+                SELECT name FROM catalogue
+                WHERE oid IN ( 12, 13.5, 14 ) AND name = 'it''s'
+                """
+            ),
+            "SELECT name FROM catalogue WHERE oid IN (?, ...) AND name = ?",
+        )
+        self.assertEqual(
+            QueryProfiler.normalize("INSERT INTO facts (oid, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"),
+            "INSERT INTO facts (oid, name) VALUES (?, ...)",
+        )
+
+    def test_02_record(self):
+        """Executed and cached queries should be recorded with their caller."""
+        with PostgresConnector() as psql:
+            psql.invalidate_cache()
+            psql.query("SELECT 1 UNION SELECT 2")
+            psql.query("SELECT 1 UNION SELECT 2")
+            psql.query("SELECT 3", transaction=False)
+
+        self.assertEqual(
+            [(record.statement, record.rows, record.cached) for record in self.profiler.records],
+            [("SELECT ? UNION SELECT ?", 2, False), ("SELECT ? UNION SELECT ?", 2, True), ("SELECT ?", 1, False)],
+        )
+        self.assertTrue(self.profiler.records[0].caller.startswith("tests/tests/common/test_postgres.py:"))
+
+        summary = self.profiler.summary(top=1)
+        self.assertEqual((summary["queries"], summary["cached"], summary["statements"]), (3, 1, 2))
+        self.assertEqual(len(summary["slowest"]), 1)
+        self.assertEqual(
+            [(statement["statement"], statement["count"], statement["cached"]) for statement in summary["repeated"]],
+            [("SELECT ? UNION SELECT ?", 2, 1)],
+        )
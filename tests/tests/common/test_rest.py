@@ -0,0 +1,273 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import ClassVar
+from unittest.mock import patch
+
+from odev.common.connectors.rest import RestConnector
+from odev.common.errors import ConnectorError
+from odev.common.http_cache import HttpCache
+from odev.common.restore import StreamingDownload
+from odev.common.thread import Thread
+
+from tests.fixtures import OdevTestCase
+
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 123)
+
+INTERRUPT_AFTER = 1536 * 1024
+"""Number of bytes after which connections are dropped, bytes of the chunk being received when dropped are lost."""
+
+RESUME_FROM = 1024 * 1024
+"""Position from which interrupted downloads resume."""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP server standing in for remote endpoints serving files, optionally supporting range requests."""
+
+    ranges: ClassVar[bool] = True
+    """Whether to serve range requests."""
+
+    interrupt_after: ClassVar[int | None] = None
+    """Number of bytes after which to drop the next connection."""
+
+    received: ClassVar[list[str | None]] = []
+    """Range headers of the requests received."""
+
+    conditional: ClassVar[list[str | None]] = []
+    """If-None-Match headers of the requests received for metadata."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metadata"):
+            self.send_metadata()
+            return
+
+        header = self.headers.get("Range")
+        self.received.append(header)
+        match = re.match(r"^bytes=(\d+)-(\d*)$", header or "")
+        start, end = 0, len(CONTENT)
+
+        if self.ranges and match is not None:
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else len(CONTENT)
+
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(CONTENT)}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        body = CONTENT[start:end]
+
+        if StandInHandler.interrupt_after is not None:
+            body, StandInHandler.interrupt_after = body[: StandInHandler.interrupt_after], None
+            self.close_connection = True
+
+        self.wfile.write(body)
+
+    def send_metadata(self):
+        """Serve metadata revalidated with entity tags, fresh for a minute if requested with `?fresh=1`."""
+        self.conditional.append(self.headers.get("If-None-Match"))
+
+        if self.headers.get("If-None-Match") == '"meta"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = b'{"name": "odev"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"meta"')
+
+        if "fresh=1" in self.path:
+            self.send_header("Cache-Control", "max-age=60")
+
+        if "private=1" in self.path:
+            self.send_header("Cache-Control", "private, max-age=60")
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInConnector(RestConnector):
+    """Connector to the stand-in HTTP server."""
+
+    @property
+    def exists(self) -> bool:
+        return True
+
+    def request(self, method, path, params=None, authenticate=True, **kwargs):
+        return self._request(method, path, params=params, **kwargs)
+
+
+class TestCommonRest(OdevTestCase):
+    """Downloads should be resumable and parallelized over range requests when the server supports them."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        StandInHandler.ranges, StandInHandler.interrupt_after = True, None
+        StandInHandler.received, StandInHandler.conditional = [], []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.connector = StandInConnector(f"http://127.0.0.1:{self.server.server_address[1]}")
+        self.file_path = self.directory / "dump.zip"
+        self.http_cache = HttpCache(self.directory / "cache" / "http.sqlite3")
+        self.addCleanup(self.http_cache.close)
+        self.addCleanup(RestConnector._cache.clear)
+        http_cache_patch = patch.object(RestConnector, "_http_cache", self.http_cache)
+        http_cache_patch.start()
+        self.addCleanup(http_cache_patch.stop)
+
+    def test_01_download(self):
+        """Files should be downloaded and their checksum verified."""
+        checksum = f"sha256:{hashlib.sha256(CONTENT).hexdigest()}"
+        self.connector.download("/dump.zip", self.file_path, checksum=checksum)
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["cache", "dump.zip"])
+
+    def test_02_download_parallel(self):
+        """Files should be downloaded in parallel ranges."""
+        with patch("odev.common.connectors.rest.DOWNLOAD_PARALLEL_MIN_SIZE", 1024 * 1024):
+            self.connector.download("/dump.zip", self.file_path, parallel=4)
+
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
+        self.assertEqual(len(StandInHandler.received), 3)
+
+    def test_03_download_retry(self):
+        """Interrupted ranges should be resumed from the last chunk received."""
+        StandInHandler.interrupt_after = INTERRUPT_AFTER
+        self.connector.download("/dump.zip", self.file_path)
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
+        self.assertEqual(StandInHandler.received, ["bytes=0-", f"bytes={RESUME_FROM}-{len(CONTENT) - 1}"])
+
+    def test_04_download_resume(self):
+        """Interrupted downloads should be resumed from their partial file."""
+        StandInHandler.interrupt_after = INTERRUPT_AFTER
+
+        with patch("odev.common.connectors.rest.DOWNLOAD_RETRIES", 0), self.assertRaises(ConnectorError):
+            self.connector.download("/dump.zip", self.file_path)
+
+        self.assertTrue(self.file_path.with_name("dump.zip.part").exists())
+        self.assertTrue(self.file_path.with_name("dump.zip.part.json").exists())
+        self.connector.download("/dump.zip", self.file_path)
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
+        self.assertEqual(StandInHandler.received[-1], f"bytes={RESUME_FROM}-{len(CONTENT) - 1}")
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["cache", "dump.zip"])
+
+    def test_05_download_no_ranges(self):
+        """Downloads from servers not supporting range requests should restart from scratch."""
+        StandInHandler.ranges, StandInHandler.interrupt_after = False, INTERRUPT_AFTER
+
+        with self.assertRaises(ConnectorError):
+            self.connector.download("/dump.zip", self.file_path, parallel=4)
+
+        self.connector.download("/dump.zip", self.file_path, parallel=4)
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
+
+    def test_06_download_checksum_mismatch(self):
+        """Downloads not matching their checksum should be discarded."""
+        with self.assertRaises(ConnectorError):
+            self.connector.download("/dump.zip", self.file_path, checksum=f"md5:{'0' * 32}")
+
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["cache"])
+
+    def test_07_http_cache_revalidation(self):
+        """Responses should be cached on disk and revalidated with conditional requests."""
+        self.assertEqual(self.connector.get("/metadata", params={"b": 2, "a": 1}).json(), {"name": "odev"})
+        RestConnector._cache.clear()
+        self.assertEqual(self.connector.get("/metadata", params={"a": 1, "b": 2}).json(), {"name": "odev"})
+        self.assertEqual(StandInHandler.conditional, [None, '"meta"'])
+        self.assertEqual(len(self.http_cache), 1)
+
+    def test_08_http_cache_fresh(self):
+        """Fresh responses should be served from the cache without requesting the server."""
+        self.connector.get("/metadata", params={"fresh": 1})
+        RestConnector._cache.clear()
+        self.assertEqual(self.connector.get("/metadata", params={"fresh": 1}).json(), {"name": "odev"})
+        self.assertEqual(StandInHandler.conditional, [None])
+
+    def test_09_http_cache_stream(self):
+        """Streamed responses should not be cached."""
+        with self.connector.get("/metadata", stream=True):
+            pass
+
+        self.connector.download("/dump.zip", self.file_path)
+        self.assertEqual(len(self.http_cache), 0)
+        self.assertEqual(len(RestConnector._cache), 0)
+
+    def test_10_http_cache_eviction(self):
+        """Least recently used responses should be evicted once the cache is full."""
+        self.http_cache.max_size = 40
+
+        for index in range(2):
+            self.connector.get(f"/metadata/{index}")
+
+        self.http_cache.get(HttpCache.key("GET", f"{self.connector.url}/metadata/0"))
+        self.connector.get("/metadata/2")
+        self.assertIsNotNone(self.http_cache.get(HttpCache.key("GET", f"{self.connector.url}/metadata/0")))
+        self.assertIsNone(self.http_cache.get(HttpCache.key("GET", f"{self.connector.url}/metadata/1")))
+        self.assertEqual(len(self.http_cache), 2)
+
+    def test_11_http_cache_private(self):
+        """Responses marked as private should not be stored."""
+        self.connector.get("/metadata", params={"private": 1})
+        self.assertEqual(len(self.http_cache), 0)
+
+    def test_12_http_cache_authenticated(self):
+        """Responses to authenticated requests should neither be stored nor served from the cache."""
+        self.connector.get("/metadata", params={"fresh": 1}, headers={"Authorization": "Bearer secret"})
+        self.assertEqual(len(self.http_cache), 0)
+
+        RestConnector._cache.clear()
+        self.connector.get("/metadata", params={"fresh": 1})
+        RestConnector._cache.clear()
+        self.connector.get("/metadata", params={"fresh": 1}, headers={"Authorization": "Bearer secret"})
+        self.assertEqual(StandInHandler.conditional, [None, None, None])
+        self.assertEqual(len(self.http_cache), 1)
+
+    def test_13_http_cache_disabled(self):
+        """Responses should not be stored when the cache is disabled in the configuration."""
+        self.connector.config.http.cache = False
+        self.connector.get("/metadata", params={"fresh": 1})
+        self.assertEqual(len(self.http_cache), 0)
+
+    def test_14_download_streaming_interrupted(self):
+        """Interrupted downloads restored while being downloaded should fail without leaving a partial file."""
+        streaming = StreamingDownload(self.file_path, lambda: self.connector.download("/dump.zip", self.file_path))
+        streaming.stop.set()
+
+        with self.assertRaises(RuntimeError) as error, streaming:
+            pass
+
+        self.assertIsInstance(error.exception.__cause__, ConnectorError)
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["cache"])
+
+    def test_15_download_streaming_deferred(self):
+        """Downloads deferred by a streaming download should be handed over to its background thread."""
+        with StreamingDownload(self.file_path) as streaming:
+            self.assertEqual(self.connector.download("/dump.zip", self.file_path), self.file_path)
+            self.assertTrue(streaming.running)
+            self.assertTrue(streaming.started())
+
+        self.assertEqual(streaming.result, self.file_path)
+        self.assertEqual(self.file_path.read_bytes(), CONTENT)
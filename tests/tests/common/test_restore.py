@@ -0,0 +1,324 @@
+import bz2
+import gzip
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from threading import Event
+from unittest.mock import patch
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from odev.common.restore import (
+    RestoreInput,
+    SqlFilter,
+    StreamingDownload,
+    ZipMemberReader,
+    filter_restore_list,
+    parse_table_filters,
+    split_restore_list,
+)
+
+from tests.fixtures import OdevTestCase
+
+
+CONTENT = b"".join(f"INSERT INTO res_partner VALUES ({index}, 'Partner {index}');\n".encode() for index in range(50000))
+
+SQL_DUMP = """
+CREATE TABLE public.mail_message (id integer, body text);
+
+COPY public.mail_message (id, body) FROM stdin;
+1\tHello
+2\tCOPY public.res_partner (id) FROM stdin;
+3\t\\.
+\\.
+
+COPY public.mail_tracking_value (id, mail_message_id) FROM stdin;
+1\t1
+2\t2
+3\t3
+4\t3
+\\.
+
+COPY public.res_partner (id, name) FROM stdin;
+1\tAdmin
+2\t\\.
+\\.
+
+ALTER TABLE ONLY public.mail_tracking_value
+    ADD CONSTRAINT mail_tracking_value_mail_message_id_fkey FOREIGN KEY (mail_message_id) REFERENCES public.mail_message(id) ON DELETE CASCADE;
+
+ALTER TABLE ONLY public.mail_message
+    ADD CONSTRAINT mail_message_author_id_fkey FOREIGN KEY (author_id) REFERENCES public.res_partner(id) ON DELETE SET NULL;
+"""
+
+RESTORE_LIST = """
+;
+; Archive created at 2024-05-03 10:12:00 UTC
+;
+5001; 0 16400 TABLE DATA public mail_message odoo
+5002; 0 16410 TABLE DATA public mail_tracking_value odoo
+6001; 2606 16500 FK CONSTRAINT public mail_tracking_value mail_tracking_value_mail_message_id_fkey odoo
+6002; 2606 16510 FK CONSTRAINT public mail_message mail_message_author_id_fkey odoo
+"""
+
+INDEXES_LIST = """
+;
+5001; 0 16400 TABLE DATA public mail_message odoo
+7001; 1259 16600 INDEX public mail_message_res_id_index odoo
+7002; 0 0 INDEX ATTACH public mail_message_part_index odoo
+6001; 2606 16500 FK CONSTRAINT public mail_tracking_value mail_tracking_value_mail_message_id_fkey odoo
+"""
+
+
+class UnseekableBuffer(io.BytesIO):
+    """In-memory buffer that cannot be seeked, as written by streamed responses."""
+
+    def seekable(self) -> bool:
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("seek")
+
+    def tell(self):
+        raise io.UnsupportedOperation("tell")
+
+
+class TestCommonRestore(OdevTestCase):
+    """Dumps should be read in a single pass, with progress tracked on the underlying file."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def assert_read_once(self, path: Path, compression: str | None):
+        """Assert the dump is detected with the expected compression and fully read exactly once."""
+        with RestoreInput.from_path(path) as dump:
+            self.assertEqual(dump.compression, compression)
+            self.assertEqual(dump.size, path.stat().st_size)
+            self.assertEqual(dump.peek(64), CONTENT[:64])
+            self.assertEqual(dump.peek(32), CONTENT[:32])
+            self.assertEqual(b"".join(dump.chunks(4096)), CONTENT)
+            self.assertEqual(dump.consumed, dump.size)
+            self.assertEqual(dump.peek(16), CONTENT[:16])
+
+    def test_01_plain(self):
+        """Plain SQL files should be read as-is."""
+        path = self.directory / "dump.sql"
+        path.write_bytes(CONTENT)
+        self.assert_read_once(path, None)
+
+    def test_02_gzip(self):
+        """Gzip files should be detected from their content regardless of their extension."""
+        path = self.directory / "dump.sql"
+        path.write_bytes(gzip.compress(CONTENT))
+        self.assert_read_once(path, "gzip")
+
+    def test_03_bzip2(self):
+        """Bzip2 files should be decompressed on the fly."""
+        path = self.directory / "dump.sql.bz2"
+        path.write_bytes(bz2.compress(CONTENT))
+        self.assert_read_once(path, "bzip2")
+
+    def test_04_reopen(self):
+        """Dumps should be readable again from the start after reopening them."""
+        path = self.directory / "dump.sql.gz"
+        path.write_bytes(gzip.compress(CONTENT))
+
+        with RestoreInput.from_path(path) as dump:
+            next(dump.chunks(1024))
+            self.assertEqual(b"".join(dump.reopen().chunks()), CONTENT)
+
+    def test_05_gzip_multiple_members(self):
+        """Gzip files made of multiple members should be fully decompressed."""
+        path = self.directory / "dump.sql.gz"
+        path.write_bytes(gzip.compress(CONTENT[:1000]) + gzip.compress(CONTENT[1000:]) + b"\x00" * 16)
+
+        with RestoreInput.from_path(path) as dump:
+            self.assertEqual(b"".join(dump.chunks()), CONTENT)
+            self.assertGreaterEqual(dump.decompression_time, 0)
+
+    def test_06_bzip2_parallel(self):
+        """Bzip2 files made of multiple streams should be decompressed in parallel and reassembled in order."""
+        path = self.directory / "dump.sql.bz2"
+        path.write_bytes(
+            b"".join(bz2.compress(CONTENT[start : start + 100000]) for start in range(0, len(CONTENT), 100000))
+        )
+
+        with (
+            patch("odev.common.restore.BZIP2_SEGMENT_SIZE", 1),
+            self.patch("odev.common.restore.os", "cpu_count", return_value=4),
+            self.wrap("odev.common.restore.bz2", "decompress") as decompress,
+            RestoreInput.from_path(path) as dump,
+        ):
+            self.assertEqual(b"".join(dump.chunks()), CONTENT)
+            self.assertGreater(decompress.call_count, 1)
+
+    def test_07_truncated(self):
+        """Truncated compressed files should raise an error."""
+        path = self.directory / "dump.sql.gz"
+        path.write_bytes(gzip.compress(CONTENT)[:-1000])
+
+        with RestoreInput.from_path(path) as dump, self.assertRaises(EOFError):
+            b"".join(dump.chunks())
+
+    def test_08_parse_table_filters(self):
+        """Tables to filter should be parsed with their optional ratio of rows to keep."""
+        self.assertEqual(
+            parse_table_filters(["mail_message", "bus_bus:0.5", "ir_logging:10%", ""]),
+            {"mail_message": 0.0, "bus_bus": 0.5, "ir_logging": 0.1},
+        )
+        self.assertEqual(
+            parse_table_filters(["public.mail_message", '"public"."bus_bus":0.5']),
+            {"mail_message": 0.0, "bus_bus": 0.5},
+        )
+
+        with self.assertRaises(ValueError):
+            parse_table_filters(["mail_message:2"])
+
+    def test_09_sql_filter(self):
+        """Rows of filtered tables should be skipped or sampled and foreign keys to them created as NOT VALID."""
+        sql_filter = SqlFilter({"mail_message": 0.0, "mail_tracking_value": 0.5})
+        dump = SQL_DUMP.encode()
+        filtered = b"".join(sql_filter.filter(dump[start : start + 7] for start in range(0, len(dump), 7))).decode()
+
+        self.assertIn("COPY public.mail_message (id, body) FROM stdin;\n\\.\n", filtered)
+        self.assertIn("COPY public.mail_tracking_value (id, mail_message_id) FROM stdin;\n1\t1\n3\t3\n\\.\n", filtered)
+        self.assertIn("COPY public.res_partner (id, name) FROM stdin;\n1\tAdmin\n2\t\\.\n\\.\n", filtered)
+        self.assertIn("REFERENCES public.mail_message(id) ON DELETE CASCADE NOT VALID;\n", filtered)
+        self.assertIn("REFERENCES public.res_partner(id) ON DELETE SET NULL;\n", filtered)
+        self.assertEqual(sql_filter.rows, {"mail_message": 3, "mail_tracking_value": 4})
+        self.assertEqual(sql_filter.rows_kept, {"mail_tracking_value": 2})
+        self.assertEqual(sql_filter.constraints, ["mail_tracking_value_mail_message_id_fkey"])
+
+    def test_10_filter_restore_list(self):
+        """Data of skipped tables and foreign keys to them should be commented out of custom dumps contents."""
+        restore_list, constraints = filter_restore_list(RESTORE_LIST, SQL_DUMP, {"mail_message": 0.0, "bus_bus": 0.5})
+        self.assertIn(";5001; 0 16400 TABLE DATA public mail_message odoo", restore_list)
+        self.assertIn("\n5002; 0 16410 TABLE DATA public mail_tracking_value odoo", restore_list)
+        self.assertIn(";6001; 2606 16500 FK CONSTRAINT public mail_tracking_value", restore_list)
+        self.assertIn("\n6002; 2606 16510 FK CONSTRAINT public mail_message", restore_list)
+        self.assertEqual(
+            constraints,
+            [
+                (
+                    "ALTER TABLE ONLY public.mail_tracking_value ADD CONSTRAINT mail_tracking_value_mail_message_id_fkey "
+                    "FOREIGN KEY (mail_message_id) REFERENCES public.mail_message(id) ON DELETE CASCADE NOT VALID"
+                )
+            ],
+        )
+
+    def test_11_split_restore_list(self):
+        """Indexes should be listed apart from the other entries of custom dumps contents."""
+        without_indexes, only_indexes = split_restore_list(INDEXES_LIST)
+        self.assertIn("\n5001; 0 16400 TABLE DATA", without_indexes)
+        self.assertIn(";7001; 1259 16600 INDEX", without_indexes)
+        self.assertIn(";7002; 0 0 INDEX ATTACH", without_indexes)
+        self.assertIn("\n6001; 2606 16500 FK CONSTRAINT", without_indexes)
+        self.assertIn(";5001; 0 16400 TABLE DATA", only_indexes)
+        self.assertIn("\n7001; 1259 16600 INDEX", only_indexes)
+        self.assertIn("\n7002; 0 0 INDEX ATTACH", only_indexes)
+        self.assertIn(";6001; 2606 16500 FK CONSTRAINT", only_indexes)
+
+    def test_12_sql_filter_phases(self):
+        """The phase of the restore should be tracked while streaming plain SQL dumps."""
+        sql_filter = SqlFilter({})
+        dump = (
+            SQL_DUMP.replace(
+                "\nALTER TABLE ONLY",
+                "\nCREATE INDEX mail_message_index ON public.mail_message (id);\n\nALTER TABLE ONLY",
+                1,
+            )
+        ).encode()
+        phases: list[str] = []
+
+        for _chunk in sql_filter.filter(dump[start : start + 7] for start in range(0, len(dump), 7)):
+            if not phases or phases[-1] != sql_filter.phase:
+                phases.append(sql_filter.phase)
+
+        self.assertEqual(phases, ["ddl", "data", "indexes", "constraints"])
+
+    def test_13_zip_member_reader(self):
+        """Members of zip archives should be extracted sequentially from their local headers."""
+        for compression in (ZIP_STORED, ZIP_DEFLATED):
+            for buffer in (io.BytesIO(), UnseekableBuffer()):
+                with ZipFile(buffer, "w", compression=compression) as archive:
+                    archive.writestr("filestore/ab/" + "a" * 40, CONTENT[:5000])
+                    archive.writestr("dump.sql", CONTENT)
+
+                if compression == ZIP_STORED and isinstance(buffer, UnseekableBuffer):
+                    with self.assertRaises(ValueError):
+                        ZipMemberReader(io.BytesIO(buffer.getvalue()), "dump.sql")
+                    continue
+
+                with ZipMemberReader(io.BytesIO(buffer.getvalue()), "dump.sql") as reader:
+                    self.assertEqual(reader.read(), CONTENT)
+
+                with self.assertRaises(ValueError):
+                    ZipMemberReader(io.BytesIO(buffer.getvalue()), "manifest.json")
+
+    def test_14_streaming_download(self):
+        """Dumps should be read while they are being downloaded."""
+        path = self.directory / "dump.sql.gz"
+        compressed = gzip.compress(CONTENT)
+        resume = Event()
+
+        def download():
+            with path.open("wb") as file:
+                for start in range(0, len(compressed), 4096):
+                    file.write(compressed[start : start + 4096])
+                    file.flush()
+                    resume.wait()
+
+            return True
+
+        with StreamingDownload(path, download) as streaming:
+            self.assertTrue(streaming.started())
+            self.assertIs(StreamingDownload.get(path), streaming)
+
+            with RestoreInput.from_path(path) as dump:
+                self.assertEqual(dump.compression, "gzip")
+                self.assertEqual(dump.size, 4096)
+                resume.set()
+                self.assertEqual(b"".join(dump.chunks()), CONTENT)
+
+        self.assertTrue(streaming.result)
+        self.assertIsNone(StreamingDownload.get(path))
+
+    def test_15_streaming_download_interrupted(self):
+        """Downloads should be interrupted when restoring the file being downloaded fails."""
+        path = self.directory / "dump.sql.gz"
+
+        def download():
+            with path.open("wb") as file:
+                while not streaming.stop.wait(0.01):
+                    file.write(b"\0")
+
+            return True
+
+        with self.assertRaises(ValueError), StreamingDownload(path, download) as streaming:
+            self.assertTrue(streaming.started())
+            raise ValueError("Restore failed")
+
+        self.assertTrue(streaming.stop.is_set())
+        self.assertTrue(streaming.complete.is_set())
+        self.assertIsNone(StreamingDownload.get(path))
+
+    def test_16_streaming_download_deferred(self):
+        """Deferred downloads should only run in the background once started, and not be waited for otherwise."""
+        path = self.directory / "dump.sql.gz"
+
+        with StreamingDownload(path) as streaming:
+            self.assertFalse(streaming.running)
+            self.assertIs(StreamingDownload.get(path), streaming)
+            streaming.start(lambda: path.write_bytes(gzip.compress(CONTENT)))
+            self.assertTrue(streaming.started())
+
+        self.assertTrue(streaming.result)
+
+        with StreamingDownload(path) as streaming:
+            self.assertTrue(streaming.started())
+            self.assertFalse(streaming.running)
+            self.assertIsNone(StreamingDownload.get(path))
+
+        self.assertIsNone(streaming.result)
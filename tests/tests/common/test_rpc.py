@@ -0,0 +1,178 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar
+from unittest.mock import patch
+
+import odoolib  # type: ignore [import]
+
+from odev.common.connectors.rpc import RPC_DATA_CACHE, RPC_FIELDS_INDEX
+from odev.common.databases import RemoteDatabase
+from odev.common.thread import Thread
+
+from tests.fixtures import OdevTestCase
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """JSON-RPC server standing in for a remote Odoo database, rejecting batch requests as Odoo does."""
+
+    received: ClassVar[list[list[str]]] = []
+    """Model methods called in each request received."""
+
+    arguments: ClassVar[list[tuple[list, dict]]] = []
+    """Arguments of the calls to model methods received."""
+
+    denied: ClassVar[set[str]] = set()
+    """Model methods the user is not allowed to call."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        calls = payload if isinstance(payload, list) else [payload]
+        self.received.append([self.method(call) for call in calls])
+
+        if isinstance(payload, list):
+            reply: Any = {"jsonrpc": "2.0", "id": None, "error": {"message": "Invalid request"}}
+        else:
+            reply = self.reply(payload)
+
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reply(self, call: dict) -> dict[str, Any]:
+        """Reply to a call, with an access error if the user is not allowed to call the model method."""
+        if self.method(call) in self.denied:
+            error = {"code": 200, "message": "Odoo Server Error", "data": {"message": "Access denied"}}
+            return {"jsonrpc": "2.0", "id": call["id"], "error": error}
+
+        return {"jsonrpc": "2.0", "id": call["id"], "result": self.result(call)}
+
+    @staticmethod
+    def method(call: dict) -> str:
+        """Name of the model method called, or of the service method for calls outside of models."""
+        args = call["params"]["args"]
+        return f"{args[3]}.{args[4]}" if call["params"]["method"] == "execute_kw" else call["params"]["method"]
+
+    def result(self, call: dict) -> Any:
+        """Result of a call, as returned by an enterprise database with partners."""
+        if call["params"]["method"] == "execute_kw":
+            args, kwargs = call["params"]["args"][5:]
+            self.arguments.append((args, kwargs))
+
+            if self.method(call) == "res.partner.search_read":
+                after_id = args[0][0][2]
+                return [self.partner(id_, kwargs["fields"]) for id_ in PARTNERS if id_ > after_id][: kwargs["limit"]]
+
+            if self.method(call) == "res.partner.read":
+                return [self.partner(id_, args[1]) for id_ in args[0]]
+
+        return {
+            "login": 2,
+            "ir.module.module.search_read": [{"id": 1, "latest_version": "17.0.1.3"}],
+            "ir.module.module.search_count": 12,
+            "ir.config_parameter.search_read": [
+                {"id": 1, "key": "database.uuid", "value": "0123-4567"},
+                {"id": 2, "key": "database.expiration_date", "value": "2030-01-01 00:00:00"},
+            ],
+        }[self.method(call)]
+
+    @staticmethod
+    def partner(id_: int, fields: list[str]) -> dict[str, Any]:
+        """Data of a partner."""
+        return {"id": id_} | {field: f"{field} {id_}" for field in fields}
+
+
+PARTNERS = range(1, 251)
+"""Ids of the partners in the stand-in database."""
+
+
+class TestCommonRpc(OdevTestCase):
+    """Facts about remote databases should be fetched together and memoized."""
+
+    def setUp(self):
+        super().setUp()
+        StandInHandler.received, StandInHandler.arguments = [], []
+        StandInHandler.denied = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for cache_patch in (
+            patch.dict(RPC_DATA_CACHE, clear=True),
+            patch.dict(RPC_FIELDS_INDEX, clear=True),
+        ):
+            cache_patch.start()
+            self.addCleanup(cache_patch.stop)
+
+    def remote_database(self) -> RemoteDatabase:
+        """Remote database connected to the stand-in server."""
+        database = RemoteDatabase(f"http://127.0.0.1:{self.server.server_address[1]}", name="odev-test")
+        database.rpc._connection = odoolib.get_connection(
+            hostname="127.0.0.1",
+            database="odev-test",
+            login="admin",
+            password="admin",  # noqa: S106
+            protocol="jsonrpc",
+            port=self.server.server_address[1],
+        )
+        return database
+
+    def assert_facts(self, database: RemoteDatabase):
+        self.assertTrue(database.is_odoo)
+        self.assertEqual(str(database.version), "17.0")
+        self.assertEqual(database.edition, "enterprise")
+        self.assertEqual(database.uuid, "0123-4567")
+        self.assertEqual(database.expiration_date.year if database.expiration_date else None, 2030)
+
+    def test_01_snapshot(self):
+        """Facts should be fetched with concurrent calls, never in batch requests, and memoized until invalidated."""
+        database = self.remote_database()
+        self.assert_facts(database)
+        database.info()
+        self.assertEqual(StandInHandler.received[0], ["login"])
+        self.assertEqual(
+            sorted(StandInHandler.received[1:]),
+            [["ir.config_parameter.search_read"], ["ir.module.module.search_count"], ["ir.module.module.search_read"]],
+        )
+        database.invalidate()
+        self.assert_facts(database)
+        self.assertEqual(len(StandInHandler.received), 7)
+        self.assertTrue(all(len(methods) == 1 for methods in StandInHandler.received))
+
+    def test_02_iter_search_read(self):
+        """Records should be fetched by batches paginated on their ids."""
+        model = self.remote_database().rpc["res.partner"]
+        records = list(model.iter_search_read([("active", "=", True)], ["name"], batch_size=100))
+        self.assertEqual([record["id"] for record in records], list(PARTNERS))
+        self.assertEqual(
+            [args[0][0] for args, _ in StandInHandler.arguments],
+            [["id", ">", 0], ["id", ">", 100], ["id", ">", 200]],
+        )
+        self.assertEqual(StandInHandler.arguments[0][1], {"fields": ["name"], "limit": 100, "order": "id asc"})
+        self.assertFalse(model.cache)
+
+    def test_03_read_cache_index(self):
+        """Only records and fields missing from the cache should be read."""
+        model = self.remote_database().rpc["res.partner"]
+        self.assertEqual(model.read([1, 2], ["name"])[1], {"id": 2, "name": "name 2"})
+        self.assertEqual(model.read([2, 1], ["name"])[0]["id"], 2)
+        self.assertEqual(len(StandInHandler.arguments), 1)
+        self.assertEqual(model.read([1, 3], ["name", "email"])[0], {"id": 1, "name": "name 1", "email": "email 1"})
+        self.assertEqual(StandInHandler.arguments[-1][0], [[1, 3], ["name", "email"]])
+        self.assertEqual(model.cache_index["email"], {1, 3})
+
+    def test_04_snapshot_access_error(self):
+        """Facts about modules should be fetched even if system parameters cannot be read."""
+        StandInHandler.denied = {"ir.config_parameter.search_read"}
+
+        database = self.remote_database()
+        self.assertTrue(database.is_odoo)
+        self.assertEqual(str(database.version), "17.0")
+        self.assertEqual(database.edition, "enterprise")
+        self.assertIsNone(database.uuid)
+        self.assertIsNone(database.expiration_date)
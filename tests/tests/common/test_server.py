@@ -0,0 +1,135 @@
+import json
+import os
+import socket
+from unittest.mock import PropertyMock, patch
+
+from odev import client
+from odev.common.server import SERVER_MESSAGE_HEADER, OdevServer
+from odev.common.thread import Thread
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonServer(OdevTestCase):
+    """Commands should be forwarded to a warm odev server, or run in-process when it cannot serve them."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = OdevServer(idle_timeout=5)
+        self.socket_path = self.run_path / "server.sock"
+        self.run_path.mkdir(parents=True, exist_ok=True)
+        socket_patch = patch.object(OdevServer, "socket_path", new_callable=PropertyMock)
+        socket_patch.start().return_value = self.socket_path
+        self.addCleanup(socket_patch.stop)
+        self.thread = Thread(target=self.server.serve, daemon=True)
+
+    def tearDown(self):
+        self.server.request("stop")
+        self.thread.join(timeout=5)
+        super().tearDown()
+
+    def start_server(self):
+        """Start the server in a thread and wait for it to accept requests."""
+        with patch("odev.common.server.signal"):
+            self.thread.start()
+
+            while not self.socket_path.exists():
+                self.thread.join(timeout=0.01)
+
+    def send(self, payload: dict) -> dict:
+        """Send a request without attaching file descriptors, in chunks smaller than the message."""
+        data = json.dumps(payload).encode()
+        message = SERVER_MESSAGE_HEADER.pack(len(data)) + data
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(self.socket_path.as_posix())
+            connection.sendall(message[:3])
+            connection.sendall(message[3:])
+            return json.loads(connection.makefile("rb").readline())
+
+    def run_forked(self, *argv: str) -> tuple[list[dict], str]:
+        """Run a command in a process forked from the server, attaching pipes as its terminal.
+
+        :return: The replies of the server and the output of the command.
+        """
+        data = json.dumps({"action": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}).encode()
+        output_read, output_write = os.pipe()
+
+        with (
+            open(os.devnull) as stdin,
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection,
+            patch("odev.common.init_framework", return_value=self.odev),
+            patch("odev.__main__.os.geteuid", return_value=1000),
+        ):
+            connection.connect(self.socket_path.as_posix())
+            socket.send_fds(
+                connection,
+                [SERVER_MESSAGE_HEADER.pack(len(data)) + data],
+                [stdin.fileno(), output_write, output_write],
+            )
+            os.close(output_write)
+            replies = [json.loads(line) for line in connection.makefile("rb")]
+
+        with os.fdopen(output_read) as output:
+            return replies, output.read()
+
+    def test_01_ping_stop(self):
+        """The server should reply to pings and stop on request."""
+        self.start_server()
+        self.assertIn("pid", self.server.request("ping") or {})
+        self.assertEqual(self.server.request("stop"), {"stopped": True})
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(self.socket_path.exists())
+        self.assertIsNone(self.server.request("ping"))
+
+    def test_02_invalid_requests(self):
+        """Unknown actions should be rejected and commands sent without a terminal run in-process."""
+        self.start_server()
+        self.assertEqual(self.send({"action": "unknown"}), {"error": "Unknown action 'unknown'"})
+        self.assertEqual(self.send({"action": "run", "argv": ["version"]}), {"fallback": True})
+        self.assertIn("pid", self.server.request("ping") or {})
+
+    def test_03_idle_timeout(self):
+        """The server should exit after being idle for too long."""
+        self.server.idle_timeout = 0.2  # type: ignore [assignment]
+        self.start_server()
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(self.socket_path.exists())
+
+    def test_04_client_fallback(self):
+        """The client should run commands in-process when the server is not running or cannot serve them."""
+        with patch.object(client, "SERVER_SOCKET_PATH", self.socket_path.as_posix()):
+            self.assertIsNone(client.forward(["version"]))
+            self.start_server()
+            self.assertIsNone(client.forward(["-v", "debug", "version"]))
+
+            with patch.object(client.socket, "send_fds", side_effect=OSError):
+                self.assertIsNone(client.forward(["version"]))
+
+    def test_05_forked_run(self):
+        """Commands should run in a forked process after the checks done when odev starts."""
+        marker = self.run_path / "pruned"
+        self.start_server()
+
+        with (
+            patch.object(self.odev, "update", return_value=False),
+            patch.object(self.odev, "prune_databases", side_effect=marker.touch),
+        ):
+            replies, output = self.run_forked("version")
+
+        self.assertEqual([list(reply) for reply in replies], [["pid"], ["exit"]])
+        self.assertEqual(replies[1]["exit"], 0)
+        self.assertIn(" version ", output)
+        self.assertTrue(marker.exists())
+
+    def test_06_forked_run_updated(self):
+        """Commands should run in-process when odev was updated before running them in a forked process."""
+        self.start_server()
+
+        with patch.object(self.odev, "update", return_value=True):
+            replies, output = self.run_forked("version")
+
+        self.assertEqual([list(reply) for reply in replies], [["pid"], ["fallback"]])
+        self.assertNotIn(" version ", output)
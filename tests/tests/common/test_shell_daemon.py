@@ -0,0 +1,122 @@
+import json
+import socket
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import PropertyMock, patch
+
+import odev
+from odev.common.shell_daemon import ShellDaemon
+from odev.common.thread import Thread
+
+from tests.fixtures import OdevTestCase
+
+
+class StandInCursor:
+    """Cursor of a stand-in environment, counting transactions."""
+
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class TestCommonShellDaemon(OdevTestCase):
+    """Scripts should run in a warm shell daemon restarted when its registry is outdated."""
+
+    def setUp(self):
+        super().setUp()
+        self.env = SimpleNamespace(cr=StandInCursor(), registry=SimpleNamespace(), name="odev-test")
+        self.daemon = ShellDaemon(
+            SimpleNamespace(database=SimpleNamespace(name=f"{self.run_name}-shell")),  # type: ignore [arg-type]
+            idle_timeout=5,
+        )
+        self.servers: list[Thread] = []
+        self.fingerprint = "v1"
+        fingerprint_patch = patch.object(ShellDaemon, "fingerprint", new_callable=PropertyMock)
+        fingerprint_patch.start().side_effect = lambda: self.fingerprint
+        self.addCleanup(fingerprint_patch.stop)
+        start_patch = patch.object(self.daemon, "start", side_effect=self.start_server)
+        start_patch.start()
+        self.addCleanup(start_patch.stop)
+        self.addCleanup(self.daemon.stop)
+
+    def start_server(self, fingerprint: str):
+        """Start the server script in a thread instead of an odoo-bin shell process."""
+        namespace = {"env": self.env}
+        exec((Path(odev.__file__).parent / "scripts" / "shell_server.py").read_text(), namespace)  # noqa: S102
+        self.daemon.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = Thread(
+            target=namespace["shell_server"],
+            args=(self.env, self.daemon.socket_path.as_posix(), fingerprint, self.daemon.idle_timeout),
+            daemon=True,
+        )
+        server.start()
+        self.servers.append(server)
+
+        while self.daemon.request("ping") is None:
+            time.sleep(0.01)
+
+    def test_01_run(self):
+        """Scripts should run in the same daemon and their output be returned."""
+        self.assertEqual(self.daemon.run("print(env.name)"), "odev-test\n")
+        self.assertEqual(self.daemon.run("value = 21\nprint(value * 2)"), "42\n")
+        self.assertEqual(len(self.servers), 1)
+        self.assertEqual(self.env.cr.rollbacks, 4)
+
+    def test_02_run_error(self):
+        """Failing scripts should not stop the daemon."""
+        self.assertIsNone(self.daemon.run("raise ValueError('boom')"))
+        self.assertEqual(self.daemon.run("print('still alive')"), "still alive\n")
+        self.assertEqual(len(self.servers), 1)
+
+    def test_03_restart_outdated(self):
+        """Daemons should be restarted when their fingerprint changes."""
+        self.daemon.run("print(1)")
+        self.fingerprint = "v2"
+        self.assertEqual(self.daemon.run("print(2)"), "2\n")
+        self.assertEqual(len(self.servers), 2)
+        self.servers[0].join(timeout=5)
+        self.assertFalse(self.servers[0].is_alive())
+
+    def test_04_idle_timeout(self):
+        """Daemons should exit after being idle for too long."""
+        self.daemon.idle_timeout = 0.2  # type: ignore [assignment]
+        self.daemon.run("print(1)")
+        self.servers[0].join(timeout=5)
+        self.assertFalse(self.servers[0].is_alive())
+        self.assertFalse(self.daemon.socket_path.exists())
+        self.assertIsNone(self.daemon.request("ping"))
+
+    def test_05_invalid_request(self):
+        """Malformed requests should be answered with an error without stopping the daemon."""
+        self.daemon.run("print(1)")
+
+        for line in (b"not json\n", b"[]\n", b'{"action": "unknown"}\n'):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(self.daemon.socket_path.as_posix())
+                client.sendall(line)
+                self.assertIn("error", json.loads(client.makefile("rb").readline()))
+
+        self.assertEqual(self.daemon.run("print(2)"), "2\n")
+        self.assertEqual(len(self.servers), 1)
+
+    def test_06_quoted_arguments(self):
+        """Arguments of odoo-bin should be quoted in the command starting the daemon."""
+        odoobin = SimpleNamespace(
+            database=SimpleNamespace(name=f"{self.run_name}-shell"),
+            venv=SimpleNamespace(python="python"),
+            odoobin_path="odoo-bin",
+            prepare_odoobin=lambda: None,
+            prepare_odoobin_args=lambda args, subcommand: [subcommand, *args],
+        )
+        daemon = ShellDaemon(odoobin, ["--db-filter", "^odev test$; rm -rf x"])  # type: ignore [arg-type]
+
+        with (
+            patch("odev.common.shell_daemon.bash.detached") as detached,
+            patch.object(daemon, "request", return_value={}),
+        ):
+            daemon.start("v1")
+
+        self.assertTrue(detached.call_args.args[0].endswith("odoo-bin shell --db-filter '^odev test$; rm -rf x'"))
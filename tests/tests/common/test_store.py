@@ -0,0 +1,171 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from odev.common.connectors import PostgresConnector
+from odev.common.databases import LocalDatabase
+
+from tests.fixtures import OdevTestCase
+
+
+class TestCommonStoreDatabases(OdevTestCase):
+    """Saved values of databases should be loaded once and written in a single query per command."""
+
+    def setUp(self):
+        super().setUp()
+        self.store = self.odev.store.databases
+        self.store.invalidate()
+        self.database = SimpleNamespace(
+            name=f"{self.run_name}-store",
+            platform=SimpleNamespace(name="remote"),
+            repository=None,
+            branch=None,
+            url="https://example.odoo.com",
+        )
+        self.addCleanup(self.store.delete, self.database)
+
+    def queries(self) -> patch:
+        """Record queries executed against the datastore."""
+        return patch.object(self.odev.store, "query", wraps=self.odev.store.query)
+
+    def test_01_identity_map(self):
+        """Values should be loaded once, then shared."""
+        with self.queries() as query:
+            self.assertIsNone(self.store.get(self.database))
+            self.assertIsNone(self.store.get(self.database))
+
+        self.assertEqual(query.call_count, 1)
+
+    def test_02_unit_of_work(self):
+        """Values set several times should be written once, when flushed."""
+        with self.queries() as query:
+            self.store.set(self.database)
+            self.database.url = "https://other.odoo.com"
+            self.store.set(self.database, arguments="--stop-after-init")
+            self.assertEqual(self.store.get(self.database).url, "https://other.odoo.com")
+            self.store.flush()
+            self.store.flush()
+
+        self.assertEqual([call.args[0].split()[0] for call in query.call_args_list], ["SELECT", "INSERT"])
+
+        self.store.invalidate()
+        info = self.store.get(self.database)
+        self.assertEqual((info.url, info.arguments), ("https://other.odoo.com", "--stop-after-init"))
+
+        with self.queries() as query:
+            self.store.set(self.database, arguments="--stop-after-init")
+            self.store.flush()
+
+        query.assert_not_called()
+
+    def test_03_delete(self):
+        """Deleted databases should be forgotten, including changes not yet written."""
+        self.store.set(self.database)
+        self.store.delete(self.database)
+        self.store.flush()
+        self.store.invalidate()
+        self.assertIsNone(self.store.get(self.database))
+
+
+class TestCommonStoreFacts(OdevTestCase):
+    """Metadata of databases should be read from the datastore until rows are written to the database."""
+
+    def setUp(self):
+        super().setUp()
+        self.name = f"{self.run_name}-facts"
+        self.facts = self.odev.store.facts
+
+        with PostgresConnector() as psql:
+            psql.create_database(self.name)
+
+        self.addCleanup(self.drop_database)
+
+        with PostgresConnector(self.name) as psql:
+            psql.query(
+                "CREATE TABLE ir_module_module (name VARCHAR, latest_version VARCHAR, license VARCHAR, state VARCHAR)"
+            )
+            psql.query("CREATE TABLE ir_config_parameter (key VARCHAR, value VARCHAR)")
+            psql.query("INSERT INTO ir_module_module VALUES ('base', '17.0.1.3', 'LGPL-3', 'installed')")
+            psql.query("INSERT INTO ir_config_parameter VALUES ('database.uuid', 'facts-uuid')")
+
+        self.facts.invalidate()
+
+    def drop_database(self):
+        self.facts.delete(self.name)
+
+        with PostgresConnector() as psql:
+            psql.drop_database(self.name)
+
+    def inspect(self) -> tuple[LocalDatabase, bool]:
+        """Read the facts about the database as a new command would, return whether the database was connected to."""
+        self.facts.invalidate()
+
+        with patch.object(
+            LocalDatabase, "_inspect_facts", autospec=True, side_effect=LocalDatabase._inspect_facts
+        ) as inspect:
+            database = LocalDatabase(self.name)
+
+        return database, inspect.called
+
+    def test_01_facts(self):
+        """Facts should be read in a single query, then from the datastore."""
+        database, inspected = self.inspect()
+        self.assertTrue(inspected)
+        self.assertEqual(
+            (database.is_odoo, str(database.version), database.edition, database.uuid, database.neutralized),
+            (True, "17.0", "community", "facts-uuid", False),
+        )
+
+        database, inspected = self.inspect()
+        self.assertFalse(inspected)
+        self.assertEqual(database.uuid, "facts-uuid")
+
+    def test_02_writes(self):
+        """Facts should be read again once rows were written to the database."""
+        self.inspect()
+
+        with PostgresConnector(self.name) as psql:
+            psql.query("INSERT INTO ir_config_parameter VALUES ('database.is_neutralized', 'True')")
+
+        # Statistics of a database are updated shortly after the connection writing to it is closed
+        for _ in range(50):
+            database, inspected = self.inspect()
+
+            if inspected:
+                break
+
+            time.sleep(0.1)
+
+        self.assertTrue(inspected)
+        self.assertTrue(database.neutralized)
+
+    def test_03_missing_database(self):
+        """Missing databases should not be connected to."""
+        self.facts.invalidate()
+        database = LocalDatabase(f"{self.name}-missing")
+
+        with patch.object(LocalDatabase, "_inspect_facts") as inspect:
+            self.assertFalse(database.is_odoo)
+
+        inspect.assert_not_called()
+
+    def test_04_async(self):
+        """Asynchronous getters should return the same values as synchronous ones."""
+        with PostgresConnector(self.name) as psql:
+            psql.query("CREATE TABLE res_users_log (create_date TIMESTAMP)")
+            psql.query("INSERT INTO res_users_log VALUES ('2024-05-03 10:12:00')")
+
+        database, _ = self.inspect()
+        facts = database.facts
+        self.facts.delete(self.name)
+
+        with patch.object(LocalDatabase, "_inspect_facts") as inspect:
+            self.assertEqual(asyncio.run(database.async_facts()), facts)
+            self.assertEqual(asyncio.run(database.async_size()), database.size)
+            self.facts.delete(self.name)
+            self.assertEqual(asyncio.run(database.async_last_usage_date()), database.last_usage_date)
+            self.facts.delete(self.name)
+            self.assertEqual(asyncio.run(database.async_last_date()), database.last_date)
+
+        inspect.assert_not_called()